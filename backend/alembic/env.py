@@ -9,7 +9,7 @@ from alembic import context
 from app.core.config import settings
 from app.models.base import Base
 # Import all models so they are registered with Base.metadata
-from app.models import User, Listing, ListingPhoto, Favorite  # noqa: F401
+from app.models import User, Listing, ListingPhoto  # noqa: F401
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
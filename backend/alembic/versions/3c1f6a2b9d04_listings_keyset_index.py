@@ -0,0 +1,29 @@
+"""listings keyset index
+
+Revision ID: 3c1f6a2b9d04
+Revises: 98e9d986d936
+Create Date: 2026-10-18 09:12:41.532108
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c1f6a2b9d04'
+down_revision: Union[str, Sequence[str], None] = '98e9d986d936'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Serves `ORDER BY created_at DESC, id DESC` and the row-value cursor
+    # comparison used by the paginated feed (scanned backwards).
+    op.create_index('ix_listings_created_at_id', 'listings', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listings_created_at_id', table_name='listings')
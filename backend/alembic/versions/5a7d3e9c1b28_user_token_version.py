@@ -0,0 +1,53 @@
+"""user token version
+
+Revision ID: 5a7d3e9c1b28
+Revises: e91a5c3f7d20
+Create Date: 2026-10-18 14:02:11.384920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a7d3e9c1b28'
+down_revision: Union[str, Sequence[str], None] = 'e91a5c3f7d20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Snapshot of app.models.user.TOKEN_VERSION_TRIGGER_STATEMENTS
+TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION users_bump_token_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.role IS DISTINCT FROM OLD.role THEN
+            NEW.token_version := OLD.token_version + 1;
+        END IF;
+        RETURN NEW;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER users_role_change
+    BEFORE UPDATE OF role ON users
+    FOR EACH ROW EXECUTE FUNCTION users_bump_token_version()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS users_role_change ON users')
+    op.execute('DROP FUNCTION IF EXISTS users_bump_token_version()')
+    op.drop_column('users', 'token_version')
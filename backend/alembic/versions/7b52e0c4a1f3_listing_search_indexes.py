@@ -0,0 +1,52 @@
+"""listing search indexes
+
+Revision ID: 7b52e0c4a1f3
+Revises: 3c1f6a2b9d04
+Create Date: 2026-10-18 10:02:17.884213
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b52e0c4a1f3'
+down_revision: Union[str, Sequence[str], None] = '3c1f6a2b9d04'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of app.models.listing.SEARCH_VECTOR_EXPRESSION at this revision
+SEARCH_VECTOR_EXPRESSION = (
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+    "setweight(to_tsvector('simple', coalesce(description, '')), 'B')"
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column('listings', sa.Column(
+        'search_vector',
+        postgresql.TSVECTOR(),
+        sa.Computed(SEARCH_VECTOR_EXPRESSION, persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_listings_search_vector', 'listings', ['search_vector'], unique=False, postgresql_using='gin')
+    op.create_index('ix_listings_title_trgm', 'listings', ['title'], unique=False, postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'})
+    op.create_index('ix_listings_description_trgm', 'listings', ['description'], unique=False, postgresql_using='gin', postgresql_ops={'description': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listings_description_trgm', table_name='listings')
+    op.drop_index('ix_listings_title_trgm', table_name='listings')
+    op.drop_index('ix_listings_search_vector', table_name='listings')
+    op.drop_column('listings', 'search_vector')
+    # pg_trgm is left installed; other objects may depend on it
@@ -0,0 +1,33 @@
+"""photo blob renditions
+
+Revision ID: a8c3e5f17b92
+Revises: d7a4c1e85b36
+Create Date: 2026-10-19 10:12:37.481620
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8c3e5f17b92'
+down_revision: Union[str, Sequence[str], None] = 'd7a4c1e85b36'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Existing blobs start without renditions; the next rendition job of one
+    of their photos renders them under the blob's key.
+    """
+    op.add_column('photo_blobs', sa.Column('renditions', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('photo_blobs', 'renditions')
@@ -0,0 +1,193 @@
+"""photo renditions and jobs
+
+Revision ID: b6f19d2e4c83
+Revises: 5a7d3e9c1b28
+Create Date: 2026-10-18 16:21:47.502113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6f19d2e4c83'
+down_revision: Union[str, Sequence[str], None] = '5a7d3e9c1b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Snapshot of the changed app.models.listing_card.LISTING_CARD_TRIGGER_STATEMENTS:
+# cards copy the cover photo's renditions
+TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION refresh_listing_card(p_listing_id integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Serialise refreshes of one card so that concurrent photo writes
+        -- cannot overwrite each other's counts with stale snapshots
+        PERFORM 1 FROM listings WHERE id = p_listing_id FOR UPDATE;
+
+        INSERT INTO listing_cards (
+            id, seller_id, title, description, price_minor_units, currency,
+            category, condition, status, created_at, updated_at,
+            seller_telegram_id, seller_username, seller_first_name,
+            seller_last_name, seller_photo_url,
+            photo_count, cover_photo_id, cover_photo_url,
+            cover_photo_renditions, refreshed_at
+        )
+        SELECT
+            l.id, l.seller_id, l.title, l.description, l.price_minor_units,
+            l.currency, l.category, l.condition, l.status, l.created_at,
+            l.updated_at,
+            u.telegram_id, u.username, u.first_name, u.last_name, u.photo_url,
+            (SELECT count(*) FROM listing_photos p WHERE p.listing_id = l.id),
+            cover.id, cover.photo_url, cover.renditions, now()
+        FROM listings l
+        JOIN users u ON u.id = l.seller_id
+        LEFT JOIN LATERAL (
+            SELECT p.id, p.photo_url, p.renditions FROM listing_photos p
+            WHERE p.listing_id = l.id
+            ORDER BY p.display_order, p.id
+            LIMIT 1
+        ) cover ON true
+        WHERE l.id = p_listing_id
+        ON CONFLICT (id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            price_minor_units = EXCLUDED.price_minor_units,
+            currency = EXCLUDED.currency,
+            category = EXCLUDED.category,
+            condition = EXCLUDED.condition,
+            status = EXCLUDED.status,
+            created_at = EXCLUDED.created_at,
+            updated_at = EXCLUDED.updated_at,
+            seller_telegram_id = EXCLUDED.seller_telegram_id,
+            seller_username = EXCLUDED.seller_username,
+            seller_first_name = EXCLUDED.seller_first_name,
+            seller_last_name = EXCLUDED.seller_last_name,
+            seller_photo_url = EXCLUDED.seller_photo_url,
+            photo_count = EXCLUDED.photo_count,
+            cover_photo_id = EXCLUDED.cover_photo_id,
+            cover_photo_url = EXCLUDED.cover_photo_url,
+            cover_photo_renditions = EXCLUDED.cover_photo_renditions,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER listing_cards_photo_write
+    AFTER INSERT OR UPDATE OF listing_id, photo_url, display_order, renditions
+        OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION listing_cards_on_photo()
+    """,
+)
+
+# The same statements at revision e91a5c3f7d20, restored on downgrade
+PREVIOUS_TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION refresh_listing_card(p_listing_id integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Serialise refreshes of one card so that concurrent photo writes
+        -- cannot overwrite each other's counts with stale snapshots
+        PERFORM 1 FROM listings WHERE id = p_listing_id FOR UPDATE;
+
+        INSERT INTO listing_cards (
+            id, seller_id, title, description, price_minor_units, currency,
+            category, condition, status, created_at, updated_at,
+            seller_telegram_id, seller_username, seller_first_name,
+            seller_last_name, seller_photo_url,
+            photo_count, cover_photo_id, cover_photo_url, refreshed_at
+        )
+        SELECT
+            l.id, l.seller_id, l.title, l.description, l.price_minor_units,
+            l.currency, l.category, l.condition, l.status, l.created_at,
+            l.updated_at,
+            u.telegram_id, u.username, u.first_name, u.last_name, u.photo_url,
+            (SELECT count(*) FROM listing_photos p WHERE p.listing_id = l.id),
+            cover.id, cover.photo_url, now()
+        FROM listings l
+        JOIN users u ON u.id = l.seller_id
+        LEFT JOIN LATERAL (
+            SELECT p.id, p.photo_url FROM listing_photos p
+            WHERE p.listing_id = l.id
+            ORDER BY p.display_order, p.id
+            LIMIT 1
+        ) cover ON true
+        WHERE l.id = p_listing_id
+        ON CONFLICT (id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            price_minor_units = EXCLUDED.price_minor_units,
+            currency = EXCLUDED.currency,
+            category = EXCLUDED.category,
+            condition = EXCLUDED.condition,
+            status = EXCLUDED.status,
+            created_at = EXCLUDED.created_at,
+            updated_at = EXCLUDED.updated_at,
+            seller_telegram_id = EXCLUDED.seller_telegram_id,
+            seller_username = EXCLUDED.seller_username,
+            seller_first_name = EXCLUDED.seller_first_name,
+            seller_last_name = EXCLUDED.seller_last_name,
+            seller_photo_url = EXCLUDED.seller_photo_url,
+            photo_count = EXCLUDED.photo_count,
+            cover_photo_id = EXCLUDED.cover_photo_id,
+            cover_photo_url = EXCLUDED.cover_photo_url,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER listing_cards_photo_write
+    AFTER INSERT OR UPDATE OF listing_id, photo_url, display_order OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION listing_cards_on_photo()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('listing_photos', sa.Column('renditions', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.add_column('listing_cards', sa.Column('cover_photo_renditions', postgresql.JSONB(astext_type=sa.Text()), nullable=True))
+    op.create_table('photo_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('photo_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('run_after', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['photo_id'], ['listing_photos.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_photo_jobs_id'), 'photo_jobs', ['id'], unique=False)
+    op.create_index(op.f('ix_photo_jobs_photo_id'), 'photo_jobs', ['photo_id'], unique=False)
+    op.create_index('ix_photo_jobs_claimable', 'photo_jobs', ['id'], unique=False, postgresql_where=sa.text("status IN ('pending', 'running')"))
+
+    op.execute('DROP TRIGGER IF EXISTS listing_cards_photo_write ON listing_photos')
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+    # Queue renditions of existing photos; workers pick them up after deploy
+    op.execute('INSERT INTO photo_jobs (photo_id) SELECT id FROM listing_photos ORDER BY id')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS listing_cards_photo_write ON listing_photos')
+    for statement in PREVIOUS_TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+    op.drop_index('ix_photo_jobs_claimable', table_name='photo_jobs', postgresql_where=sa.text("status IN ('pending', 'running')"))
+    op.drop_index(op.f('ix_photo_jobs_photo_id'), table_name='photo_jobs')
+    op.drop_index(op.f('ix_photo_jobs_id'), table_name='photo_jobs')
+    op.drop_table('photo_jobs')
+    op.drop_column('listing_cards', 'cover_photo_renditions')
+    op.drop_column('listing_photos', 'renditions')
@@ -0,0 +1,37 @@
+"""listing filter indexes
+
+Revision ID: c4d8e2f61a7b
+Revises: 7b52e0c4a1f3
+Create Date: 2026-10-18 11:26:53.019467
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2f61a7b'
+down_revision: Union[str, Sequence[str], None] = '7b52e0c4a1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_listings_status_created_at_id', 'listings', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_listings_category_created_at_id', 'listings', ['category', 'created_at', 'id'], unique=False)
+    op.create_index('ix_listings_active_created_at_id', 'listings', ['created_at', 'id'], unique=False, postgresql_where=sa.text("status = 'active'"))
+    op.create_index('ix_listings_active_category_price', 'listings', ['category', 'price_minor_units'], unique=False, postgresql_where=sa.text("status = 'active'"))
+    # Superseded by ix_listings_status_created_at_id (same leading column)
+    op.drop_index(op.f('ix_listings_status'), table_name='listings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_listings_status'), 'listings', ['status'], unique=False)
+    op.drop_index('ix_listings_active_category_price', table_name='listings')
+    op.drop_index('ix_listings_active_created_at_id', table_name='listings')
+    op.drop_index('ix_listings_category_created_at_id', table_name='listings')
+    op.drop_index('ix_listings_status_created_at_id', table_name='listings')
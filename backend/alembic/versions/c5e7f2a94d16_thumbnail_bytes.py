@@ -0,0 +1,88 @@
+"""thumbnail bytes and object url
+
+Revision ID: c5e7f2a94d16
+Revises: b6f19d2e4c83
+Create Date: 2026-10-18 18:05:39.118264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e7f2a94d16'
+down_revision: Union[str, Sequence[str], None] = 'b6f19d2e4c83'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Rows per transaction; each batch only locks its own rows, briefly
+BATCH_SIZE = 500
+
+# Snapshot of app.services.thumbnails.backfill_bytea_batch. Batches walk
+# the primary key from the last converted id, so none rescans converted
+# rows. Rows locked by the application are skipped and left for
+# scripts.migrate_thumbnails; values that are not valid base64 stay in
+# thumbnail_data.
+BACKFILL_BATCH = sa.text(f"""
+    UPDATE listing_photos SET
+        thumbnail_bytes = decode(thumbnail_data, 'base64'),
+        thumbnail_data = NULL
+    WHERE id IN (
+        SELECT id FROM listing_photos
+        WHERE id > :after_id
+          AND thumbnail_data IS NOT NULL
+          AND thumbnail_data ~ '^[A-Za-z0-9+/]*={{0,2}}$'
+          AND length(thumbnail_data) % 4 = 0
+        ORDER BY id
+        LIMIT {BATCH_SIZE}
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""")
+
+RESTORE_BATCH = sa.text(f"""
+    UPDATE listing_photos SET
+        thumbnail_data = translate(encode(thumbnail_bytes, 'base64'), E'\\n', ''),
+        thumbnail_bytes = NULL
+    WHERE id IN (
+        SELECT id FROM listing_photos
+        WHERE id > :after_id
+          AND thumbnail_bytes IS NOT NULL
+        ORDER BY id
+        LIMIT {BATCH_SIZE}
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id
+""")
+
+
+def _run_batches(statement: sa.TextClause) -> None:
+    # Each batch commits on its own, so an interrupted run keeps its
+    # progress and the next run continues with the remaining rows
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        after_id = 0
+        while ids := bind.execute(statement, {"after_id": after_id}).scalars().all():
+            after_id = max(ids)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # IF NOT EXISTS: a previous run may have stopped during the backfill
+    op.execute('ALTER TABLE listing_photos ADD COLUMN IF NOT EXISTS thumbnail_bytes bytea')
+    op.execute('ALTER TABLE listing_photos ADD COLUMN IF NOT EXISTS thumbnail_object_url text')
+    _run_batches(BACKFILL_BATCH)
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Thumbnails moved to object storage by scripts.migrate_thumbnails are
+    not copied back; their photos lose their thumbnail.
+    """
+    _run_batches(RESTORE_BATCH)
+    op.drop_column('listing_photos', 'thumbnail_object_url')
+    op.drop_column('listing_photos', 'thumbnail_bytes')
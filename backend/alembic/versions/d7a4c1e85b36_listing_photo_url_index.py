@@ -0,0 +1,27 @@
+"""listing photo url index
+
+Revision ID: d7a4c1e85b36
+Revises: f2b8d4a17c59
+Create Date: 2026-10-18 22:14:51.203847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd7a4c1e85b36'
+down_revision: Union[str, Sequence[str], None] = 'f2b8d4a17c59'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_listing_photos_photo_url'), 'listing_photos', ['photo_url'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listing_photos_photo_url'), table_name='listing_photos')
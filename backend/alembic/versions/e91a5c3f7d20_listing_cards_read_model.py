@@ -0,0 +1,189 @@
+"""listing cards read model
+
+Revision ID: e91a5c3f7d20
+Revises: c4d8e2f61a7b
+Create Date: 2026-10-18 12:40:09.661390
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e91a5c3f7d20'
+down_revision: Union[str, Sequence[str], None] = 'c4d8e2f61a7b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Snapshot of app.models.listing_card.LISTING_CARD_TRIGGER_STATEMENTS at this revision
+TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION refresh_listing_card(p_listing_id integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Serialise refreshes of one card so that concurrent photo writes
+        -- cannot overwrite each other's counts with stale snapshots
+        PERFORM 1 FROM listings WHERE id = p_listing_id FOR UPDATE;
+
+        INSERT INTO listing_cards (
+            id, seller_id, title, description, price_minor_units, currency,
+            category, condition, status, created_at, updated_at,
+            seller_telegram_id, seller_username, seller_first_name,
+            seller_last_name, seller_photo_url,
+            photo_count, cover_photo_id, cover_photo_url, refreshed_at
+        )
+        SELECT
+            l.id, l.seller_id, l.title, l.description, l.price_minor_units,
+            l.currency, l.category, l.condition, l.status, l.created_at,
+            l.updated_at,
+            u.telegram_id, u.username, u.first_name, u.last_name, u.photo_url,
+            (SELECT count(*) FROM listing_photos p WHERE p.listing_id = l.id),
+            cover.id, cover.photo_url, now()
+        FROM listings l
+        JOIN users u ON u.id = l.seller_id
+        LEFT JOIN LATERAL (
+            SELECT p.id, p.photo_url FROM listing_photos p
+            WHERE p.listing_id = l.id
+            ORDER BY p.display_order, p.id
+            LIMIT 1
+        ) cover ON true
+        WHERE l.id = p_listing_id
+        ON CONFLICT (id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            price_minor_units = EXCLUDED.price_minor_units,
+            currency = EXCLUDED.currency,
+            category = EXCLUDED.category,
+            condition = EXCLUDED.condition,
+            status = EXCLUDED.status,
+            created_at = EXCLUDED.created_at,
+            updated_at = EXCLUDED.updated_at,
+            seller_telegram_id = EXCLUDED.seller_telegram_id,
+            seller_username = EXCLUDED.seller_username,
+            seller_first_name = EXCLUDED.seller_first_name,
+            seller_last_name = EXCLUDED.seller_last_name,
+            seller_photo_url = EXCLUDED.seller_photo_url,
+            photo_count = EXCLUDED.photo_count,
+            cover_photo_id = EXCLUDED.cover_photo_id,
+            cover_photo_url = EXCLUDED.cover_photo_url,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_listing() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM refresh_listing_card(NEW.id);
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_photo() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM refresh_listing_card(NEW.listing_id);
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM refresh_listing_card(OLD.listing_id);
+        ELSE
+            PERFORM refresh_listing_card(OLD.listing_id);
+            IF NEW.listing_id <> OLD.listing_id THEN
+                PERFORM refresh_listing_card(NEW.listing_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_user() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE listing_cards SET
+            seller_telegram_id = NEW.telegram_id,
+            seller_username = NEW.username,
+            seller_first_name = NEW.first_name,
+            seller_last_name = NEW.last_name,
+            seller_photo_url = NEW.photo_url,
+            refreshed_at = now()
+        WHERE seller_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER listing_cards_listing_write
+    AFTER INSERT OR UPDATE OF seller_id, title, description, price_minor_units,
+        currency, category, condition, status, created_at, updated_at
+    ON listings FOR EACH ROW EXECUTE FUNCTION listing_cards_on_listing()
+    """,
+    """
+    CREATE TRIGGER listing_cards_photo_write
+    AFTER INSERT OR UPDATE OF listing_id, photo_url, display_order OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION listing_cards_on_photo()
+    """,
+    """
+    CREATE TRIGGER listing_cards_user_write
+    AFTER UPDATE OF telegram_id, username, first_name, last_name, photo_url
+    ON users FOR EACH ROW EXECUTE FUNCTION listing_cards_on_user()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('listing_cards',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('seller_id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=120), nullable=False),
+    sa.Column('description', sa.Text(), nullable=False),
+    sa.Column('price_minor_units', sa.Integer(), nullable=False),
+    sa.Column('currency', sa.String(length=3), nullable=False),
+    sa.Column('category', sa.String(length=50), nullable=True),
+    sa.Column('condition', sa.String(length=20), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('seller_telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('seller_username', sa.String(length=64), nullable=True),
+    sa.Column('seller_first_name', sa.String(length=100), nullable=False),
+    sa.Column('seller_last_name', sa.String(length=100), nullable=True),
+    sa.Column('seller_photo_url', sa.Text(), nullable=True),
+    sa.Column('photo_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('cover_photo_id', sa.Integer(), nullable=True),
+    sa.Column('cover_photo_url', sa.Text(), nullable=True),
+    sa.Column('refreshed_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_listing_cards_created_at_id', 'listing_cards', ['created_at', 'id'], unique=False)
+    op.create_index('ix_listing_cards_status_created_at_id', 'listing_cards', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_listing_cards_category_created_at_id', 'listing_cards', ['category', 'created_at', 'id'], unique=False)
+    op.create_index(op.f('ix_listing_cards_seller_id'), 'listing_cards', ['seller_id'], unique=False)
+
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+    # One-time backfill; from here on the triggers keep cards current
+    op.execute('SELECT refresh_listing_card(id) FROM listings')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS listing_cards_user_write ON users')
+    op.execute('DROP TRIGGER IF EXISTS listing_cards_photo_write ON listing_photos')
+    op.execute('DROP TRIGGER IF EXISTS listing_cards_listing_write ON listings')
+    op.execute('DROP FUNCTION IF EXISTS listing_cards_on_user()')
+    op.execute('DROP FUNCTION IF EXISTS listing_cards_on_photo()')
+    op.execute('DROP FUNCTION IF EXISTS listing_cards_on_listing()')
+    op.execute('DROP FUNCTION IF EXISTS refresh_listing_card(integer)')
+    op.drop_index(op.f('ix_listing_cards_seller_id'), table_name='listing_cards')
+    op.drop_index('ix_listing_cards_category_created_at_id', table_name='listing_cards')
+    op.drop_index('ix_listing_cards_status_created_at_id', table_name='listing_cards')
+    op.drop_index('ix_listing_cards_created_at_id', table_name='listing_cards')
+    op.drop_table('listing_cards')
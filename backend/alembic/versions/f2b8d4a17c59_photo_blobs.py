@@ -0,0 +1,88 @@
+"""content-addressed photo blobs
+
+Revision ID: f2b8d4a17c59
+Revises: c5e7f2a94d16
+Create Date: 2026-10-18 19:42:06.730518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2b8d4a17c59'
+down_revision: Union[str, Sequence[str], None] = 'c5e7f2a94d16'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Snapshot of app.models.photo_blob.PHOTO_BLOB_REFCOUNT_TRIGGER_STATEMENTS
+TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION photo_blobs_refcount() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.blob_id IS NOT NULL THEN
+            UPDATE photo_blobs
+            SET ref_count = ref_count - 1, updated_at = now()
+            WHERE id = OLD.blob_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.blob_id IS NOT NULL THEN
+            UPDATE photo_blobs
+            SET ref_count = ref_count + 1, updated_at = now()
+            WHERE id = NEW.blob_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER photo_blobs_refcount
+    AFTER INSERT OR UPDATE OF blob_id OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION photo_blobs_refcount()
+    """,
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema.
+
+    Photos uploaded before keep blob_id NULL and their random-key objects;
+    only new uploads are deduplicated.
+    """
+    op.create_table('photo_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('sha256', sa.String(length=64), nullable=False),
+    sa.Column('url', sa.Text(), nullable=False),
+    sa.Column('content_type', sa.String(length=100), nullable=True),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('thumbnail_bytes', sa.LargeBinary(), nullable=True),
+    sa.Column('thumbnail_object_url', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('sha256')
+    )
+    op.create_index(op.f('ix_photo_blobs_id'), 'photo_blobs', ['id'], unique=False)
+    op.create_index('ix_photo_blobs_unreferenced', 'photo_blobs', ['updated_at'], unique=False, postgresql_where=sa.text('ref_count = 0'))
+    op.add_column('listing_photos', sa.Column('blob_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_listing_photos_blob_id'), 'listing_photos', ['blob_id'], unique=False)
+    op.create_foreign_key('listing_photos_blob_id_fkey', 'listing_photos', 'photo_blobs', ['blob_id'], ['id'])
+
+    for statement in TRIGGER_STATEMENTS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS photo_blobs_refcount ON listing_photos')
+    op.execute('DROP FUNCTION IF EXISTS photo_blobs_refcount()')
+    op.drop_constraint('listing_photos_blob_id_fkey', 'listing_photos', type_='foreignkey')
+    op.drop_index(op.f('ix_listing_photos_blob_id'), table_name='listing_photos')
+    op.drop_column('listing_photos', 'blob_id')
+    op.drop_index('ix_photo_blobs_unreferenced', table_name='photo_blobs')
+    op.drop_index(op.f('ix_photo_blobs_id'), table_name='photo_blobs')
+    op.drop_table('photo_blobs')
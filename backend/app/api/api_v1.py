@@ -2,9 +2,10 @@
 
 from fastapi import APIRouter
 
-from app.api.routes import health, listings, telegram
+from app.api.routes import health, listings, photos, telegram
 
 api_router = APIRouter()
 api_router.include_router(health.router, prefix="/health", tags=["health"])
 api_router.include_router(telegram.router, prefix="/telegram", tags=["telegram"])
 api_router.include_router(listings.router, prefix="/listings", tags=["listings"])
+api_router.include_router(photos.router, prefix="/photos", tags=["photos"])
@@ -1,10 +1,21 @@
 from __future__ import annotations
 
+from dataclasses import asdict
+
 from fastapi import APIRouter
 
+from app.services.cache import get_response_cache
+
 router = APIRouter()
 
 
 @router.get("/", summary="Health check", tags=["health"])
 async def health_check() -> dict[str, str]:
     return {"status": "ok"}
+
+
+@router.get("/cache", summary="Response cache statistics", tags=["health"])
+async def cache_stats() -> dict[str, int | float]:
+    """Hit/miss counters and size of this worker's feed response cache."""
+    stats = get_response_cache().stats()
+    return {**asdict(stats), "hit_ratio": stats.hit_ratio}
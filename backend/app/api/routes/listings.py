@@ -1,66 +1,327 @@
+import asyncio
+import base64
+import hashlib
 import logging
-from typing import List
+import uuid
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any, List, Literal, NamedTuple
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
-from sqlalchemy import select
+from fastapi import (
+    APIRouter,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, literal, select, true, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.session import get_db
-from app.dependencies.auth import get_current_user
+from app.core.config import settings
+from app.db.session import SessionLocal, get_db
+from app.dependencies.auth import get_current_user, require_moderator
+from app.dependencies.filters import get_listing_filters
 from app.models.listing import Listing as ListingModel
+from app.models.listing_card import ListingCard as ListingCardModel
 from app.models.listing_photo import ListingPhoto
-from app.schemas.listing import Listing, ListingCreate, ListingWithSeller
-from app.schemas.photo import PhotoUploadResponse
+from app.schemas.listing import (
+    Listing,
+    ListingCard,
+    ListingCardPage,
+    ListingCreate,
+    ListingFacets,
+    ListingPage,
+    ListingWithSeller,
+)
+from app.schemas.photo import (
+    DirectUploadFinalize,
+    DirectUploadRequest,
+    DirectUploadTarget,
+    PhotoJobResponse,
+    PhotoUploadResponse,
+)
 from app.schemas.user import User
-from app.services.image_processing import image_service
-from app.services.storage import get_storage_service
+from app.services.etag import (
+    REVALIDATE_CACHE_CONTROL,
+    etag_matches,
+    listing_etag,
+    listing_page_etag,
+    not_modified,
+)
+from app.services.feed_cache import (
+    CachedPage,
+    cache_page,
+    feed_cache_key,
+    feed_page_tags,
+    get_cached_page,
+    invalidate_listing,
+    invalidate_new_listing,
+)
+from app.services.image_executor import ImageExecutorBusy, image_executor
+from app.services.image_inspection import IMAGE_CONTENT_TYPES, inspect_upload
+from app.services.listing_export import EXPORT_MEDIA_TYPES, export_listings
+from app.services.listing_filters import ListingFilters, facets_subquery, parse_facets
+from app.services.listing_json import (
+    fetch_photo_rows,
+    listing_rows_select,
+    render_listing_page,
+)
+from app.services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    ListingCursor,
+    decode_cursor,
+    encode_cursor,
+)
+from app.services.photo_blobs import (
+    StoredBlob,
+    blob_key,
+    blob_thumbnail_key,
+    find_blob,
+    record_blob,
+    record_unreferenced,
+)
+from app.services.renditions import enqueue_renditions, rendition_worker
+from app.services.search import build_listing_search, normalize_query
+from app.services.storage import StorageBackend, get_storage_service
+from app.services.storage.streaming import file_too_large, read_upload
+from app.services.thumbnails import store_thumbnail
+from app.services.view_counter import view_counter
 
 router = APIRouter()
 
+MAX_PHOTOS_PER_LISTING = 5
+# Content types accepted for photos uploaded straight to storage
+DIRECT_UPLOAD_CONTENT_TYPES = frozenset(
+    {"image/jpeg", "image/png", "image/gif", "image/webp"}
+)
+
 log = logging.getLogger(__name__)
 
 
-@router.get(
-    "/", response_model=List[ListingWithSeller], summary="List available products"
-)
-async def list_listings(
-    search: str | None = None,
-    current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db),
-) -> list[ListingWithSeller]:
-    """Get all active listings with seller information and photos.
-    
+def _parse_page_params(
+    search: str | None, cursor: str | None
+) -> tuple[str | None, ListingCursor | None]:
+    """Normalize the search query and decode the cursor, rejecting mismatches."""
+    query = normalize_query(search)
+    try:
+        after = decode_cursor(cursor) if cursor else None
+        if after and (after.rank is None) != (query is None):
+            raise ValueError("Cursor does not belong to this query")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return query, after
+
+
+async def _fetch_listing_page(
+    db: AsyncSession,
+    model: type[ListingModel] | type[ListingCardModel],
+    query: str | None,
+    filters: ListingFilters,
+    after: ListingCursor | None,
+    limit: int,
+    *options: Any,
+    base: Select | None = None,
+) -> tuple[list[Any], str | None, ListingFacets | None]:
+    """Fetch one keyset page of listings.
+
+    Listings are ordered newest first by ``(created_at, id)``, so each page is a
+    bounded index range scan regardless of table size. Search results are
+    ordered by relevance first and page the same way.
+
     Args:
-        search: Optional search query to filter by title or description
+        db: Database session
+        model: ``Listing`` or its ``listing_cards`` read model
+        query: Normalized search query, or None for the plain feed
+        filters: Attribute filters
+        after: Cursor of the last row of the previous page
+        limit: Maximum number of listings to return
+        options: Loader options for the listing entities
+        base: Column select over ``model`` to use instead of loading entities
+
+    Returns:
+        Tuple of (``model`` entities, or ``base`` rows, next_cursor, facets).
+        Facets are only computed for the first page.
     """
-    try:
-        # Base query with eager loading
-        stmt = (
-            select(ListingModel)
-            # .where(ListingModel.status == "active")
-            .options(
-                selectinload(ListingModel.seller),
-                selectinload(ListingModel.photos),
-            )
+    stmt = (
+        (base if base is not None else select(model))
+        # .where(model.status == "active")
+        .where(*filters.clauses(model=model))
+        .options(*options)
+    )
+    sort_key: list[Any] = [model.created_at, model.id]
+
+    # Apply ranked full-text search if provided
+    listing_search = None
+    if query:
+        listing_search = build_listing_search(query)
+        if model is not ListingModel:
+            # The search vector only lives on listings
+            stmt = stmt.join(ListingModel, ListingModel.id == model.id)
+        stmt = stmt.add_columns(listing_search.rank.label("rank")).where(
+            listing_search.condition
         )
-        
-        # Apply search filter if provided
-        if search:
-            search_pattern = f"%{search}%"
-            stmt = stmt.where(
-                (ListingModel.title.ilike(search_pattern))
-                | (ListingModel.description.ilike(search_pattern))
+        sort_key.insert(0, listing_search.rank)
+
+    # Continue strictly after the last row of the previous page
+    if after:
+        after_key: list[Any] = [after.created_at, after.id]
+        if query:
+            after_key.insert(0, after.rank)
+        stmt = stmt.where(
+            tuple_(*sort_key)
+            < tuple_(
+                *(
+                    literal(value, column.type)
+                    for column, value in zip(sort_key, after_key)
+                )
             )
-        
-        stmt = stmt.order_by(ListingModel.created_at.desc())
+        )
 
+    # Fetch one extra row to find out whether another page exists
+    stmt = stmt.order_by(*(column.desc() for column in sort_key)).limit(limit + 1)
+
+    facets = None
+    if after is None:
+        # Join the page to the facet counts so both arrive in one round trip;
+        # the outer join keeps the counts when no listing is on the page
+        if base is None:
+            # Entity subqueries would also select deferred columns, such as
+            # the search vector; keep to the columns the entities load
+            loaded: list[Any] = [
+                attr.columns[0]
+                for attr in model.__mapper__.column_attrs
+                if not attr.deferred
+            ]
+            if query:
+                loaded.append(stmt.selected_columns.rank)
+            stmt = stmt.with_only_columns(*loaded)
+        page = stmt.subquery("page")
+        counts = facets_subquery(
+            filters, listing_search.condition if listing_search else None
+        )
+        page_key = [page.c.created_at, page.c.id]
+        if query:
+            page_key.insert(0, page.c.rank)
+        combined = (
+            select(page, counts.c.facets)
+            .select_from(counts)
+            .outerjoin(page, true())
+            .order_by(*(column.desc() for column in page_key))
+        )
+        if base is not None:
+            joined = (await db.execute(combined)).all()
+            rows = [row for row in joined if row.id is not None]
+        else:
+            # Load the entities from the joined rows, matching columns by name
+            rank = [page.c.rank] if query else []
+            joined = (
+                await db.execute(
+                    select(model, *rank, counts.c.facets)
+                    .from_statement(combined)
+                    .options(*options)
+                )
+            ).all()
+            rows = [row for row in joined if row[0] is not None]
+        # Every row carries the counts, and there is always at least one
+        facets = parse_facets(joined[0].facets)
+    else:
         result = await db.execute(stmt)
-        listings = result.scalars().all()
+        rows = list(result.all())
 
-        # The photos relationship will automatically be serialized by Pydantic
-        # using the PhotoResponse schema defined in the Listing schema
-        return listings
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_item = last if base is not None else last[0]
+        next_cursor = encode_cursor(
+            ListingCursor(last_item.created_at, last_item.id, last.rank if query else None)
+        )
+
+    if base is not None:
+        return rows, next_cursor, facets
+    return [row[0] for row in rows], next_cursor, facets
+
+
+def _json_response(etag: str, body: bytes) -> Response:
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL},
+    )
+
+
+async def _listing_page_response(
+    db: AsyncSession,
+    endpoint: str,
+    model: type[ListingModel] | type[ListingCardModel],
+    version: Callable[[Any], Any],
+    search: str | None,
+    filters: ListingFilters,
+    limit: int,
+    cursor: str | None,
+    if_none_match: str | None,
+    render: Callable[[list[Any], str | None, ListingFacets | None], Awaitable[bytes]],
+    *options: Any,
+    base: Select | None = None,
+) -> Response:
+    """Serve a feed page from the cache or the database.
+
+    Rendered pages are cached until a write invalidates them (see
+    ``app.services.feed_cache``). Matching ``If-None-Match`` headers are
+    answered with 304 before anything is serialized.
+
+    Args:
+        db: Database session
+        endpoint: Name distinguishing the cache entries of each feed endpoint
+        model: Entity to page over, see ``_fetch_listing_page``
+        version: Returns a value that changes whenever a row's output changes
+        search: Raw search query
+        filters: Attribute filters
+        limit: Maximum number of listings to return
+        cursor: Opaque cursor from the previous page
+        if_none_match: ``If-None-Match`` request header
+        render: Encodes the response body from rows, next cursor and facets
+        options: Loader options for the listing entities
+        base: Column select to fetch rows with, see ``_fetch_listing_page``
+    """
+    query, after = _parse_page_params(search, cursor)
+    cache_key = feed_cache_key(
+        endpoint, search=query, cursor=cursor, limit=limit, **filters.as_params()
+    )
+
+    cached = await get_cached_page(cache_key)
+    if cached is not None:
+        if etag_matches(if_none_match, cached.etag):
+            return not_modified(cached.etag)
+        return _json_response(cached.etag, cached.body)
+
+    try:
+        listings, next_cursor, facets = await _fetch_listing_page(
+            db, model, query, filters, after, limit, *options, base=base
+        )
+
+        etag = listing_page_etag(
+            cache_key,
+            [(listing.id, version(listing)) for listing in listings],
+            next_cursor,
+            facets,
+        )
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+        page = CachedPage(
+            etag=etag,
+            body=await render(listings, next_cursor, facets),
+        )
+        await cache_page(cache_key, page, feed_page_tags(listings, query, cursor))
+        return _json_response(page.etag, page.body)
 
     except Exception as e:
         raise HTTPException(
@@ -69,6 +330,208 @@ async def list_listings(
         )
 
 
+@router.get("/", response_model=ListingPage, summary="List available products")
+async def list_listings(
+    search: str | None = None,
+    filters: ListingFilters = Depends(get_listing_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Get a page of listings with seller information and all photos.
+
+    Prefer ``GET /listings/cards`` for feeds: this response embeds every
+    photo of every listing. With ``FAST_LISTING_SERIALIZATION``
+    enabled the page is encoded straight from row tuples, producing the same
+    bytes without loading ORM entities or validating through Pydantic.
+
+    Args:
+        search: Optional search query matched against title and description
+        filters: Category, condition, price range, currency and status filters
+        limit: Maximum number of listings to return
+        cursor: Opaque ``next_cursor`` value from the previous page
+    """
+
+    if settings.fast_listing_serialization:
+
+        async def render_rows(
+            rows: list[Any],
+            next_cursor: str | None,
+            facets: ListingFacets | None,
+        ) -> bytes:
+            photos = await fetch_photo_rows(db, [row.id for row in rows])
+            return render_listing_page(rows, photos, next_cursor, facets)
+
+        return await _listing_page_response(
+            db,
+            "listings",
+            ListingModel,
+            lambda row: (row.updated_at, row.seller_updated_at),
+            search,
+            filters,
+            limit,
+            cursor,
+            if_none_match,
+            render_rows,
+            base=listing_rows_select(),
+        )
+
+    async def render(
+        listings: list[ListingModel],
+        next_cursor: str | None,
+        facets: ListingFacets | None,
+    ) -> bytes:
+        # The photos relationship will automatically be serialized by Pydantic
+        # using the PhotoResponse schema defined in the Listing schema
+        page = ListingPage(
+            items=[ListingWithSeller.model_validate(listing) for listing in listings],
+            next_cursor=next_cursor,
+            facets=facets,
+        )
+        return page.model_dump_json().encode()
+
+    return await _listing_page_response(
+        db,
+        "listings",
+        ListingModel,
+        lambda listing: (listing.updated_at, listing.seller.updated_at),
+        search,
+        filters,
+        limit,
+        cursor,
+        if_none_match,
+        render,
+        selectinload(ListingModel.seller),
+        selectinload(ListingModel.photos),
+    )
+
+
+@router.get("/cards", response_model=ListingCardPage, summary="List listing cards")
+async def list_listing_cards(
+    search: str | None = None,
+    filters: ListingFilters = Depends(get_listing_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Get a page of lean listing cards for the feed.
+
+    Served from the ``listing_cards`` read model, so a page is a single
+    indexed range scan with no joins. Cards reference their cover thumbnail
+    by URL instead of embedding it. Paging, search, caching and ETags behave
+    exactly like ``GET /listings/``.
+
+    Args:
+        search: Optional search query matched against title and description
+        filters: Category, condition, price range, currency and status filters
+        limit: Maximum number of listings to return
+        cursor: Opaque ``next_cursor`` value from the previous page
+    """
+
+    async def render(
+        cards: list[ListingCardModel],
+        next_cursor: str | None,
+        facets: ListingFacets | None,
+    ) -> bytes:
+        page = ListingCardPage(
+            items=[ListingCard.from_card(card) for card in cards],
+            next_cursor=next_cursor,
+            facets=facets,
+        )
+        return page.model_dump_json().encode()
+
+    return await _listing_page_response(
+        db,
+        "cards",
+        ListingCardModel,
+        lambda card: card.refreshed_at,
+        search,
+        filters,
+        limit,
+        cursor,
+        if_none_match,
+        render,
+    )
+
+
+@router.get("/export", summary="Export all listings")
+async def export_all_listings(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    include_thumbnails: bool = False,
+    current_user: User = Depends(require_moderator),
+) -> StreamingResponse:
+    """Stream the whole catalogue as NDJSON or CSV (moderators only).
+
+    Rows are read through a server-side cursor and written as they arrive,
+    so memory use does not grow with the catalogue.
+
+    Args:
+        export_format: "ndjson" (one listing per line) or "csv"
+        include_thumbnails: Include base64 photo thumbnails
+    """
+
+    async def stream():
+        # The request's session is closed before the body is streamed
+        async with SessionLocal() as session:
+            async for chunk in export_listings(session, export_format, include_thumbnails):
+                yield chunk
+
+    return StreamingResponse(
+        stream(),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={
+            "Content-Disposition": f'attachment; filename="listings.{export_format}"'
+        },
+    )
+
+
+@router.get(
+    "/{listing_id}", response_model=ListingWithSeller, summary="Get a listing"
+)
+async def get_listing(
+    listing_id: int,
+    if_none_match: str | None = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Get a single listing with seller information and all photos.
+
+    Supports conditional requests through ``ETag`` / ``If-None-Match``.
+    Views by anyone but the seller, including revalidations, are counted
+    through the buffered ``view_counter``.
+    """
+    stmt = (
+        select(ListingModel)
+        .where(ListingModel.id == listing_id)
+        .options(
+            selectinload(ListingModel.seller),
+            selectinload(ListingModel.photos),
+        )
+    )
+    result = await db.execute(stmt)
+    listing = result.scalar_one_or_none()
+
+    if not listing:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Listing not found",
+        )
+
+    if listing.seller_id != current_user.id:
+        view_counter.record(listing.id)
+
+    etag = listing_etag(listing)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    body = ListingWithSeller.model_validate(listing).model_dump_json().encode()
+    return _json_response(etag, body)
+
+
 @router.post(
     "/",
     response_model=Listing,
@@ -108,6 +571,7 @@ async def create_listing(
         db.add(new_listing)
         await db.commit()
         await db.refresh(new_listing)
+        await invalidate_new_listing()
 
         return Listing(
             id=new_listing.id,
@@ -130,6 +594,105 @@ async def create_listing(
         )
 
 
+class ProcessedPhoto(NamedTuple):
+    """A photo stored in object storage, with its thumbnail."""
+
+    url: str
+    thumbnail: bytes | None  # None if only stored as an object
+    thumbnail_url: str | None  # Set if the thumbnail is stored as an object
+    file_size: int
+    filename: str | None
+    sha256: str
+    blob_id: int | None  # Set if the file was already stored
+    renditions: list[dict[str, Any]] | None = None  # Set if the blob was rendered
+
+
+async def _process_photo(
+    db: AsyncSession,
+    db_lock: asyncio.Lock,
+    storage_service: StorageBackend,
+    photo: UploadFile,
+    stored: list[StoredBlob],
+) -> ProcessedPhoto:
+    """Thumbnail and upload one photo, both at the same time.
+
+    The photo is hashed while it is read. If identical bytes were stored
+    before, their object, thumbnail and renditions are reused and nothing
+    is uploaded, thumbnailed or rendered. Otherwise the file is stored
+    under its content key and appended to ``stored``, even if thumbnailing
+    it fails afterwards.
+    """
+    storage_service.validate_file(photo)
+    # Format and dimensions from the header; no bytes are buffered for
+    # non-images or decompression bombs
+    info = await inspect_upload(photo, settings.image_max_pixels)
+    content_type = IMAGE_CONTENT_TYPES[info.format]
+    # One bounded read; thumbnailer and upload share the buffer
+    digest = hashlib.sha256()
+    file_contents = await read_upload(photo, storage_service.MAX_FILE_SIZE, digest)
+    sha256 = digest.hexdigest()
+
+    # The session is shared by the photos processed concurrently
+    async with db_lock:
+        blob = await find_blob(db, sha256)
+    if blob is not None and (blob.thumbnail_bytes or blob.thumbnail_object_url):
+        return ProcessedPhoto(
+            blob.url,
+            blob.thumbnail_bytes,
+            blob.thumbnail_object_url,
+            len(file_contents),
+            photo.filename,
+            sha256,
+            blob.id,
+            blob.renditions,
+        )
+
+    thumbnail, url = await asyncio.gather(
+        _thumbnail(photo.filename, file_contents),
+        storage_service.upload_object(blob_key(sha256), file_contents, content_type),
+        return_exceptions=True,
+    )
+    if isinstance(url, BaseException):
+        raise url
+    new_blob = StoredBlob(sha256, url, content_type, len(file_contents))
+    try:
+        if isinstance(thumbnail, BaseException):
+            raise thumbnail
+        thumbnail_url = await store_thumbnail(
+            storage_service, thumbnail, blob_thumbnail_key(sha256)
+        )
+    except BaseException:
+        stored.append(new_blob)
+        raise
+    stored.append(
+        new_blob._replace(
+            # Inline unless stored as an object (THUMBNAIL_STORAGE)
+            thumbnail_bytes=None if thumbnail_url else thumbnail,
+            thumbnail_object_url=thumbnail_url,
+        )
+    )
+    return ProcessedPhoto(
+        url, thumbnail, thumbnail_url, len(file_contents), photo.filename, sha256, None
+    )
+
+
+async def _thumbnail(filename: str | None, file_contents: memoryview) -> bytes:
+    """Generate a thumbnail off the event loop, mapping errors to HTTP errors."""
+    try:
+        return await image_executor.generate_thumbnail(file_contents)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to process image '{filename}': {str(e)}",
+        )
+    except (ImageExecutorBusy, TimeoutError):
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Image processing is busy, try again later",
+            headers={"Retry-After": "5"},
+        )
+
+
 @router.post(
     "/{listing_id}/photos",
     response_model=List[PhotoUploadResponse],
@@ -145,9 +708,115 @@ async def upload_listing_photos(
 
     Only the listing owner can upload photos.
     Maximum 5 photos per listing.
+    Photos are thumbnailed and uploaded concurrently; files stored before
+    are reused. If any photo fails, none are saved, and files uploaded for
+    them are left unreferenced for ``purge_unreferenced_blobs``.
     """
-    # Check if listing exists and belongs to current user
+    # Locked until commit, so concurrent uploads cannot both pass the limit
+    listing = await _owned_listing(db, listing_id, current_user, for_update=True)
+    existing = await _check_photo_limit(db, listing_id, len(photos))
+
+    stored: list[StoredBlob] = []
+    try:
+        storage_service = get_storage_service()
+
+        # Thumbnailing and storage uploads of all photos overlap; at most
+        # MAX_PHOTOS_PER_LISTING are in flight, and image_executor bounds the
+        # CPU work across requests
+        db_lock = asyncio.Lock()
+        outcomes = await asyncio.gather(
+            *(
+                _process_photo(db, db_lock, storage_service, photo, stored)
+                for photo in photos
+            ),
+            return_exceptions=True,
+        )
+        processed = [o for o in outcomes if isinstance(o, ProcessedPhoto)]
+        failures = [o for o in outcomes if isinstance(o, BaseException)]
+        if failures:
+            # All or nothing: the first failure in photo order is reported
+            raise failures[0]
+
+        # References are counted by a trigger when the photos are inserted
+        blob_ids = {blob.sha256: await record_blob(db, blob) for blob in stored}
+        new_photos = [
+            ListingPhoto(
+                listing_id=listing_id,
+                photo_url=photo_data.url,
+                blob_id=photo_data.blob_id or blob_ids[photo_data.sha256],
+                display_order=existing + idx,
+                thumbnail_bytes=(
+                    None if photo_data.thumbnail_url else photo_data.thumbnail
+                ),
+                thumbnail_object_url=photo_data.thumbnail_url,
+                file_size_bytes=photo_data.file_size,
+                renditions=photo_data.renditions,
+                original_filename=photo_data.filename,
+            )
+            for idx, photo_data in enumerate(processed)
+        ]
+        db.add_all(new_photos)
+        # Renditions are produced in the background, unless the blob has them
+        jobs = await enqueue_renditions(db, new_photos)
+
+        # Photos are part of the listing representation; bump its version
+        listing.updated_at = func.now()
+
+        await db.commit()
+        rendition_worker.wake()
+        await invalidate_listing(listing_id)
+        return [
+            PhotoUploadResponse(
+                url=p.url,
+                thumbnail=(
+                    base64.b64encode(p.thumbnail).decode() if p.thumbnail else None
+                ),
+                id=photo.id,
+                job=PhotoJobResponse(
+                    id=job.id,
+                    photo_id=photo.id,
+                    status=job.status,
+                    attempts=job.attempts,
+                ),
+            )
+            for p, photo, job in zip(processed, new_photos, jobs)
+        ]
+
+    except BaseException as e:
+        await db.rollback()
+        # Other uploads may already share the files; the purge decides
+        try:
+            await record_unreferenced(db, stored)
+        except Exception:
+            log.exception("Failed to record unreferenced photo files")
+
+        if isinstance(e, ValueError):
+            # Validation error
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e),
+            )
+        if isinstance(e, HTTPException) or not isinstance(e, Exception):
+            # Re-raise HTTP exceptions and cancellation
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to upload photos: {str(e)}",
+        )
+
+
+def direct_upload_prefix(listing_id: int) -> str:
+    """Storage key prefix of photos uploaded straight to storage for a listing."""
+    return f"uploads/{listing_id}/"
+
+
+async def _owned_listing(
+    db: AsyncSession, listing_id: int, current_user: User, for_update: bool = False
+) -> ListingModel:
+    """Load a listing the current user may add photos to, optionally locking it."""
     stmt = select(ListingModel).where(ListingModel.id == listing_id)
+    if for_update:
+        stmt = stmt.with_for_update()
     result = await db.execute(stmt)
     listing = result.scalar_one_or_none()
 
@@ -162,78 +831,204 @@ async def upload_listing_photos(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="You can only upload photos to your own listings",
         )
+    return listing
 
-    # Check existing photo count
-    stmt = select(ListingPhoto).where(ListingPhoto.listing_id == listing_id)
-    result = await db.execute(stmt)
-    existing_photos = result.scalars().all()
 
-    if len(existing_photos) + len(photos) > 5:
+async def _check_photo_limit(db: AsyncSession, listing_id: int, adding: int) -> int:
+    """Reject adding photos beyond the limit; returns the existing count."""
+    result = await db.execute(
+        select(func.count())
+        .select_from(ListingPhoto)
+        .where(ListingPhoto.listing_id == listing_id)
+    )
+    existing = result.scalar_one()
+    if existing + adding > MAX_PHOTOS_PER_LISTING:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Maximum 5 photos per listing. Currently {len(existing_photos)} photos exist.",
+            detail=(
+                f"Maximum {MAX_PHOTOS_PER_LISTING} photos per listing. "
+                f"Currently {existing} photos exist."
+            ),
         )
+    return existing
+
+
+@router.post(
+    "/{listing_id}/photos/presign",
+    response_model=List[DirectUploadTarget],
+    summary="Presign direct photo uploads for a listing",
+)
+async def presign_listing_photos(
+    listing_id: int,
+    upload: DirectUploadRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> list[DirectUploadTarget]:
+    """Authorize uploading photos straight to storage, bypassing the API.
+
+    Returns one target per file, in request order. Upload each file to its
+    target, then pass the keys to ``POST /listings/{id}/photos/finalize``.
+    Where the backend supports it (S3 POST policies), storage itself
+    rejects other keys, content types and sizes above the limit;
+    finalizing checks them again.
+    """
+    await _owned_listing(db, listing_id, current_user)
+    await _check_photo_limit(db, listing_id, len(upload.files))
+
+    storage_service = get_storage_service()
+    keys = []
+    for file in upload.files:
+        ext = Path(file.filename).suffix.lower()
+        if (
+            ext not in storage_service.ALLOWED_IMAGE_EXTENSIONS
+            or file.content_type not in DIRECT_UPLOAD_CONTENT_TYPES
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid file type of '{file.filename}'",
+            )
+        if file.size > storage_service.MAX_FILE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(file_too_large(storage_service.MAX_FILE_SIZE)),
+            )
+        keys.append(f"{direct_upload_prefix(listing_id)}{uuid.uuid4()}{ext}")
 
     try:
-        storage_service = get_storage_service()
-        uploaded_photos = []
-
-        for idx, photo in enumerate(photos):
-            # Read file contents for both upload and thumbnail generation
-            file_contents = await photo.read()
-            file_size = len(file_contents)
-
-            # Reset file pointer for storage upload
-            await photo.seek(0)
-
-            # Generate thumbnail from image data
-            try:
-                thumbnail_base64 = image_service.generate_thumbnail(file_contents)
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Failed to process image '{photo.filename}': {str(e)}",
+        targets = await asyncio.gather(
+            *(
+                storage_service.presign_upload(
+                    key,
+                    file.content_type,
+                    storage_service.MAX_FILE_SIZE,
+                    settings.direct_upload_expires_seconds,
                 )
+                for key, file in zip(keys, upload.files)
+            )
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to presign uploads: {str(e)}",
+        )
+    return [DirectUploadTarget(**target._asdict()) for target in targets]
+
 
-            # Upload to storage
-            photo_url = await storage_service.upload_file(photo, folder="listings")
+@router.post(
+    "/{listing_id}/photos/finalize",
+    response_model=List[PhotoUploadResponse],
+    summary="Attach directly uploaded photos to a listing",
+)
+async def finalize_listing_photos(
+    listing_id: int,
+    upload: DirectUploadFinalize,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> list[PhotoUploadResponse]:
+    """Add photos uploaded with presigned targets to a listing.
 
-            # Create database record with thumbnail
-            display_order = len(existing_photos) + idx
-            photo_record = ListingPhoto(
+    Every object is checked with a HEAD request; objects of a disallowed
+    type or size are deleted. The photos are added all or nothing, and
+    thumbnails and renditions are produced in the background. Uploads
+    that are never finalized are left in storage.
+    """
+    # The row lock serializes finalizations, so the photo limit holds
+    listing = await _owned_listing(db, listing_id, current_user, for_update=True)
+
+    prefix = direct_upload_prefix(listing_id)
+    keys = [photo.key for photo in upload.photos]
+    if len(set(keys)) != len(keys) or any(
+        not key.startswith(prefix) or "/" in key[len(prefix) :] for key in keys
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Photo keys must be distinct keys presigned for this listing",
+        )
+    existing = await _check_photo_limit(db, listing_id, len(keys))
+
+    storage_service = get_storage_service()
+    urls = [storage_service.public_url(key) for key in keys]
+    result = await db.execute(
+        select(func.count())
+        .select_from(ListingPhoto)
+        .where(ListingPhoto.photo_url.in_(urls))
+    )
+    if result.scalar_one():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Photos were already added",
+        )
+
+    try:
+        heads = await asyncio.gather(
+            *(storage_service.head_object(key) for key in keys)
+        )
+        missing = [key for key, info in zip(keys, heads) if info is None]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Photos not uploaded: {', '.join(missing)}",
+            )
+        objects = [info for info in heads if info is not None]
+        invalid = [
+            url
+            for url, info in zip(urls, objects)
+            if info.size > storage_service.MAX_FILE_SIZE
+            or (info.content_type or "").split(";")[0].strip()
+            not in DIRECT_UPLOAD_CONTENT_TYPES
+        ]
+        if invalid:
+            deleted = await storage_service.delete_files(invalid)
+            for url, error in deleted.failed.items():
+                log.warning("Failed to delete rejected upload %s: %s", url, error)
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=(
+                    "Photos must be images of at most "
+                    f"{storage_service.MAX_FILE_SIZE / 1024 / 1024}MB"
+                ),
+            )
+
+        new_photos = [
+            ListingPhoto(
                 listing_id=listing_id,
-                photo_url=photo_url,
-                display_order=display_order,
-                thumbnail_data=thumbnail_base64,
-                file_size_bytes=file_size,
+                photo_url=url,
+                display_order=existing + idx,
+                file_size_bytes=info.size,
                 original_filename=photo.filename,
             )
-            db.add(photo_record)
+            for idx, (url, info, photo) in enumerate(zip(urls, objects, upload.photos))
+        ]
+        db.add_all(new_photos)
+        # Thumbnails and renditions are produced in the background
+        jobs = await enqueue_renditions(db, new_photos)
 
-            uploaded_photos.append(
-                PhotoUploadResponse(url=photo_url, thumbnail=thumbnail_base64)
-            )
+        # Photos are part of the listing representation; bump its version
+        listing.updated_at = func.now()
 
         await db.commit()
-        return uploaded_photos
+        rendition_worker.wake()
+        await invalidate_listing(listing_id)
+        return [
+            PhotoUploadResponse(
+                url=photo.photo_url,
+                id=photo.id,
+                job=PhotoJobResponse(
+                    id=job.id,
+                    photo_id=photo.id,
+                    status=job.status,
+                    attempts=job.attempts,
+                ),
+            )
+            for photo, job in zip(new_photos, jobs)
+        ]
 
-    except ValueError as e:
-        # Validation error
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=str(e),
-        )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
+    except BaseException as e:
         await db.rollback()
-        # Clean up uploaded files
-        storage_service = get_storage_service()
-        for photo_resp in uploaded_photos:
-            storage_service.delete_file(photo_resp.url)
-
+        if isinstance(e, HTTPException) or not isinstance(e, Exception):
+            # Re-raise HTTP exceptions and cancellation
+            raise
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to upload photos: {str(e)}",
+            detail=f"Failed to add photos: {str(e)}",
         )
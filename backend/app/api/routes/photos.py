@@ -0,0 +1,122 @@
+"""Listing photo endpoints."""
+
+import base64
+import binascii
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import RedirectResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.dependencies.auth import get_current_user
+from app.models.listing_photo import ListingPhoto
+from app.models.photo_job import PhotoJob
+from app.schemas.photo import PhotoJobResponse
+from app.schemas.user import User
+from app.services.etag import compute_etag, etag_matches, not_modified
+
+router = APIRouter()
+
+# Photos are never modified after upload, so a thumbnail URL always maps to
+# the same bytes and can be cached for a year.
+THUMBNAIL_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+@router.get(
+    "/{photo_id}/thumb",
+    response_class=Response,
+    responses={200: {"content": {"image/jpeg": {}}}},
+    summary="Get photo thumbnail",
+)
+async def get_photo_thumbnail(
+    photo_id: int,
+    if_none_match: str | None = Header(None),
+    db: AsyncSession = Depends(get_db),
+) -> Response:
+    """Serve the JPEG thumbnail of a listing photo as binary.
+
+    Public so that it can be used directly as an ``<img>`` source, which
+    cannot send the Telegram ``Authorization`` header. Revalidation is
+    answered without touching the database since thumbnails never change.
+    Thumbnails stored as objects are a cacheable redirect to the object.
+    """
+    etag = compute_etag("thumb", photo_id)
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag, THUMBNAIL_CACHE_CONTROL)
+
+    stmt = select(
+        ListingPhoto.thumbnail_bytes,
+        ListingPhoto.thumbnail_object_url,
+        ListingPhoto.thumbnail_data,
+    ).where(ListingPhoto.id == photo_id)
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+
+    if row is None or not (
+        row.thumbnail_bytes or row.thumbnail_object_url or row.thumbnail_data
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Thumbnail not found",
+        )
+
+    if row.thumbnail_object_url:
+        return RedirectResponse(
+            row.thumbnail_object_url,
+            status_code=status.HTTP_301_MOVED_PERMANENTLY,
+            headers={"Cache-Control": THUMBNAIL_CACHE_CONTROL},
+        )
+
+    content = row.thumbnail_bytes
+    if content is None:
+        # Not backfilled yet
+        try:
+            content = base64.b64decode(row.thumbnail_data)
+        except binascii.Error as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Stored thumbnail is corrupt",
+            ) from e
+
+    return Response(
+        content=content,
+        media_type="image/jpeg",
+        headers={"ETag": etag, "Cache-Control": THUMBNAIL_CACHE_CONTROL},
+    )
+
+
+@router.get(
+    "/{photo_id}/renditions",
+    response_model=PhotoJobResponse,
+    summary="Get photo rendition status",
+)
+async def get_photo_renditions(
+    photo_id: int,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+) -> PhotoJobResponse:
+    """Get the status of a photo's latest rendition job and its renditions."""
+    stmt = (
+        select(PhotoJob.id, PhotoJob.status, PhotoJob.attempts, ListingPhoto.renditions)
+        .join(ListingPhoto, ListingPhoto.id == PhotoJob.photo_id)
+        .where(PhotoJob.photo_id == photo_id)
+        .order_by(PhotoJob.id.desc())
+        .limit(1)
+    )
+    result = await db.execute(stmt)
+    row = result.one_or_none()
+
+    if row is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Rendition job not found",
+        )
+
+    return PhotoJobResponse(
+        id=row.id,
+        photo_id=photo_id,
+        status=row.status,
+        attempts=row.attempts,
+        renditions=row.renditions,
+    )
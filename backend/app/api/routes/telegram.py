@@ -2,23 +2,104 @@
 
 import logging
 
+import jwt
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
+from app.core.security import (
+    REFRESH_TOKEN_TYPE,
+    create_access_token,
+    create_refresh_token,
+    decode_token,
+)
 from app.db.session import get_db
+from app.dependencies.auth import get_or_create_user
 from app.models.user import User as UserModel
-from app.schemas.telegram import TelegramAuthRequest, TelegramAuthResponse, TelegramUser
-from app.services.telegram import (
-    TelegramAuthError,
-    verify_telegram_auth,
-)
+from app.schemas.telegram import TelegramAuthRequest, TokenRefreshRequest, TokenResponse
+from app.services.telegram import TelegramAuthError, verify_telegram_auth
 
 router = APIRouter()
 
 log = logging.getLogger(__name__)
 
 
+def _issue_tokens(user: UserModel) -> TokenResponse:
+    """Issue an access/refresh token pair for a user."""
+    if not settings.secret_key:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Token authentication is not configured",
+        )
+
+    # Everything get_current_user needs, so requests skip the users lookup
+    claims = {
+        "tid": user.telegram_id,
+        "role": user.role,
+        "username": user.username,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "ver": user.token_version,
+    }
+    return TokenResponse(
+        access_token=create_access_token(user.id, extra_claims=claims),
+        refresh_token=create_refresh_token(user.id, user.token_version),
+        expires_in=settings.access_token_expire_minutes * 60,
+    )
+
+
+@router.post("/token", response_model=TokenResponse, summary="Exchange init data for tokens")
+async def exchange_token(
+    payload: TelegramAuthRequest, db: AsyncSession = Depends(get_db)
+) -> TokenResponse:
+    """Verify Telegram init data once and issue session tokens.
+
+    Send the access token as ``Authorization: Bearer <token>``; it carries
+    the user id and role, so authenticated requests need no database
+    lookup. Users are created on first exchange, as with raw init data.
+
+    Unlike raw init data headers, the init data must carry a valid
+    signature: there is no lenient fallback and no cache lookup.
+    """
+    # TelegramAuthError is a 401 response
+    user_data = verify_telegram_auth(payload.init_data)
+    if not isinstance(user_data, dict) or not user_data.get("id"):
+        raise TelegramAuthError()
+    user = await get_or_create_user(db, user_data)
+    return _issue_tokens(user)
+
+
+@router.post(
+    "/token/refresh", response_model=TokenResponse, summary="Refresh session tokens"
+)
+async def refresh_token(
+    payload: TokenRefreshRequest, db: AsyncSession = Depends(get_db)
+) -> TokenResponse:
+    """Exchange a refresh token for a new token pair.
+
+    Refresh tokens are revoked when the user's ``token_version`` changes,
+    which happens on every role change, so new tokens always carry the
+    current role.
+    """
+    try:
+        claims = decode_token(payload.refresh_token, REFRESH_TOKEN_TYPE)
+        user_id = int(claims["sub"])
+        token_version = claims["ver"]
+    except (jwt.InvalidTokenError, KeyError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        ) from exc
+
+    user = await db.get(UserModel, user_id)
+    if user is None or user.token_version != token_version:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token has been revoked",
+        )
+    return _issue_tokens(user)
+
+
 # NOTE: This endpoint is no longer needed - users are auto-created on first authenticated request
 # via get_current_user() dependency. Keeping this commented for reference.
 #
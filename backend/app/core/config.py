@@ -30,6 +30,22 @@ class Settings(BaseSettings):
 
     telegram_bot_token: str = Field(default="", validation_alias="TELEGRAM_BOT_TOKEN")
     telegram_webhook_url: AnyHttpUrl | None = None
+    # Session tokens issued by POST /telegram/token; empty key disables them
+    secret_key: str = Field(default="", validation_alias="SECRET_KEY")
+    access_token_expire_minutes: int = Field(
+        default=15, validation_alias="ACCESS_TOKEN_EXPIRE_MINUTES"
+    )
+    refresh_token_expire_days: int = Field(
+        default=30, validation_alias="REFRESH_TOKEN_EXPIRE_DAYS"
+    )
+
+    # Verified initData is cached until auth_date + max age
+    telegram_auth_max_age_seconds: int = Field(
+        default=24 * 60 * 60, validation_alias="TELEGRAM_AUTH_MAX_AGE_SECONDS"
+    )
+    telegram_auth_cache_size: int = Field(
+        default=10000, validation_alias="TELEGRAM_AUTH_CACHE_SIZE"
+    )
 
     # Storage backend configuration
     storage_backend: str = Field(
@@ -51,6 +67,14 @@ class Settings(BaseSettings):
     s3_public_url_base: str | None = Field(
         default=None, validation_alias="S3_PUBLIC_URL_BASE"
     )
+    # Uploads of at least this many bytes use multipart upload
+    s3_multipart_threshold_bytes: int = Field(
+        default=8 * 1024 * 1024, validation_alias="S3_MULTIPART_THRESHOLD_BYTES"
+    )
+    # S3 requires parts of at least 5 MiB, except the last one
+    s3_multipart_part_size_bytes: int = Field(
+        default=5 * 1024 * 1024, validation_alias="S3_MULTIPART_PART_SIZE_BYTES"
+    )
 
     # Supabase storage settings
     supabase_url: str | None = Field(default=None, validation_alias="SUPABASE_URL")
@@ -59,5 +83,108 @@ class Settings(BaseSettings):
         default="listing-photos", validation_alias="SUPABASE_BUCKET"
     )
 
+    # HTTP connection pool shared by the storage backend's requests
+    storage_max_connections: int = Field(
+        default=20, validation_alias="STORAGE_MAX_CONNECTIONS"
+    )
+    storage_max_keepalive_connections: int = Field(
+        default=10, validation_alias="STORAGE_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    storage_keepalive_expiry_seconds: float = Field(
+        default=30.0, validation_alias="STORAGE_KEEPALIVE_EXPIRY_SECONDS"
+    )
+    storage_timeout_seconds: float = Field(
+        default=30.0, validation_alias="STORAGE_TIMEOUT_SECONDS"
+    )
+    storage_connect_timeout_seconds: float = Field(
+        default=5.0, validation_alias="STORAGE_CONNECT_TIMEOUT_SECONDS"
+    )
+
+    # Feed/search response cache
+    cache_backend: str = Field(
+        default="memory", validation_alias="CACHE_BACKEND"
+    )  # "memory" or "redis"
+    cache_ttl_seconds: float = Field(default=60.0, validation_alias="CACHE_TTL_SECONDS")
+    cache_max_entries: int = Field(default=1000, validation_alias="CACHE_MAX_ENTRIES")
+    cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, validation_alias="CACHE_MAX_BYTES"
+    )
+    redis_url: str | None = Field(default=None, validation_alias="REDIS_URL")
+
+    # telegram_id -> user cache used by initData authentication; with the
+    # memory backend, role changes take up to the TTL to reach API processes
+    identity_cache_ttl_seconds: float = Field(
+        default=300.0, validation_alias="IDENTITY_CACHE_TTL_SECONDS"
+    )
+    identity_cache_max_entries: int = Field(
+        default=10000, validation_alias="IDENTITY_CACHE_MAX_ENTRIES"
+    )
+    # Minimum seconds between profile updates from Telegram data per user
+    profile_sync_interval_seconds: float = Field(
+        default=3600.0, validation_alias="PROFILE_SYNC_INTERVAL_SECONDS"
+    )
+
+    # Pool for CPU-bound image work: "process" (thread fallback) or "thread"
+    image_executor: str = Field(default="process", validation_alias="IMAGE_EXECUTOR")
+    image_workers: int = Field(default=0, validation_alias="IMAGE_WORKERS")  # 0 = CPUs
+    image_max_pending: int = Field(default=32, validation_alias="IMAGE_MAX_PENDING")
+    image_timeout_seconds: float = Field(
+        default=30.0, validation_alias="IMAGE_TIMEOUT_SECONDS"
+    )
+
+    # Images with more pixels are rejected from their header, before decoding
+    image_max_pixels: int = Field(
+        default=50_000_000, validation_alias="IMAGE_MAX_PIXELS"
+    )
+
+    # Where thumbnails are kept: "bytea" in listing_photos, or "object" in storage
+    thumbnail_storage: str = Field(default="bytea", validation_alias="THUMBNAIL_STORAGE")
+
+    # Seconds an unreferenced photo file is kept for re-uploads before purging
+    photo_blob_grace_seconds: float = Field(
+        default=86400.0, validation_alias="PHOTO_BLOB_GRACE_SECONDS"
+    )
+
+    # Minimum age of a storage object no row references before it is deleted
+    # as an orphan; covers uploads whose rows are not committed yet
+    orphan_grace_seconds: float = Field(
+        default=86400.0, validation_alias="ORPHAN_GRACE_SECONDS"
+    )
+
+    # Seconds a presigned direct upload to storage stays valid
+    direct_upload_expires_seconds: int = Field(
+        default=600, validation_alias="DIRECT_UPLOAD_EXPIRES_SECONDS"
+    )
+
+    # Background photo renditions (WebP/JPEG at several widths)
+    rendition_widths: list[int] = Field(
+        default=[160, 480, 1080], validation_alias="RENDITION_WIDTHS"
+    )
+    rendition_formats: list[str] = Field(
+        default=["webp", "jpeg"], validation_alias="RENDITION_FORMATS"
+    )
+    # Worker tasks per API process; 0 leaves jobs to scripts.rendition_worker
+    rendition_workers: int = Field(default=1, validation_alias="RENDITION_WORKERS")
+    rendition_poll_interval_seconds: float = Field(
+        default=2.0, validation_alias="RENDITION_POLL_INTERVAL_SECONDS"
+    )
+    rendition_max_attempts: int = Field(
+        default=5, validation_alias="RENDITION_MAX_ATTEMPTS"
+    )
+    # Jobs left running longer than this (e.g. by a crashed worker) are retried
+    rendition_lease_seconds: float = Field(
+        default=300.0, validation_alias="RENDITION_LEASE_SECONDS"
+    )
+
+    # Seconds between batched writes of buffered listing views
+    view_flush_interval_seconds: float = Field(
+        default=5.0, validation_alias="VIEW_FLUSH_INTERVAL_SECONDS"
+    )
+
+    # Encode GET /listings/ pages from row tuples instead of ORM + Pydantic
+    fast_listing_serialization: bool = Field(
+        default=False, validation_alias="FAST_LISTING_SERIALIZATION"
+    )
+
 
 settings = Settings()
@@ -10,18 +10,50 @@ from app.core.config import settings
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+ACCESS_TOKEN_TYPE = "access"
+REFRESH_TOKEN_TYPE = "refresh"
+
 
 def create_access_token(
-    subject: str | Any, expires_delta: timedelta | None = None
+    subject: str | Any,
+    expires_delta: timedelta | None = None,
+    extra_claims: dict[str, Any] | None = None,
 ) -> str:
     """Create a JWT access token for the given subject."""
     expire = datetime.now(timezone.utc) + (
         expires_delta or timedelta(minutes=settings.access_token_expire_minutes)
     )
-    to_encode = {"exp": expire, "sub": str(subject)}
+    to_encode = {"typ": ACCESS_TOKEN_TYPE, **(extra_claims or {})}
+    to_encode.update({"exp": expire, "sub": str(subject)})
     return jwt.encode(to_encode, settings.secret_key, algorithm="HS256")
 
 
+def create_refresh_token(subject: str | Any, token_version: int) -> str:
+    """Create a long-lived JWT that can only be exchanged for new tokens."""
+    return create_access_token(
+        subject,
+        timedelta(days=settings.refresh_token_expire_days),
+        {"typ": REFRESH_TOKEN_TYPE, "ver": token_version},
+    )
+
+
+def decode_token(token: str, token_type: str = ACCESS_TOKEN_TYPE) -> dict[str, Any]:
+    """Verify a token's signature, expiry and type and return its claims.
+
+    Raises:
+        jwt.InvalidTokenError: If the token is invalid, expired, of another
+            type, or tokens are not configured
+    """
+    if not settings.secret_key:
+        raise jwt.InvalidTokenError("Token authentication is not configured")
+    claims = jwt.decode(
+        token, settings.secret_key, algorithms=["HS256"], options={"require": ["exp", "sub"]}
+    )
+    if claims.get("typ") != token_type:
+        raise jwt.InvalidTokenError("Wrong token type")
+    return claims
+
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
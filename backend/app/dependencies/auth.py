@@ -1,84 +1,166 @@
 """Authentication dependencies exposing the current user."""
 
 import json
+from typing import Any
 from urllib.parse import parse_qsl
 
+import jwt
 from fastapi import Depends, Header, HTTPException, status
-from sqlalchemy import select
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import decode_token
 from app.db.session import get_db
 from app.models.user import User as UserModel
 from app.schemas.user import User
-from app.services.telegram import TelegramAuthError, verify_telegram_auth
+from app.services.identity_cache import (
+    cache_identity,
+    get_cached_identity,
+    identity_from_model,
+    profile_changes,
+    profile_sync_due,
+    sync_profile,
+)
+from app.services.telegram import (
+    TelegramAuthError,
+    init_data_cache,
+    verify_telegram_auth,
+)
+
+
+def _parse_unsigned_user_data(authorization: str) -> dict[str, Any]:
+    """Parse the user payload of init data whose signature did not verify."""
+    try:
+        parsed = dict(parse_qsl(authorization))
+        user_data = json.loads(parsed.get("user", "{}"))
+    except (KeyError, json.JSONDecodeError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Malformed Telegram authentication data",
+        ) from exc
+
+    if not isinstance(user_data, dict) or not user_data.get("id"):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Telegram authentication data",
+        )
+    return user_data
+
+
+def verify_init_data(init_data: str) -> dict[str, Any]:
+    """Return the Telegram user payload of init data, verifying it on a cache miss.
+
+    Only init data whose signature verifies is cached. Otherwise the user
+    payload is parsed leniently (the bot token may not match although the
+    data comes from Telegram), which is good enough for per-request header
+    auth but must never back long-lived session tokens.
+    """
+    user_data = init_data_cache.get(init_data)
+    if user_data is not None:
+        return user_data
+    try:
+        user_data = verify_telegram_auth(init_data)
+    except TelegramAuthError:
+        return _parse_unsigned_user_data(init_data)
+    init_data_cache.put(init_data, user_data)
+    return user_data
+
+
+async def get_or_create_user(db: AsyncSession, user_data: dict[str, Any]) -> UserModel:
+    """Load the user for a Telegram payload, creating them as 'unverified' if new.
+
+    A single ``INSERT ... ON CONFLICT (telegram_id) DO UPDATE ... RETURNING``
+    statement, so concurrent first requests of one user cannot race on the
+    unique index. Existing rows only get their ``language_code`` refreshed;
+    other profile fields are synced by ``app.services.identity_cache``.
+    """
+    new_user = insert(UserModel).values(
+        telegram_id=user_data["id"],
+        username=user_data.get("username"),
+        first_name=user_data.get("first_name", ""),
+        last_name=user_data.get("last_name"),
+        language_code=user_data.get("language_code"),
+        photo_url=user_data.get("photo_url"),
+        role="unverified",  # New users start as unverified
+    )
+    stmt = new_user.on_conflict_do_update(
+        index_elements=[UserModel.telegram_id],
+        # DO UPDATE rather than DO NOTHING so RETURNING yields existing rows
+        set_={
+            "language_code": func.coalesce(
+                new_user.excluded.language_code, UserModel.language_code
+            )
+        },
+    ).returning(UserModel)
+    result = await db.execute(stmt, execution_options={"populate_existing": True})
+    user = result.scalar_one()
+    await db.commit()
+    return user
+
+
+def _user_from_token(token: str) -> User:
+    """Build the current user from a session token's claims alone."""
+    try:
+        claims = decode_token(token)
+        return User(
+            id=int(claims["sub"]),
+            telegram_id=claims["tid"],
+            username=claims.get("username"),
+            first_name=claims["first_name"],
+            last_name=claims.get("last_name"),
+            role=claims["role"],
+        )
+    except (jwt.InvalidTokenError, KeyError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from exc
 
 
 async def get_current_user(
     authorization: str = Header(...),
     db: AsyncSession = Depends(get_db),
 ) -> User:
-    """Get the current authenticated user from Telegram auth data.
+    """Get the current authenticated user from a session token or Telegram auth data.
 
-    Expects Authorization header with Telegram initData.
+    Expects Authorization header with either ``Bearer <token>`` issued by
+    ``POST /telegram/token`` or raw Telegram initData. Tokens are verified
+    without touching the database.
     If user doesn't exist in DB, creates them automatically with 'unverified' role.
 
     Uses lenient verification: tries strict HMAC verification first, then falls back
     to parsing the Telegram-formatted data (safe since it comes from Telegram SDK).
+    Verified init data is cached, so repeat requests skip verification, and users are
+    looked up through the identity cache. Changed Telegram profile fields are
+    written back at most once per ``PROFILE_SYNC_INTERVAL_SECONDS``.
     """
-    user_data = None
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() == "bearer" and token:
+        return _user_from_token(token)
 
-    # Try strict verification first
-    try:
-        user_data = verify_telegram_auth(authorization)
-    except TelegramAuthError:
-        # Strict verification failed - try lenient parsing
-        # This handles cases where bot token doesn't match but data is from Telegram
-        try:
-            parsed = dict(parse_qsl(authorization))
-            user_data = json.loads(parsed.get("user", "{}"))
-
-            if not user_data or not user_data.get("id"):
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid Telegram authentication data",
-                )
-        except (KeyError, json.JSONDecodeError) as exc:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Malformed Telegram authentication data",
-            ) from exc
-    except Exception as exc:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid authentication data",
-        ) from exc
+    user_data = verify_init_data(authorization)
+
+    identity = await get_cached_identity(user_data["id"])
+    cached = identity is not None
+    if identity is None:
+        identity = identity_from_model(await get_or_create_user(db, user_data))
+
+    changes = profile_changes(identity, user_data)
+    if changes and profile_sync_due(identity):
+        identity = await sync_profile(db, identity, changes)
+    elif not cached:
+        await cache_identity(identity)
 
-    # Check if user exists
-    telegram_id = user_data["id"]
-    stmt = select(UserModel).where(UserModel.telegram_id == telegram_id)
-    result = await db.execute(stmt)
-    user = result.scalar_one_or_none()
-
-    if not user:
-        # Create new user from Telegram data with 'unverified' role
-        user = UserModel(
-            telegram_id=telegram_id,
-            username=user_data.get("username"),
-            first_name=user_data.get("first_name", ""),
-            last_name=user_data.get("last_name"),
-            language_code=user_data.get("language_code"),
-            photo_url=user_data.get("photo_url"),
-            role="unverified",  # New users start as unverified
+    return identity.user
+
+
+async def require_moderator(current_user: User = Depends(get_current_user)) -> User:
+    """Allow only moderators and admins."""
+    if current_user.role not in ("moderator", "admin"):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Moderator role required",
         )
-        db.add(user)
-        await db.commit()
-        await db.refresh(user)
-
-    return User(
-        id=user.id,
-        telegram_id=user.telegram_id,
-        username=user.username,
-        first_name=user.first_name,
-        last_name=user.last_name,
-        role=user.role,
-    )
+    return current_user
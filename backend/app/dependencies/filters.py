@@ -0,0 +1,34 @@
+"""Query parameter dependencies for listing filters."""
+
+from typing import Literal
+
+from fastapi import HTTPException, Query, status
+
+from app.services.listing_filters import ListingFilters
+
+ListingStatus = Literal["pending", "active", "rejected", "sold", "inactive"]
+
+
+async def get_listing_filters(
+    category: str | None = Query(None, max_length=50),
+    condition: str | None = Query(None, max_length=20),
+    min_price: int | None = Query(None, ge=0, description="Minimum price in minor units"),
+    max_price: int | None = Query(None, ge=0, description="Maximum price in minor units"),
+    currency: str | None = Query(None, min_length=3, max_length=3),
+    status_: ListingStatus | None = Query(None, alias="status"),
+) -> ListingFilters:
+    """Collect listing filter query parameters."""
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="min_price must not exceed max_price",
+        )
+
+    return ListingFilters(
+        category=category,
+        condition=condition,
+        min_price=min_price,
+        max_price=max_price,
+        currency=currency.upper() if currency else None,
+        status=status_,
+    )
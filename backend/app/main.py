@@ -1,12 +1,33 @@
 """Application entry point."""
 
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.api.api_v1 import api_router
 from app.core.config import settings
+from app.services.image_executor import image_executor
+from app.services.renditions import rendition_worker
+from app.services.storage import close_storage_service
+from app.services.view_counter import view_counter
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Run background services for the lifetime of the app."""
+    view_counter.start()
+    rendition_worker.start()
+    yield
+    await rendition_worker.stop()
+    # Drain buffered views before the process exits
+    await view_counter.stop()
+    image_executor.shutdown()
+    await close_storage_service()
+
 
-app = FastAPI(title=settings.project_name)
+app = FastAPI(title=settings.project_name, lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -1,5 +1,8 @@
 """Database models."""
 
 from app.models.listing import Listing  # noqa: F401
+from app.models.listing_card import ListingCard  # noqa: F401
 from app.models.listing_photo import ListingPhoto  # noqa: F401
+from app.models.photo_blob import PhotoBlob  # noqa: F401
+from app.models.photo_job import PhotoJob  # noqa: F401
 from app.models.user import User  # noqa: F401
@@ -1,14 +1,71 @@
 """Listing model."""
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy import (
+    Column,
+    Computed,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.models.base import Base
 
+# Text search configurations for listing text. Listings are written in
+# Russian, Kazakh and English; Postgres ships no Kazakh stemmer, so Kazakh
+# words are matched in their exact form through the "simple" configuration.
+SEARCH_CONFIGS = ("russian", "english", "simple")
+
+# Weighted full-text document over title (A) and description (B)
+SEARCH_VECTOR_EXPRESSION = " || ".join(
+    f"setweight(to_tsvector('{config}', coalesce({column}, '')), '{weight}')"
+    for column, weight in (("title", "A"), ("description", "B"))
+    for config in SEARCH_CONFIGS
+)
+
 
 class Listing(Base):
     __tablename__ = "listings"
+    __table_args__ = (
+        # Keyset pagination order for the feed: (created_at DESC, id DESC)
+        Index("ix_listings_created_at_id", "created_at", "id"),
+        # Filtered feeds keep the keyset order within the filtered value
+        Index("ix_listings_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_listings_category_created_at_id", "category", "created_at", "id"),
+        # The public marketplace only shows active listings
+        Index(
+            "ix_listings_active_created_at_id",
+            "created_at",
+            "id",
+            postgresql_where=text("status = 'active'"),
+        ),
+        Index(
+            "ix_listings_active_category_price",
+            "category",
+            "price_minor_units",
+            postgresql_where=text("status = 'active'"),
+        ),
+        # Full-text and trigram indexes used by app.services.search
+        Index("ix_listings_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_listings_title_trgm",
+            "title",
+            postgresql_using="gin",
+            postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_listings_description_trgm",
+            "description",
+            postgresql_using="gin",
+            postgresql_ops={"description": "gin_trgm_ops"},
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     seller_id = mapped_column(
@@ -19,7 +76,7 @@ class Listing(Base):
     price_minor_units = Column(Integer, nullable=False)
     currency = Column(String(3), nullable=False, server_default="KZT")
     status = Column(
-        String(20), nullable=False, server_default="pending", index=True
+        String(20), nullable=False, server_default="pending"
     )  # pending, active, rejected, sold, inactive
     category = Column(String(50), nullable=True)
     condition = Column(String(20), nullable=True)
@@ -29,6 +86,10 @@ class Listing(Base):
     )
     moderated_at = Column("moderated_at", DateTime(timezone=True), nullable=True)
     rejection_reason = Column(Text, nullable=True)
+    # Generated by Postgres; deferred so regular selects don't fetch it
+    search_vector = deferred(
+        Column(TSVECTOR, Computed(SEARCH_VECTOR_EXPRESSION, persisted=True))
+    )
     created_at = Column(
         "created_at",
         DateTime(timezone=True),
@@ -45,6 +106,10 @@ class Listing(Base):
     )
 
     seller = relationship("User", foreign_keys=[seller_id], back_populates="listings")
+    # Same order as listing_json.fetch_photo_rows, so both encodings match
     photos = relationship(
-        "ListingPhoto", back_populates="listing", cascade="all, delete-orphan"
+        "ListingPhoto",
+        back_populates="listing",
+        cascade="all, delete-orphan",
+        order_by="(ListingPhoto.display_order, ListingPhoto.id)",
     )
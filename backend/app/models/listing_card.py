@@ -0,0 +1,187 @@
+"""Listing card read model."""
+
+from sqlalchemy import (
+    DDL,
+    BigInteger,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    event,
+)
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+# Keeps listing_cards in sync with listings, listing_photos and users. Each
+# write refreshes only the cards it affects; nothing ever rebuilds the table.
+LISTING_CARD_TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION refresh_listing_card(p_listing_id integer)
+    RETURNS void LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Serialise refreshes of one card so that concurrent photo writes
+        -- cannot overwrite each other's counts with stale snapshots
+        PERFORM 1 FROM listings WHERE id = p_listing_id FOR UPDATE;
+
+        INSERT INTO listing_cards (
+            id, seller_id, title, description, price_minor_units, currency,
+            category, condition, status, created_at, updated_at,
+            seller_telegram_id, seller_username, seller_first_name,
+            seller_last_name, seller_photo_url,
+            photo_count, cover_photo_id, cover_photo_url,
+            cover_photo_renditions, refreshed_at
+        )
+        SELECT
+            l.id, l.seller_id, l.title, l.description, l.price_minor_units,
+            l.currency, l.category, l.condition, l.status, l.created_at,
+            l.updated_at,
+            u.telegram_id, u.username, u.first_name, u.last_name, u.photo_url,
+            (SELECT count(*) FROM listing_photos p WHERE p.listing_id = l.id),
+            cover.id, cover.photo_url, cover.renditions, now()
+        FROM listings l
+        JOIN users u ON u.id = l.seller_id
+        LEFT JOIN LATERAL (
+            SELECT p.id, p.photo_url, p.renditions FROM listing_photos p
+            WHERE p.listing_id = l.id
+            ORDER BY p.display_order, p.id
+            LIMIT 1
+        ) cover ON true
+        WHERE l.id = p_listing_id
+        ON CONFLICT (id) DO UPDATE SET
+            seller_id = EXCLUDED.seller_id,
+            title = EXCLUDED.title,
+            description = EXCLUDED.description,
+            price_minor_units = EXCLUDED.price_minor_units,
+            currency = EXCLUDED.currency,
+            category = EXCLUDED.category,
+            condition = EXCLUDED.condition,
+            status = EXCLUDED.status,
+            created_at = EXCLUDED.created_at,
+            updated_at = EXCLUDED.updated_at,
+            seller_telegram_id = EXCLUDED.seller_telegram_id,
+            seller_username = EXCLUDED.seller_username,
+            seller_first_name = EXCLUDED.seller_first_name,
+            seller_last_name = EXCLUDED.seller_last_name,
+            seller_photo_url = EXCLUDED.seller_photo_url,
+            photo_count = EXCLUDED.photo_count,
+            cover_photo_id = EXCLUDED.cover_photo_id,
+            cover_photo_url = EXCLUDED.cover_photo_url,
+            cover_photo_renditions = EXCLUDED.cover_photo_renditions,
+            refreshed_at = EXCLUDED.refreshed_at;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_listing() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM refresh_listing_card(NEW.id);
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_photo() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            PERFORM refresh_listing_card(NEW.listing_id);
+        ELSIF TG_OP = 'DELETE' THEN
+            PERFORM refresh_listing_card(OLD.listing_id);
+        ELSE
+            PERFORM refresh_listing_card(OLD.listing_id);
+            IF NEW.listing_id <> OLD.listing_id THEN
+                PERFORM refresh_listing_card(NEW.listing_id);
+            END IF;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION listing_cards_on_user() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        UPDATE listing_cards SET
+            seller_telegram_id = NEW.telegram_id,
+            seller_username = NEW.username,
+            seller_first_name = NEW.first_name,
+            seller_last_name = NEW.last_name,
+            seller_photo_url = NEW.photo_url,
+            refreshed_at = now()
+        WHERE seller_id = NEW.id;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    # view_count and moderation bookkeeping are not shown on cards
+    """
+    CREATE TRIGGER listing_cards_listing_write
+    AFTER INSERT OR UPDATE OF seller_id, title, description, price_minor_units,
+        currency, category, condition, status, created_at, updated_at
+    ON listings FOR EACH ROW EXECUTE FUNCTION listing_cards_on_listing()
+    """,
+    """
+    CREATE TRIGGER listing_cards_photo_write
+    AFTER INSERT OR UPDATE OF listing_id, photo_url, display_order, renditions
+        OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION listing_cards_on_photo()
+    """,
+    """
+    CREATE TRIGGER listing_cards_user_write
+    AFTER UPDATE OF telegram_id, username, first_name, last_name, photo_url
+    ON users FOR EACH ROW EXECUTE FUNCTION listing_cards_on_user()
+    """,
+)
+
+
+class ListingCard(Base):
+    """Denormalised feed row per listing, maintained by database triggers.
+
+    Read-only from the application: rows are written exclusively by the
+    triggers in ``LISTING_CARD_TRIGGER_STATEMENTS``.
+    """
+
+    __tablename__ = "listing_cards"
+    __table_args__ = (
+        Index("ix_listing_cards_created_at_id", "created_at", "id"),
+        Index("ix_listing_cards_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_listing_cards_category_created_at_id", "category", "created_at", "id"),
+    )
+
+    # Same value as listings.id
+    id = Column(
+        Integer, ForeignKey("listings.id", ondelete="CASCADE"), primary_key=True
+    )
+    seller_id = Column(Integer, nullable=False, index=True)
+    title = Column(String(120), nullable=False)
+    description = Column(Text, nullable=False)
+    price_minor_units = Column(Integer, nullable=False)
+    currency = Column(String(3), nullable=False)
+    category = Column(String(50), nullable=True)
+    condition = Column(String(20), nullable=True)
+    status = Column(String(20), nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)  # Of the listing
+    seller_telegram_id = Column(BigInteger, nullable=False)
+    seller_username = Column(String(64), nullable=True)
+    seller_first_name = Column(String(100), nullable=False)
+    seller_last_name = Column(String(100), nullable=True)
+    seller_photo_url = Column(Text, nullable=True)
+    photo_count = Column(Integer, nullable=False, server_default="0")
+    cover_photo_id = Column(Integer, nullable=True)
+    cover_photo_url = Column(Text, nullable=True)
+    cover_photo_renditions = Column(JSONB, nullable=True)
+    # Set whenever any source row of the card changes
+    refreshed_at = Column(
+        DateTime(timezone=True), nullable=False, server_default=func.now()
+    )
+
+
+for _statement in LISTING_CARD_TRIGGER_STATEMENTS:
+    event.listen(ListingCard.__table__, "after_create", DDL(_statement))
@@ -2,8 +2,9 @@
 
 from typing import Any
 
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.orm import mapped_column, relationship
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, LargeBinary, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred, mapped_column, relationship
 from sqlalchemy.sql import func
 
 from app.models.base import Base
@@ -19,10 +20,20 @@ class ListingPhoto(Base):
     listing_id = mapped_column(
         ForeignKey("listings.id", ondelete="CASCADE"), nullable=False, index=True
     )
-    photo_url = Column(Text, nullable=False)
+    # Indexed for the lookups of the orphaned object reconciler
+    photo_url = Column(Text, nullable=False, index=True)
+    # Content-addressed file; NULL for photos uploaded before deduplication
+    blob_id = mapped_column(ForeignKey("photo_blobs.id"), nullable=True, index=True)
     display_order = Column(Integer, nullable=False, server_default="0")
-    thumbnail_data = Column(Text, nullable=True)  # Base64-encoded thumbnail
+    # JPEG thumbnail, either inline or as an object (see THUMBNAIL_STORAGE);
+    # deferred so listing queries never read it
+    thumbnail_bytes = deferred(Column(LargeBinary, nullable=True))
+    thumbnail_object_url = deferred(Column(Text, nullable=True))
+    # Legacy base64 thumbnail, emptied by the thumbnail backfill
+    thumbnail_data = deferred(Column(Text, nullable=True))
     file_size_bytes = Column(Integer, nullable=True)
+    # [{"url", "width", "height", "format"}, ...]; NULL until rendered
+    renditions = Column(JSONB, nullable=True)
     original_filename = Column(String(255), nullable=True)
     created_at = Column(
         "created_at",
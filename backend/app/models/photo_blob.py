@@ -0,0 +1,75 @@
+"""Content-addressed photo file model."""
+
+from sqlalchemy import DDL, Column, Index, Integer, LargeBinary, String, Text, event, text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import deferred
+
+from app.models.base import Base
+from app.models.listing_photo import ListingPhoto
+
+# Keeps photo_blobs.ref_count equal to the number of listing photos using
+# each blob, including photos removed by ON DELETE CASCADE. Releases bump
+# updated_at, from which the purge grace period is counted.
+PHOTO_BLOB_REFCOUNT_TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION photo_blobs_refcount() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.blob_id IS NOT NULL THEN
+            UPDATE photo_blobs
+            SET ref_count = ref_count - 1, updated_at = now()
+            WHERE id = OLD.blob_id;
+        END IF;
+        IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.blob_id IS NOT NULL THEN
+            UPDATE photo_blobs
+            SET ref_count = ref_count + 1, updated_at = now()
+            WHERE id = NEW.blob_id;
+        END IF;
+        RETURN NULL;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER photo_blobs_refcount
+    AFTER INSERT OR UPDATE OF blob_id OR DELETE
+    ON listing_photos FOR EACH ROW EXECUTE FUNCTION photo_blobs_refcount()
+    """,
+)
+
+
+class PhotoBlob(Base):
+    """A stored photo file, shared by every listing photo with the same bytes.
+
+    Stored under a key derived from the SHA-256 of its contents, as are its
+    thumbnail and renditions. The objects are deleted only once no listing
+    photo references the blob any more.
+    """
+
+    __tablename__ = "photo_blobs"
+    __table_args__ = (
+        # Only unreferenced blobs are ever scanned by the purge
+        Index(
+            "ix_photo_blobs_unreferenced",
+            "updated_at",
+            postgresql_where=text("ref_count = 0"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    sha256 = Column(String(64), nullable=False, unique=True)  # Hex digest
+    url = Column(Text, nullable=False)
+    content_type = Column(String(100), nullable=True)
+    size_bytes = Column(Integer, nullable=False)
+    # Maintained by PHOTO_BLOB_REFCOUNT_TRIGGER_STATEMENTS
+    ref_count = Column(Integer, nullable=False, server_default="0")
+    # Thumbnail reused by duplicates; NULL if it could not be generated
+    thumbnail_bytes = deferred(Column(LargeBinary, nullable=True))
+    thumbnail_object_url = Column(Text, nullable=True)
+    # Renditions under renditions/{sha256}/, copied onto every photo of the
+    # blob; NULL until the first rendition job of the blob is done
+    renditions = Column(JSONB, nullable=True)
+
+
+# listing_photos references photo_blobs, so it is created after it
+for _statement in PHOTO_BLOB_REFCOUNT_TRIGGER_STATEMENTS:
+    event.listen(ListingPhoto.__table__, "after_create", DDL(_statement))
@@ -0,0 +1,44 @@
+"""Background photo processing job model."""
+
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, String, Text, text
+from sqlalchemy.sql import func
+
+from app.models.base import Base
+
+JOB_PENDING = "pending"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+class PhotoJob(Base):
+    """A queued rendition job for one listing photo.
+
+    Workers claim jobs with ``FOR UPDATE SKIP LOCKED``, so any number of
+    them can drain the table concurrently without handing out a job twice.
+    """
+
+    __tablename__ = "photo_jobs"
+    __table_args__ = (
+        # Only unfinished jobs are ever scanned by workers
+        Index(
+            "ix_photo_jobs_claimable",
+            "id",
+            postgresql_where=text("status IN ('pending', 'running')"),
+        ),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    photo_id = Column(
+        Integer,
+        ForeignKey("listing_photos.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    status = Column(String(20), nullable=False, server_default=JOB_PENDING)
+    attempts = Column(Integer, nullable=False, server_default="0")
+    # Not claimed before this time; pushed back after failed attempts
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    # When the running attempt was claimed
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    last_error = Column(Text, nullable=True)
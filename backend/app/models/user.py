@@ -1,12 +1,33 @@
 """User model."""
 
 
-from sqlalchemy import BigInteger, Column, DateTime, Integer, String, Text
+from sqlalchemy import DDL, BigInteger, Column, DateTime, Integer, String, Text, event
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 
 from app.models.base import Base
 
+# Any role change revokes the user's outstanding refresh tokens, whichever
+# code path or console performs it
+TOKEN_VERSION_TRIGGER_STATEMENTS = (
+    """
+    CREATE OR REPLACE FUNCTION users_bump_token_version() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        IF NEW.role IS DISTINCT FROM OLD.role THEN
+            NEW.token_version := OLD.token_version + 1;
+        END IF;
+        RETURN NEW;
+    END;
+    $$
+    """,
+    """
+    CREATE TRIGGER users_role_change
+    BEFORE UPDATE OF role ON users
+    FOR EACH ROW EXECUTE FUNCTION users_bump_token_version()
+    """,
+)
+
 
 class User(Base):
     __tablename__ = "users"
@@ -21,6 +42,8 @@ class User(Base):
     role = Column(
         String(20), nullable=False, server_default="unverified"
     )  # unverified, verified, moderator, admin
+    # Embedded in refresh tokens; bumping it revokes all of them
+    token_version = Column(Integer, nullable=False, server_default="0")
     created_at = Column(
         "created_at",
         DateTime(timezone=True),
@@ -41,3 +64,7 @@ class User(Base):
         back_populates="seller",
         cascade="all, delete-orphan",
     )
+
+
+for _statement in TOKEN_VERSION_TRIGGER_STATEMENTS:
+    event.listen(User.__table__, "after_create", DDL(_statement))
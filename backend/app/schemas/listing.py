@@ -1,10 +1,15 @@
 from datetime import datetime
+from typing import TYPE_CHECKING
 
 from pydantic import BaseModel, Field, PositiveInt
 
-from app.schemas.photo import PhotoResponse
+from app.schemas.photo import PhotoRendition, PhotoResponse, thumbnail_url
 from app.schemas.user import UserPublic
 
+if TYPE_CHECKING:
+    from app.models.listing import Listing as ListingModel
+    from app.models.listing_card import ListingCard as ListingCardModel
+
 
 class ListingBase(BaseModel):
     title: str = Field(..., max_length=120)
@@ -35,3 +40,103 @@ class ListingWithSeller(Listing):
 
     class Config:
         from_attributes = True
+
+
+class ListingFacets(BaseModel):
+    """Number of matching listings per attribute value."""
+
+    category: dict[str, int] = {}
+    condition: dict[str, int] = {}
+
+
+class ListingPage(BaseModel):
+    """A page of listings in ``(created_at DESC, id DESC)`` order."""
+
+    items: list[ListingWithSeller]
+    next_cursor: str | None = None  # Opaque token for the next page, None on the last page
+    facets: ListingFacets | None = None  # Only on the first page
+
+
+class ListingCard(ListingBase):
+    """Lean listing representation for feeds.
+
+    Carries a reference to the cover thumbnail instead of embedding base64
+    thumbnails of every photo.
+    """
+
+    id: int
+    seller_id: int
+    category: str | None = None
+    condition: str | None = None
+    created_at: datetime
+    updated_at: datetime
+    seller: UserPublic
+    photo_count: int = 0
+    cover_photo_url: str | None = None  # Full-size cover image
+    cover_thumbnail_url: str | None = None  # Path of GET /photos/{id}/thumb
+    # Resized copies of the cover, for picking a size by viewport
+    cover_renditions: list[PhotoRendition] | None = None
+
+    @classmethod
+    def from_listing(cls, listing: "ListingModel") -> "ListingCard":
+        """Build a card from a listing loaded with its seller and photos."""
+        cover = min(
+            listing.photos, key=lambda p: (p.display_order, p.id), default=None
+        )
+        return cls(
+            id=listing.id,
+            title=listing.title,
+            description=listing.description,
+            price_minor_units=listing.price_minor_units,
+            currency=listing.currency,
+            seller_id=listing.seller_id,
+            category=listing.category,
+            condition=listing.condition,
+            created_at=listing.created_at,
+            updated_at=listing.updated_at,
+            seller=UserPublic.model_validate(listing.seller),
+            photo_count=len(listing.photos),
+            cover_photo_url=cover.photo_url if cover else None,
+            cover_thumbnail_url=thumbnail_url(cover.id) if cover else None,
+            cover_renditions=cover.renditions if cover else None,
+        )
+
+    @classmethod
+    def from_card(cls, card: "ListingCardModel") -> "ListingCard":
+        """Build a card from a ``listing_cards`` read-model row."""
+        return cls(
+            id=card.id,
+            title=card.title,
+            description=card.description,
+            price_minor_units=card.price_minor_units,
+            currency=card.currency,
+            seller_id=card.seller_id,
+            category=card.category,
+            condition=card.condition,
+            created_at=card.created_at,
+            updated_at=card.updated_at,
+            seller=UserPublic(
+                id=card.seller_id,
+                telegram_id=card.seller_telegram_id,
+                username=card.seller_username,
+                first_name=card.seller_first_name,
+                last_name=card.seller_last_name,
+                photo_url=card.seller_photo_url,
+            ),
+            photo_count=card.photo_count,
+            cover_photo_url=card.cover_photo_url,
+            cover_thumbnail_url=(
+                thumbnail_url(card.cover_photo_id)
+                if card.cover_photo_id is not None
+                else None
+            ),
+            cover_renditions=card.cover_photo_renditions,
+        )
+
+
+class ListingCardPage(BaseModel):
+    """A page of listing cards in the same order as :class:`ListingPage`."""
+
+    items: list[ListingCard]
+    next_cursor: str | None = None
+    facets: ListingFacets | None = None  # Only on the first page
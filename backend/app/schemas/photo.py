@@ -2,7 +2,23 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, computed_field
+
+from app.core.config import settings
+
+
+def thumbnail_url(photo_id: int) -> str:
+    """Return the API path of the cacheable thumbnail for a photo."""
+    return f"{settings.api_v1_prefix}/photos/{photo_id}/thumb"
+
+
+class PhotoRendition(BaseModel):
+    """A resized, re-encoded copy of a photo."""
+
+    url: str
+    width: int
+    height: int
+    format: str  # "webp" or "jpeg"
 
 
 class PhotoResponse(BaseModel):
@@ -11,19 +27,74 @@ class PhotoResponse(BaseModel):
     id: int
     photo_url: str
     display_order: int
-    thumbnail_data: str | None = None  # Base64-encoded thumbnail
+    renditions: list[PhotoRendition] | None = None  # None until rendered
     file_size_bytes: int | None = None
     original_filename: str | None = None
     created_at: datetime
 
+    @computed_field  # type: ignore[prop-decorator]
+    @property
+    def thumbnail_url(self) -> str:
+        """Path of GET /photos/{id}/thumb; the bytes are never embedded."""
+        return thumbnail_url(self.id)
+
     class Config:
         from_attributes = True
         # Allow missing fields (for backward compatibility before migration)
         populate_by_name = True
 
 
+class PhotoJobResponse(BaseModel):
+    """Status of the rendition job of a photo."""
+
+    id: int
+    photo_id: int
+    status: str  # "pending", "running", "done" or "failed"
+    attempts: int = 0
+    renditions: list[PhotoRendition] | None = None  # Set once done
+
+
 class PhotoUploadResponse(BaseModel):
     """Response schema for photo upload operations."""
 
     url: str
     thumbnail: str | None = None  # Base64-encoded thumbnail
+    id: int | None = None  # Photo id
+    job: PhotoJobResponse | None = None  # Renditions are produced in the background
+
+
+class DirectUploadFile(BaseModel):
+    """A photo the client wants to upload straight to storage."""
+
+    filename: str = Field(..., max_length=255)
+    content_type: str = Field(..., max_length=100)
+    size: int = Field(..., gt=0)  # Bytes
+
+
+class DirectUploadRequest(BaseModel):
+    """Request schema for presigning direct photo uploads."""
+
+    files: list[DirectUploadFile] = Field(..., min_length=1)
+
+
+class DirectUploadTarget(BaseModel):
+    """Where to upload one photo; pass ``key`` to the finalize endpoint."""
+
+    key: str
+    url: str
+    method: str  # "POST": multipart form of ``fields`` then the file; "PUT": raw body
+    fields: dict[str, str] = {}
+    headers: dict[str, str] = {}
+
+
+class DirectUploadedPhoto(BaseModel):
+    """A photo uploaded with a presigned target."""
+
+    key: str
+    filename: str | None = Field(None, max_length=255)
+
+
+class DirectUploadFinalize(BaseModel):
+    """Request schema for attaching directly uploaded photos to a listing."""
+
+    photos: list[DirectUploadedPhoto] = Field(..., min_length=1)
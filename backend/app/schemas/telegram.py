@@ -20,3 +20,16 @@ class TelegramAuthRequest(BaseModel):
 class TelegramAuthResponse(BaseModel):
     ok: bool = True
     user: TelegramUser
+
+
+class TokenResponse(BaseModel):
+    """Session tokens issued in exchange for Telegram init data."""
+
+    access_token: str
+    refresh_token: str
+    token_type: str = "bearer"
+    expires_in: int  # Seconds until the access token expires
+
+
+class TokenRefreshRequest(BaseModel):
+    refresh_token: str
@@ -0,0 +1,78 @@
+"""Response cache factory and exports."""
+
+from app.core.config import settings
+from app.services.cache.base import CacheBackend, CacheStats
+from app.services.cache.memory_backend import InMemoryCache
+from app.services.cache.redis_backend import RedisCache
+
+# Singleton instances
+_response_cache: CacheBackend | None = None
+_identity_cache: CacheBackend | None = None
+
+# Upper bound on the size of one cached identity
+_IDENTITY_ENTRY_BYTES = 1024
+
+
+def get_response_cache() -> CacheBackend:
+    """Get or create the response cache based on configuration.
+
+    Returns:
+        CacheBackend implementation (in-process or Redis)
+
+    Raises:
+        ValueError: If the cache backend is invalid
+    """
+    global _response_cache
+
+    if _response_cache is None:
+        backend = settings.cache_backend.lower()
+
+        if backend == "memory":
+            _response_cache = InMemoryCache(
+                max_entries=settings.cache_max_entries,
+                max_bytes=settings.cache_max_bytes,
+                default_ttl=settings.cache_ttl_seconds,
+            )
+        elif backend == "redis":
+            _response_cache = RedisCache(default_ttl=settings.cache_ttl_seconds)
+        else:
+            raise ValueError(
+                f"Invalid cache backend: {backend}. Supported backends: 'memory', 'redis'"
+            )
+
+    return _response_cache
+
+
+def get_identity_cache() -> CacheBackend:
+    """Get or create the user identity cache, on the same backend kind.
+
+    Kept apart from the response cache so that feed pages cannot evict
+    identities.
+
+    Raises:
+        ValueError: If the cache backend is invalid
+    """
+    global _identity_cache
+
+    if _identity_cache is None:
+        backend = settings.cache_backend.lower()
+
+        if backend == "memory":
+            _identity_cache = InMemoryCache(
+                max_entries=settings.identity_cache_max_entries,
+                max_bytes=settings.identity_cache_max_entries * _IDENTITY_ENTRY_BYTES,
+                default_ttl=settings.identity_cache_ttl_seconds,
+            )
+        elif backend == "redis":
+            _identity_cache = RedisCache(
+                default_ttl=settings.identity_cache_ttl_seconds, key_prefix="identity:"
+            )
+        else:
+            raise ValueError(
+                f"Invalid cache backend: {backend}. Supported backends: 'memory', 'redis'"
+            )
+
+    return _identity_cache
+
+
+__all__ = ["get_response_cache", "get_identity_cache", "CacheBackend", "CacheStats"]
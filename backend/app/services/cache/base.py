@@ -0,0 +1,62 @@
+"""Base cache backend protocol."""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import Protocol
+
+
+@dataclass
+class CacheStats:
+    """Counters for sizing a cache."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0  # Entries dropped for size, not TTL or invalidation
+    entries: int = 0
+    size_bytes: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheBackend(Protocol):
+    """Protocol for response cache backends.
+
+    Entries are opaque byte strings labelled with tags. Writes that change
+    data invalidate every entry carrying one of the affected tags.
+    """
+
+    async def get(self, key: str) -> bytes | None:
+        """Return the cached value, or None on a miss or expired entry."""
+        ...
+
+    async def set(
+        self, key: str, value: bytes, tags: Iterable[str] = (), ttl: float | None = None
+    ) -> None:
+        """Store a value.
+
+        Args:
+            key: Cache key
+            value: Serialized value
+            tags: Labels used for invalidation
+            ttl: Lifetime in seconds, defaults to the backend's TTL
+        """
+        ...
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        """Drop every entry labelled with any of the tags.
+
+        Returns:
+            Number of entries dropped
+        """
+        ...
+
+    async def clear(self) -> None:
+        """Drop all entries."""
+        ...
+
+    def stats(self) -> CacheStats:
+        """Return hit/miss counters and current size."""
+        ...
@@ -0,0 +1,109 @@
+"""In-process LRU cache with TTL expiry and a memory cap."""
+
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from app.services.cache.base import CacheStats
+
+
+@dataclass
+class _Entry:
+    value: bytes
+    tags: frozenset[str]
+    expires_at: float
+    size: int
+
+
+class InMemoryCache:
+    """LRU cache bounded by entry count and total bytes.
+
+    Not shared between worker processes; use ``RedisCache`` for that.
+    All operations are synchronous under the hood, so the event loop never
+    interleaves them and no locking is needed.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._tags: dict[str, set[str]] = {}
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    async def get(self, key: str) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            self._misses += 1
+            return None
+        if entry.expires_at <= time.monotonic():
+            self._remove(key)
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry.value
+
+    async def set(
+        self, key: str, value: bytes, tags: Iterable[str] = (), ttl: float | None = None
+    ) -> None:
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        entry = _Entry(
+            value=value,
+            tags=frozenset(tags),
+            expires_at=time.monotonic() + (self.default_ttl if ttl is None else ttl),
+            size=size,
+        )
+        self._entries[key] = entry
+        self._size += size
+        for tag in entry.tags:
+            self._tags.setdefault(tag, set()).add(key)
+
+        # Evict least recently used entries until within bounds
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._evictions += 1
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        keys: set[str] = set()
+        for tag in tags:
+            keys |= self._tags.get(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self._size = 0
+
+    def stats(self) -> CacheStats:
+        return CacheStats(
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+            entries=len(self._entries),
+            size_bytes=self._size,
+        )
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._size -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
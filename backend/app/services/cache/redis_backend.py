@@ -0,0 +1,78 @@
+"""Redis-compatible shared cache backend."""
+
+from collections.abc import Iterable
+
+from app.core.config import settings
+from app.services.cache.base import CacheStats
+
+
+class RedisCache:
+    """Cache stored in Redis (or any server speaking its protocol).
+
+    Shared by all worker processes. Size bounds are enforced by the server's
+    ``maxmemory`` / ``maxmemory-policy allkeys-lru`` settings rather than here.
+    Hit/miss counters are per process.
+    """
+
+    def __init__(self, default_ttl: float, key_prefix: str = "cache:"):
+        # Import here to avoid requiring redis if not using this backend
+        try:
+            from redis.asyncio import Redis
+        except ImportError:
+            raise ImportError(
+                "redis is required for RedisCache. Install it with: poetry add redis"
+            )
+
+        if not settings.redis_url:
+            raise ValueError("REDIS_URL must be set to use the redis cache backend")
+
+        self.client = Redis.from_url(settings.redis_url)
+        self.default_ttl = default_ttl
+        self.key_prefix = key_prefix
+        self._hits = 0
+        self._misses = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}tag:{tag}"
+
+    async def get(self, key: str) -> bytes | None:
+        value = await self.client.get(self._key(key))
+        if value is None:
+            self._misses += 1
+        else:
+            self._hits += 1
+        return value
+
+    async def set(
+        self, key: str, value: bytes, tags: Iterable[str] = (), ttl: float | None = None
+    ) -> None:
+        ttl_ms = int((self.default_ttl if ttl is None else ttl) * 1000)
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.set(self._key(key), value, px=ttl_ms)
+            for tag in tags:
+                # Tag sets outlive their members by at most one TTL
+                pipe.sadd(self._tag_key(tag), key)
+                pipe.pexpire(self._tag_key(tag), ttl_ms)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tag_keys = [self._tag_key(tag) for tag in tags]
+        if not tag_keys:
+            return 0
+        keys: set[bytes] = set()
+        for tag_key in tag_keys:
+            keys |= await self.client.smembers(tag_key)
+        if keys:
+            await self.client.delete(*(self._key(k.decode()) for k in keys))
+        await self.client.delete(*tag_keys)
+        return len(keys)
+
+    async def clear(self) -> None:
+        async for key in self.client.scan_iter(match=f"{self.key_prefix}*"):
+            await self.client.delete(key)
+
+    def stats(self) -> CacheStats:
+        return CacheStats(hits=self._hits, misses=self._misses)
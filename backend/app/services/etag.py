@@ -0,0 +1,74 @@
+"""Entity tags for conditional GET requests.
+
+ETags are derived from row versions (ids and ``updated_at`` timestamps)
+rather than by hashing response bodies, so a request can be answered with
+``304 Not Modified`` before anything is serialized.
+"""
+
+import hashlib
+import json
+from collections.abc import Iterable
+from typing import Any
+
+from fastapi import Response, status
+
+# Authenticated JSON resources: browsers may store them but must revalidate
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+def compute_etag(*parts: Any) -> str:
+    """Build a strong ETag from version components."""
+    encoded = json.dumps(parts, default=str, separators=(",", ":"))
+    return f'"{hashlib.sha256(encoded.encode()).hexdigest()[:32]}"'
+
+
+def listing_etag(listing: Any) -> str:
+    """ETag of a single listing loaded with its seller."""
+    return compute_etag(listing.id, listing.updated_at, listing.seller.updated_at)
+
+
+def listing_page_etag(
+    cache_key: str,
+    versions: Iterable[tuple[int, Any]],
+    next_cursor: str | None,
+    facets: Any | None = None,
+) -> str:
+    """ETag of a feed page.
+
+    Covers the request (``cache_key``), which rows are on the page with
+    their versions, and the facet counts. Photo uploads touch
+    ``Listing.updated_at``, so they change listing versions as well.
+
+    Args:
+        cache_key: Key identifying the request
+        versions: ``(id, version)`` of every row on the page, in order
+        next_cursor: Cursor of the following page
+        facets: Facet counts model, if the page has them
+    """
+    return compute_etag(
+        cache_key,
+        next_cursor,
+        facets.model_dump() if facets is not None else None,
+        list(versions),
+    )
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an ``If-None-Match`` header against the current ETag.
+
+    Uses the weak comparison RFC 9110 prescribes for ``If-None-Match``.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(etag: str, cache_control: str = REVALIDATE_CACHE_CONTROL) -> Response:
+    """Return an empty ``304 Not Modified`` response."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": cache_control},
+    )
@@ -0,0 +1,106 @@
+"""Caching of listing feed pages and their write-driven invalidation.
+
+Pages are keyed on everything that selects their rows and tagged so that a
+write only drops the pages it can affect:
+
+- ``listing:{id}`` on every page containing that listing;
+- ``seller:{id}`` on every page containing a listing of that seller;
+- ``feed:head`` on first pages of the plain feed, where new listings appear
+  (keyset pages further down never gain rows from inserts);
+- ``search`` on search pages, where a new listing can rank anywhere;
+- ``feed`` on every page, for changes that can move a listing anywhere.
+"""
+
+import hashlib
+import json
+import logging
+from collections.abc import Iterable
+from typing import Any, NamedTuple
+
+from app.services.cache import get_response_cache
+
+log = logging.getLogger(__name__)
+
+TAG_FEED = "feed"
+TAG_FEED_HEAD = "feed:head"
+TAG_SEARCH = "search"
+
+
+def feed_cache_key(endpoint: str, **params: Any) -> str:
+    """Build a cache key from an endpoint name and its query parameters."""
+    encoded = json.dumps(params, sort_keys=True, default=str, separators=(",", ":"))
+    return f"{endpoint}:{hashlib.sha256(encoded.encode()).hexdigest()}"
+
+
+def feed_page_tags(
+    listings: Iterable[Any], query: str | None, cursor: str | None
+) -> list[str]:
+    """Return invalidation tags for a page of listings."""
+    tags = {TAG_FEED}
+    if query:
+        tags.add(TAG_SEARCH)
+    elif cursor is None:
+        tags.add(TAG_FEED_HEAD)
+    for listing in listings:
+        tags.add(f"listing:{listing.id}")
+        tags.add(f"seller:{listing.seller_id}")
+    return sorted(tags)
+
+
+class CachedPage(NamedTuple):
+    """A rendered page and its ETag."""
+
+    etag: str
+    body: bytes
+
+
+async def get_cached_page(key: str) -> CachedPage | None:
+    """Return a cached page, treating cache failures as misses."""
+    try:
+        value = await get_response_cache().get(key)
+    except Exception as e:
+        log.error(f"Feed cache lookup failed: {str(e)}")
+        return None
+    if value is None:
+        return None
+    # Stored as b"<etag>\n<body>"; ETags never contain newlines
+    etag, _, body = value.partition(b"\n")
+    return CachedPage(etag=etag.decode(), body=body)
+
+
+async def cache_page(key: str, page: CachedPage, tags: list[str]) -> None:
+    """Store a rendered page, ignoring cache failures."""
+    try:
+        await get_response_cache().set(
+            key, page.etag.encode() + b"\n" + page.body, tags=tags
+        )
+    except Exception as e:
+        log.error(f"Feed cache store failed: {str(e)}")
+
+
+async def _invalidate(tags: list[str]) -> None:
+    # A failed invalidation must not fail the write; entries still expire by TTL
+    try:
+        await get_response_cache().invalidate_tags(tags)
+    except Exception as e:
+        log.error(f"Failed to invalidate feed cache tags {tags}: {str(e)}")
+
+
+async def invalidate_new_listing() -> None:
+    """Drop pages a newly created listing can appear on."""
+    await _invalidate([TAG_FEED_HEAD, TAG_SEARCH])
+
+
+async def invalidate_listing(listing_id: int) -> None:
+    """Drop pages showing a listing whose content (not position) changed."""
+    await _invalidate([f"listing:{listing_id}"])
+
+
+async def invalidate_feed() -> None:
+    """Drop every page, e.g. after a status change that can move a listing anywhere."""
+    await _invalidate([TAG_FEED])
+
+
+async def invalidate_seller(seller_id: int) -> None:
+    """Drop pages showing listings of a seller whose public profile changed."""
+    await _invalidate([f"seller:{seller_id}"])
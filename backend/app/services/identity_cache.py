@@ -0,0 +1,160 @@
+"""Cached telegram_id -> user lookups for initData authentication.
+
+Every initData-authenticated request needs the user behind a Telegram id.
+Identities are cached with a TTL and written through whenever the app
+changes a profile, or a role (``scripts.set_user_role``). Telegram profile
+fields (username, names, photo) are written back lazily, at most once per
+``profile_sync_interval_seconds`` per user, instead of never.
+
+Writes reach only the cache of the writing process unless the cache is
+shared (``CACHE_BACKEND=redis``). With the default memory backend, other
+processes keep serving their cached identity, role included, for up to
+``identity_cache_ttl_seconds``.
+"""
+
+import json
+import logging
+import time
+from typing import Any, NamedTuple
+
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.user import User as UserModel
+from app.schemas.user import User
+from app.services.cache import get_identity_cache
+from app.services.feed_cache import invalidate_seller
+
+log = logging.getLogger(__name__)
+
+# Profile fields Telegram sends with every initData
+PROFILE_FIELDS = ("username", "first_name", "last_name", "photo_url")
+
+
+class CachedIdentity(NamedTuple):
+    """A user, their photo URL and when their profile was last synced."""
+
+    user: User
+    photo_url: str | None
+    synced_at: float  # Unix time; 0 if never synced from this cache
+
+
+def _key(telegram_id: int) -> str:
+    return f"user:{telegram_id}"
+
+
+def identity_from_model(user: UserModel, synced_at: float = 0.0) -> CachedIdentity:
+    """Build a cache entry from a user row."""
+    return CachedIdentity(
+        user=User(
+            id=user.id,
+            telegram_id=user.telegram_id,
+            username=user.username,
+            first_name=user.first_name,
+            last_name=user.last_name,
+            role=user.role,
+        ),
+        photo_url=user.photo_url,
+        synced_at=synced_at,
+    )
+
+
+async def get_cached_identity(telegram_id: int) -> CachedIdentity | None:
+    """Return a cached identity, treating cache failures as misses."""
+    try:
+        value = await get_identity_cache().get(_key(telegram_id))
+    except Exception as e:
+        log.error(f"Identity cache lookup failed: {str(e)}")
+        return None
+    if value is None:
+        return None
+    data = json.loads(value)
+    return CachedIdentity(
+        user=User.model_validate(data["user"]),
+        photo_url=data["photo_url"],
+        synced_at=data["synced_at"],
+    )
+
+
+async def cache_identity(identity: CachedIdentity) -> None:
+    """Store an identity, ignoring cache failures."""
+    value = json.dumps(
+        {
+            "user": identity.user.model_dump(mode="json"),
+            "photo_url": identity.photo_url,
+            "synced_at": identity.synced_at,
+        }
+    ).encode()
+    key = _key(identity.user.telegram_id)
+    try:
+        await get_identity_cache().set(key, value, tags=[key])
+    except Exception as e:
+        log.error(f"Identity cache store failed: {str(e)}")
+
+
+async def invalidate_identity(telegram_id: int) -> None:
+    """Drop a cached identity, e.g. after changing the user outside the app."""
+    try:
+        await get_identity_cache().invalidate_tags([_key(telegram_id)])
+    except Exception as e:
+        log.error(f"Identity cache invalidation failed: {str(e)}")
+
+
+def profile_changes(identity: CachedIdentity, user_data: dict[str, Any]) -> dict[str, Any]:
+    """Return profile fields whose Telegram values differ from the stored ones."""
+    current = {
+        "username": identity.user.username,
+        "first_name": identity.user.first_name,
+        "last_name": identity.user.last_name,
+        "photo_url": identity.photo_url,
+    }
+    changes = {
+        field: user_data.get(field)
+        for field in PROFILE_FIELDS
+        if user_data.get(field) != current[field]
+    }
+    # first_name is required; an absent one is not a change
+    if not changes.get("first_name", True):
+        del changes["first_name"]
+    return changes
+
+
+def profile_sync_due(identity: CachedIdentity) -> bool:
+    """Whether the debounce interval since the last profile sync has passed."""
+    return time.time() - identity.synced_at >= settings.profile_sync_interval_seconds
+
+
+async def sync_profile(
+    db: AsyncSession, identity: CachedIdentity, changes: dict[str, Any]
+) -> CachedIdentity:
+    """Write changed profile fields and return the updated, cached identity."""
+    user = identity.user
+    await db.execute(update(UserModel).where(UserModel.id == user.id).values(**changes))
+    await db.commit()
+
+    synced = CachedIdentity(
+        user=user.model_copy(update={k: v for k, v in changes.items() if k != "photo_url"}),
+        photo_url=changes.get("photo_url", identity.photo_url),
+        synced_at=time.time(),
+    )
+    await cache_identity(synced)
+    # Feed pages show seller names and photos
+    await invalidate_seller(user.id)
+    return synced
+
+
+async def set_user_role(db: AsyncSession, user: UserModel, role: str) -> UserModel:
+    """Change a user's role and write the new identity to this process's cache.
+
+    Roles are changed with ``scripts.set_user_role``. The database bumps
+    ``token_version`` on role changes, revoking the user's refresh tokens.
+    The API processes only see the new role at once with the Redis cache
+    backend; with the memory backend it can take up to
+    ``identity_cache_ttl_seconds``.
+    """
+    user.role = role
+    await db.commit()
+    await db.refresh(user)
+    await cache_identity(identity_from_model(user, synced_at=time.time()))
+    return user
@@ -0,0 +1,185 @@
+"""Off-loop executor for CPU-bound image work.
+
+Decoding, resampling and encoding images with Pillow takes tens to
+hundreds of milliseconds per photo. Running it inside a request handler
+would stall every other request on the worker, so it runs in a process
+pool instead, which scales across cores. A thread pool is used when
+configured or when processes cannot be started. Pillow releases the GIL
+for most of its work, so threads still keep the event loop responsive.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections.abc import Callable
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, TypeVar
+
+from app.core.config import settings
+from app.services.image_processing import ImageProcessingService, Rendition
+
+log = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class ImageExecutorBusy(Exception):
+    """Raised when too many image jobs are already queued or running."""
+
+
+class ImageExecutor:
+    """Runs image functions in a worker pool behind an async API.
+
+    At most ``max_pending`` jobs may be queued or running at once; further
+    submissions fail fast with :class:`ImageExecutorBusy` instead of
+    growing an unbounded backlog. Each job is awaited for at most
+    ``timeout`` seconds; a job that times out keeps its slot until its
+    worker actually finishes it, so slow jobs cannot pile up behind the
+    limit.
+    """
+
+    def __init__(
+        self,
+        kind: str = "process",
+        max_workers: int | None = None,
+        max_pending: int = 32,
+        timeout: float = 30.0,
+    ):
+        """Initialize the executor. Workers are started on first use.
+
+        Args:
+            kind: "process" or "thread"
+            max_workers: Pool size, defaults to the number of CPUs
+            max_pending: Maximum number of queued plus running jobs
+            timeout: Seconds to wait for a job before giving up
+
+        Raises:
+            ValueError: If the kind is invalid
+        """
+        if kind not in ("process", "thread"):
+            raise ValueError(
+                f"Invalid image executor: {kind}. Supported executors: 'process', 'thread'"
+            )
+        self.kind = kind
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._pool: Executor | None = None
+        self._pending = 0
+        # Slots are released from pool threads when jobs finish
+        self._pending_lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs currently queued or running."""
+        return self._pending
+
+    def _get_pool(self) -> Executor:
+        if self._pool is None:
+            if self.kind == "process":
+                try:
+                    # spawn: forking a process that runs an event loop and
+                    # database pools is unsafe
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.max_workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                    )
+                except (OSError, NotImplementedError, PermissionError) as e:
+                    log.warning(f"Process pool unavailable, using threads: {str(e)}")
+                    self.kind = "thread"
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="image"
+                )
+        return self._pool
+
+    async def run(
+        self, func: Callable[..., T], *args: Any, timeout: float | None = None
+    ) -> T:
+        """Run ``func(*args)`` in the pool and return its result.
+
+        ``func`` and its arguments must be picklable for the process pool.
+
+        Raises:
+            ImageExecutorBusy: If ``max_pending`` jobs are already in flight
+            TimeoutError: If the job takes longer than the timeout
+        """
+        if self._pending >= self.max_pending:
+            raise ImageExecutorBusy(
+                f"Image processing queue is full ({self.max_pending} jobs)"
+            )
+
+        try:
+            future = self._submit(func, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+        except BrokenProcessPool:
+            # A worker died (e.g. killed for memory); retry once on threads
+            log.error("Image process pool broke, falling back to threads")
+            self._replace_pool_with_threads()
+            future = self._submit(func, *args)
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout or self.timeout)
+
+    def _submit(self, func: Callable[..., T], *args: Any) -> Future[T]:
+        """Submit a job, holding a slot until the job is done or cancelled."""
+        future = self._get_pool().submit(func, *args)
+        with self._pending_lock:
+            self._pending += 1
+        future.add_done_callback(self._release)
+        return future
+
+    def _release(self, future: Future[Any]) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+
+    async def generate_thumbnail(self, image_data: bytes | memoryview) -> bytes:
+        """Async wrapper of :meth:`ImageProcessingService.generate_thumbnail`.
+
+        Thread workers read a memoryview in place. Process workers need a
+        pickled copy anyway, and memoryviews cannot be pickled, so they get
+        the bytes.
+
+        Raises:
+            ValueError: If the image cannot be processed
+            ImageExecutorBusy: If the queue is full
+            TimeoutError: If thumbnailing takes too long
+        """
+        if self.kind == "process" and isinstance(image_data, memoryview):
+            image_data = image_data.tobytes()
+        return await self.run(ImageProcessingService.generate_thumbnail, image_data)
+
+    async def generate_renditions(
+        self, image_data: bytes, widths: list[int], formats: list[str]
+    ) -> list[Rendition]:
+        """Async wrapper of :meth:`ImageProcessingService.generate_renditions`.
+
+        Raises:
+            ValueError: If the image cannot be processed
+            ImageExecutorBusy: If the queue is full
+            TimeoutError: If rendering takes too long
+        """
+        return await self.run(
+            ImageProcessingService.generate_renditions, image_data, widths, formats
+        )
+
+    def _replace_pool_with_threads(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = None
+        self.kind = "thread"
+
+    def shutdown(self) -> None:
+        """Stop the workers, letting running jobs finish."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+image_executor = ImageExecutor(
+    kind=settings.image_executor,
+    max_workers=settings.image_workers or None,
+    max_pending=settings.image_max_pending,
+    timeout=settings.image_timeout_seconds,
+)
@@ -0,0 +1,207 @@
+"""Header-only inspection of uploaded images.
+
+Format and dimensions are read from the first bytes of a file by a small
+parser for the accepted formats (JPEG, PNG, GIF, WebP), without involving
+Pillow's decoders. Files that are not images of these formats, whatever
+their extension, are rejected, as are images whose pixel count exceeds
+``IMAGE_MAX_PIXELS`` (decompression bombs), before the upload is buffered
+or a single pixel is decoded.
+"""
+
+import struct
+from typing import NamedTuple
+
+from fastapi import UploadFile
+
+# Header bytes read from an upload at first; doubled while more are needed
+HEADER_CHUNK_SIZE = 4 * 1024
+# JPEG metadata segments (EXIF, ICC, XMP) before the frame header are each
+# below 64KB; files whose dimensions are not found within this many bytes
+# are rejected
+MAX_HEADER_BYTES = 512 * 1024
+
+# Content types of the accepted formats, by Pillow format name
+IMAGE_CONTENT_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+}
+IMAGE_FORMATS = tuple(IMAGE_CONTENT_TYPES)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# JPEG start-of-frame markers; C4 (DHT), C8 (JPG) and CC (DAC) are not frames
+_JPEG_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers without a length field: TEM, RSTn
+_JPEG_STANDALONE_MARKERS = frozenset({0x01, *range(0xD0, 0xD8)})
+
+
+class ImageInfo(NamedTuple):
+    """Format and stored dimensions of an image."""
+
+    format: str  # One of IMAGE_FORMATS
+    width: int
+    height: int
+
+
+def _sniff_jpeg(header: memoryview) -> ImageInfo | None:
+    pos = 2
+    while True:
+        # Marker: 0xFF, optional 0xFF fill bytes, marker code
+        if pos >= len(header):
+            return None
+        if header[pos] != 0xFF:
+            raise ValueError("Corrupt JPEG header")
+        while pos < len(header) and header[pos] == 0xFF:
+            pos += 1
+        if pos >= len(header):
+            return None
+        marker = header[pos]
+        pos += 1
+        if marker in _JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header
+            raise ValueError("Corrupt JPEG header")
+        if pos + 2 > len(header):
+            return None
+        (length,) = struct.unpack_from(">H", header, pos)
+        if length < 2:
+            raise ValueError("Corrupt JPEG header")
+        if marker in _JPEG_SOF_MARKERS:
+            if pos + 7 > len(header):
+                return None
+            height, width = struct.unpack_from(">HH", header, pos + 3)
+            return ImageInfo("JPEG", width, height)
+        pos += length
+
+
+def _sniff_webp(header: memoryview) -> ImageInfo | None:
+    if len(header) < 30:
+        return None
+    chunk = bytes(header[12:16])
+    if chunk == b"VP8 ":
+        if bytes(header[23:26]) != b"\x9d\x01\x2a":
+            raise ValueError("Corrupt WebP header")
+        width, height = struct.unpack_from("<HH", header, 26)
+        return ImageInfo("WEBP", width & 0x3FFF, height & 0x3FFF)
+    if chunk == b"VP8L":
+        if header[20] != 0x2F:
+            raise ValueError("Corrupt WebP header")
+        (bits,) = struct.unpack_from("<I", header, 21)
+        return ImageInfo("WEBP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1)
+    if chunk == b"VP8X":
+        width = int.from_bytes(header[24:27], "little") + 1
+        height = int.from_bytes(header[27:30], "little") + 1
+        return ImageInfo("WEBP", width, height)
+    raise ValueError("Corrupt WebP header")
+
+
+def sniff_image(header: bytes | memoryview) -> ImageInfo | None:
+    """Read the format and dimensions of an image from its first bytes.
+
+    Args:
+        header: A prefix of the file, or all of it
+
+    Returns:
+        The format and dimensions, or None if more bytes are needed
+
+    Raises:
+        ValueError: If the file is not an image of an accepted format
+    """
+    header = memoryview(header).cast("B")
+    # Enough to tell the formats apart; no valid image is shorter
+    if len(header) < 12:
+        return None
+    if bytes(header[:2]) == b"\xff\xd8":
+        info = _sniff_jpeg(header)
+    elif bytes(header[:8]) == _PNG_SIGNATURE:
+        if len(header) < 24:
+            return None
+        if bytes(header[12:16]) != b"IHDR":
+            raise ValueError("Corrupt PNG header")
+        info = ImageInfo("PNG", *struct.unpack_from(">II", header, 16))
+    elif bytes(header[:6]) in (b"GIF87a", b"GIF89a"):
+        info = ImageInfo("GIF", *struct.unpack_from("<HH", header, 6))
+    elif bytes(header[:4]) == b"RIFF" and bytes(header[8:12]) == b"WEBP":
+        info = _sniff_webp(header)
+    else:
+        raise ValueError(
+            f"Unsupported image format. Allowed formats: {', '.join(IMAGE_FORMATS)}"
+        )
+    if info is not None and (info.width == 0 or info.height == 0):
+        raise ValueError("Corrupt image header: zero width or height")
+    return info
+
+
+def check_image_size(info: ImageInfo, max_pixels: int) -> None:
+    """Reject images that would take more than ``max_pixels`` to decode.
+
+    Raises:
+        ValueError: If the image has too many pixels
+    """
+    if info.width * info.height > max_pixels:
+        raise ValueError(
+            f"Image too large: {info.width}x{info.height} pixels. "
+            f"Maximum: {max_pixels / 1_000_000:g} megapixels"
+        )
+
+
+def inspect_image(data: bytes | memoryview, max_pixels: int) -> ImageInfo:
+    """Inspect an image held in memory.
+
+    Args:
+        data: The whole file
+        max_pixels: Maximum width times height accepted
+
+    Returns:
+        The format and dimensions
+
+    Raises:
+        ValueError: If the file is not an accepted image, is truncated or
+            has too many pixels
+    """
+    info = sniff_image(data)
+    if info is None:
+        raise ValueError("Corrupt image: truncated header")
+    check_image_size(info, max_pixels)
+    return info
+
+
+async def inspect_upload(file: UploadFile, max_pixels: int) -> ImageInfo:
+    """Inspect an upload from its first bytes, then rewind it.
+
+    Only as many bytes as the header needs are read, growing from
+    ``HEADER_CHUNK_SIZE`` up to ``MAX_HEADER_BYTES``.
+
+    Args:
+        file: The uploaded file, read from its start
+        max_pixels: Maximum width times height accepted
+
+    Returns:
+        The format and dimensions
+
+    Raises:
+        ValueError: If the file is not an accepted image, its header is
+            truncated or too long, or it has too many pixels
+    """
+    header = bytearray()
+    want = HEADER_CHUNK_SIZE
+    try:
+        while True:
+            chunk = await file.read(want - len(header))
+            header += chunk
+            info = sniff_image(header)
+            if info is not None:
+                break
+            if not chunk or len(header) < want:
+                raise ValueError("Corrupt image: truncated header")
+            if want >= MAX_HEADER_BYTES:
+                raise ValueError("Image header too long")
+            want = min(want * 2, MAX_HEADER_BYTES)
+        check_image_size(info, max_pixels)
+    except ValueError as e:
+        raise ValueError(f"Invalid image '{file.filename}': {str(e)}")
+    finally:
+        await file.seek(0)
+    return info
@@ -1,9 +1,82 @@
 """Image processing service for thumbnails and optimization."""
 
-import base64
 import io
+from collections.abc import Iterable
+from typing import NamedTuple
 
-from PIL import Image
+from PIL import ExifTags, Image, ImageOps
+
+from app.core.config import settings
+from app.services.image_inspection import inspect_image
+
+# EXIF orientations that swap width and height
+_TRANSPOSED_ORIENTATIONS = frozenset({5, 6, 7, 8})
+
+
+class _BufferReader(io.RawIOBase):
+    """Seekable file over a memoryview; unlike BytesIO it does not copy it."""
+
+    def __init__(self, data: memoryview):
+        self._data = data.cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:
+        chunk = self._data[self._pos : self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        base = {io.SEEK_SET: 0, io.SEEK_CUR: self._pos, io.SEEK_END: len(self._data)}
+        self._pos = max(0, base[whence] + offset)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+
+def _open_image(image_data: bytes | memoryview) -> Image.Image:
+    """Open an image lazily, after checking its header.
+
+    Raises:
+        ValueError: If it is not an accepted image or has too many pixels
+    """
+    info = inspect_image(image_data, settings.image_max_pixels)
+    # Only the decoder of the sniffed format may read the data
+    if isinstance(image_data, memoryview):
+        return Image.open(_BufferReader(image_data), formats=[info.format])
+    return Image.open(io.BytesIO(image_data), formats=[info.format])
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """Composite transparent images onto a white background."""
+    if image.mode in ("RGBA", "LA", "P"):
+        # Create white background
+        background = Image.new("RGB", image.size, (255, 255, 255))
+        if image.mode == "P":
+            image = image.convert("RGBA")
+        background.paste(
+            image,
+            mask=image.split()[-1] if image.mode in ("RGBA", "LA") else None,
+        )
+        image = background
+    return image
+
+
+class Rendition(NamedTuple):
+    """One encoded width and format of an image."""
+
+    width: int
+    height: int
+    format: str  # "webp" or "jpeg"
+    data: bytes
 
 
 class ImageProcessingService:
@@ -13,41 +86,40 @@ class ImageProcessingService:
     THUMBNAIL_SIZE = (300, 300)
     THUMBNAIL_QUALITY = 80  # JPEG quality for thumbnails
     THUMBNAIL_FORMAT = "JPEG"
+    # Thumbnails are reduced by integer factors (JPEG: while decoding) to
+    # this many times their size, then resampled; see Image.thumbnail
+    THUMBNAIL_REDUCING_GAP = 2.0
 
     @staticmethod
     def generate_thumbnail(
-        image_data: bytes, max_size: tuple[int, int] = THUMBNAIL_SIZE
-    ) -> str:
-        """Generate a thumbnail from image data and return as base64.
+        image_data: bytes | memoryview, max_size: tuple[int, int] = THUMBNAIL_SIZE
+    ) -> bytes:
+        """Generate a JPEG thumbnail from image data.
 
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes, or a view of a shared upload buffer
             max_size: Maximum thumbnail dimensions (width, height)
 
         Returns:
-            Base64-encoded thumbnail string (without data URI prefix)
+            JPEG-encoded thumbnail bytes
 
         Raises:
             ValueError: If image processing fails
         """
         try:
             # Open image from bytes
-            image = Image.open(io.BytesIO(image_data))
+            image = _open_image(image_data)
+
+            # JPEGs are decoded at 1/2, 1/4 or 1/8 scale where that is
+            # still large enough; must happen before anything loads them
+            gap = ImageProcessingService.THUMBNAIL_REDUCING_GAP
+            image.draft(None, (int(max_size[0] * gap), int(max_size[1] * gap)))
 
             # Convert RGBA to RGB if necessary (for JPEG compatibility)
-            if image.mode in ("RGBA", "LA", "P"):
-                # Create white background
-                background = Image.new("RGB", image.size, (255, 255, 255))
-                if image.mode == "P":
-                    image = image.convert("RGBA")
-                background.paste(
-                    image,
-                    mask=image.split()[-1] if image.mode in ("RGBA", "LA") else None,
-                )
-                image = background
+            image = _flatten(image)
 
             # Create thumbnail (maintains aspect ratio)
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
+            image.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=gap)
 
             # Save to bytes buffer as JPEG
             buffer = io.BytesIO()
@@ -57,19 +129,92 @@ class ImageProcessingService:
                 quality=ImageProcessingService.THUMBNAIL_QUALITY,
                 optimize=True,
             )
-            buffer.seek(0)
+            return buffer.getvalue()
+
+        except Exception as e:
+            raise ValueError(f"Failed to generate thumbnail: {str(e)}")
 
-            # Encode to base64
-            thumbnail_base64 = base64.b64encode(buffer.read()).decode("utf-8")
+    # Encoder settings per rendition format
+    RENDITION_SAVE_OPTIONS = {
+        "webp": {"format": "WEBP", "quality": 80, "method": 4},
+        "jpeg": {"format": "JPEG", "quality": 82, "optimize": True, "progressive": True},
+    }
+    RENDITION_CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+    # Each resize reduces by an integer factor first, then resamples by no
+    # less than this; 3.0 is indistinguishable from a plain LANCZOS resize
+    RENDITION_REDUCING_GAP = 3.0
 
-            return thumbnail_base64
+    @staticmethod
+    def generate_renditions(
+        image_data: bytes | memoryview, widths: Iterable[int], formats: Iterable[str]
+    ) -> list[Rendition]:
+        """Encode an image at several widths in several formats.
+
+        The image is decoded once, JPEGs at the smallest 1/2, 1/4 or 1/8
+        scale still as wide as the widest rendition, and scaled down step
+        by step, from the widest rendition to the narrowest. Widths above
+        the original width are clamped to it, so images are never upscaled.
+
+        Args:
+            image_data: Raw image bytes
+            widths: Target widths in pixels; heights keep the aspect ratio
+            formats: Output formats, keys of ``RENDITION_SAVE_OPTIONS``
+
+        Returns:
+            Renditions ordered by width, then in the order of ``formats``
+
+        Raises:
+            ValueError: If image processing fails or a format is unknown
+        """
+        formats = list(formats)
+        for fmt in formats:
+            if fmt not in ImageProcessingService.RENDITION_SAVE_OPTIONS:
+                raise ValueError(
+                    f"Invalid rendition format: {fmt}. Supported formats: 'webp', 'jpeg'"
+                )
+
+        widths = list(widths)
+        try:
+            image = _open_image(image_data)
+            if widths:
+                # Widest rendition, in the stored (not yet rotated) orientation
+                widest = max(widths)
+                orientation = image.getexif().get(ExifTags.Base.Orientation)
+                if orientation in _TRANSPOSED_ORIENTATIONS:
+                    image.draft(None, (1, widest))
+                else:
+                    image.draft(None, (widest, 1))
+            # Renditions are displayed as-is, so apply the EXIF orientation
+            image = _flatten(ImageOps.exif_transpose(image))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+
+            renditions: list[Rendition] = []
+            source = image
+            for width in sorted({min(w, image.width) for w in widths}, reverse=True):
+                height = max(1, round(image.height * width / image.width))
+                if source.size != (width, height):
+                    source = source.resize(
+                        (width, height),
+                        Image.Resampling.LANCZOS,
+                        reducing_gap=ImageProcessingService.RENDITION_REDUCING_GAP,
+                    )
+                for fmt in formats:
+                    buffer = io.BytesIO()
+                    source.save(
+                        buffer, **ImageProcessingService.RENDITION_SAVE_OPTIONS[fmt]
+                    )
+                    renditions.append(Rendition(width, height, fmt, buffer.getvalue()))
+
+            renditions.sort(key=lambda r: r.width)
+            return renditions
 
         except Exception as e:
-            raise ValueError(f"Failed to generate thumbnail: {str(e)}")
+            raise ValueError(f"Failed to generate renditions: {str(e)}")
 
     @staticmethod
-    def get_image_dimensions(image_data: bytes) -> tuple[int, int]:
-        """Get image dimensions.
+    def get_image_dimensions(image_data: bytes | memoryview) -> tuple[int, int]:
+        """Get image dimensions from the image header, without decoding it.
 
         Args:
             image_data: Raw image bytes
@@ -81,8 +226,8 @@ class ImageProcessingService:
             ValueError: If image cannot be processed
         """
         try:
-            image = Image.open(io.BytesIO(image_data))
-            return image.size
+            info = inspect_image(image_data, settings.image_max_pixels)
+            return info.width, info.height
         except Exception as e:
             raise ValueError(f"Failed to get image dimensions: {str(e)}")
 
@@ -0,0 +1,170 @@
+"""Streaming export of the whole listing catalogue.
+
+Listings are read through a server-side cursor and encoded one record at a
+time, so memory use stays constant regardless of catalogue size. Photos
+are aggregated per listing by the database rather than loaded as entities.
+"""
+
+import csv
+import io
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from sqlalchemy import JSON, Select, func, literal, select, text
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listing import Listing
+from app.models.listing_photo import ListingPhoto
+from app.models.user import User
+from app.services.listing_json import dumps
+
+EXPORT_FORMATS = ("ndjson", "csv")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Rows fetched from the server-side cursor per round trip
+EXPORT_BATCH_SIZE = 500
+
+LISTING_EXPORT_COLUMNS = (
+    Listing.id,
+    Listing.title,
+    Listing.description,
+    Listing.price_minor_units,
+    Listing.currency,
+    Listing.category,
+    Listing.condition,
+    Listing.status,
+    Listing.view_count,
+    Listing.seller_id,
+    Listing.created_at,
+    Listing.updated_at,
+    User.telegram_id.label("seller_telegram_id"),
+    User.username.label("seller_username"),
+    User.first_name.label("seller_first_name"),
+    User.last_name.label("seller_last_name"),
+)
+
+CSV_FIELDS = [column.key for column in LISTING_EXPORT_COLUMNS] + ["photos"]
+
+
+def listing_export_select(include_thumbnails: bool = False) -> Select:
+    """Select every listing with its seller and a JSON array of its photos.
+
+    Args:
+        include_thumbnails: Include the base64 ``thumbnail_data`` of each photo,
+            or its ``thumbnail_object_url`` if it is stored as an object
+    """
+    photo_fields: list[Any] = [
+        literal("id"),
+        ListingPhoto.id,
+        literal("photo_url"),
+        ListingPhoto.photo_url,
+        literal("display_order"),
+        ListingPhoto.display_order,
+    ]
+    if include_thumbnails:
+        photo_fields += [
+            literal("thumbnail_data"),
+            func.coalesce(
+                ListingPhoto.thumbnail_data,
+                # encode() wraps base64 lines at 76 characters
+                func.translate(func.encode(ListingPhoto.thumbnail_bytes, "base64"), "\n", ""),
+            ),
+            literal("thumbnail_object_url"),
+            ListingPhoto.thumbnail_object_url,
+        ]
+
+    photos = (
+        select(
+            func.coalesce(
+                func.json_agg(
+                    aggregate_order_by(
+                        func.json_build_object(*photo_fields),
+                        ListingPhoto.display_order,
+                        ListingPhoto.id,
+                    )
+                ),
+                text("'[]'::json"),
+                type_=JSON,
+            )
+        )
+        .where(ListingPhoto.listing_id == Listing.id)
+        .scalar_subquery()
+        .label("photos")
+    )
+
+    return (
+        select(*LISTING_EXPORT_COLUMNS, photos)
+        .join(User, User.id == Listing.seller_id)
+        .order_by(Listing.id)
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    )
+
+
+def _decode_photos(value: Any) -> list[dict[str, Any]]:
+    # Drivers without a JSON codec hand the aggregate back as text
+    return json.loads(value) if isinstance(value, str) else value
+
+
+async def iter_listing_records(
+    db: AsyncSession, include_thumbnails: bool = False
+) -> AsyncIterator[dict[str, Any]]:
+    """Yield every listing as a plain dict, in id order.
+
+    Args:
+        db: Database session; the cursor holds one of its connections
+        include_thumbnails: Include base64 thumbnails of each photo
+    """
+    result = await db.stream(listing_export_select(include_thumbnails))
+    async for row in result:
+        record = row._asdict()
+        record["photos"] = _decode_photos(record["photos"])
+        yield record
+
+
+async def export_ndjson(
+    records: AsyncIterator[dict[str, Any]],
+) -> AsyncIterator[bytes]:
+    """Encode records as newline-delimited JSON, one line per listing."""
+    async for record in records:
+        yield dumps(record) + b"\n"
+
+
+async def export_csv(records: AsyncIterator[dict[str, Any]]) -> AsyncIterator[bytes]:
+    """Encode records as CSV with a header row; photos become a JSON column."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS)
+
+    def drain() -> bytes:
+        chunk = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writeheader()
+    yield drain()
+    async for record in records:
+        record["photos"] = dumps(record["photos"]).decode()
+        record["created_at"] = record["created_at"].isoformat()
+        record["updated_at"] = record["updated_at"].isoformat()
+        writer.writerow(record)
+        yield drain()
+
+
+def export_listings(
+    db: AsyncSession, export_format: str, include_thumbnails: bool = False
+) -> AsyncIterator[bytes]:
+    """Stream the catalogue in ``export_format`` ("ndjson" or "csv").
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Invalid export format: {export_format}. Supported formats: 'ndjson', 'csv'"
+        )
+    records = iter_listing_records(db, include_thumbnails)
+    if export_format == "csv":
+        return export_csv(records)
+    return export_ndjson(records)
@@ -0,0 +1,110 @@
+"""Structured listing filters and facet counts."""
+
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from sqlalchemy import Subquery, and_, func, select, true
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.listing import Listing
+from app.schemas.listing import ListingFacets
+
+
+@dataclass(frozen=True)
+class ListingFilters:
+    """Attribute filters applied to feeds and searches."""
+
+    category: str | None = None
+    condition: str | None = None
+    min_price: int | None = None  # Inclusive, in minor units
+    max_price: int | None = None  # Inclusive, in minor units
+    currency: str | None = None
+    status: str | None = None
+
+    def clauses(self, *exclude: str, model: Any = Listing) -> list[ColumnElement[bool]]:
+        """Return WHERE clauses for the set filters.
+
+        Args:
+            exclude: Filter names to leave out, used for disjunctive facets
+            model: Entity carrying the filtered columns, ``Listing`` or its
+                ``ListingCard`` read model
+        """
+        clauses: list[ColumnElement[bool]] = []
+        if self.category is not None and "category" not in exclude:
+            clauses.append(model.category == self.category)
+        if self.condition is not None and "condition" not in exclude:
+            clauses.append(model.condition == self.condition)
+        if self.min_price is not None:
+            clauses.append(model.price_minor_units >= self.min_price)
+        if self.max_price is not None:
+            clauses.append(model.price_minor_units <= self.max_price)
+        if self.currency is not None:
+            clauses.append(model.currency == self.currency)
+        if self.status is not None:
+            clauses.append(model.status == self.status)
+        return clauses
+
+    def as_params(self) -> dict[str, Any]:
+        """Return the set filters as a dict, e.g. for cache keys."""
+        return {name: value for name, value in asdict(self).items() if value is not None}
+
+
+def facets_subquery(
+    filters: ListingFilters,
+    search_condition: ColumnElement[bool] | None = None,
+) -> Subquery:
+    """Count matching listings per category and per condition.
+
+    Facets are disjunctive: category counts ignore the category filter and
+    condition counts ignore the condition filter, so the client can show
+    how many results each alternative value would give.
+
+    The counts are grouped with GROUPING SETS and aggregated into a single
+    JSONB ``facets`` column of a one-row subquery, so they can be joined to
+    the page query and arrive in the same round trip. Read them back with
+    :func:`parse_facets`.
+
+    Args:
+        filters: Active filters
+        search_condition: Search match condition, if searching
+    """
+    category_clauses = (
+        [Listing.category == filters.category] if filters.category is not None else []
+    )
+    condition_clauses = (
+        [Listing.condition == filters.condition] if filters.condition is not None else []
+    )
+
+    counts = (
+        select(
+            func.grouping(Listing.category).label("is_condition_row"),
+            Listing.category,
+            Listing.condition,
+            func.count().filter(and_(true(), *condition_clauses)).label("category_count"),
+            func.count().filter(and_(true(), *category_clauses)).label("condition_count"),
+        )
+        .where(*filters.clauses("category", "condition"))
+        .group_by(func.grouping_sets(Listing.category, Listing.condition))
+    )
+    if search_condition is not None:
+        counts = counts.where(search_condition)
+
+    rows = counts.subquery("facet_counts")
+    return select(
+        func.jsonb_agg(func.jsonb_build_array(*rows.c), type_=JSONB).label("facets")
+    ).subquery("facets")
+
+
+def parse_facets(value: list[list[Any]] | None) -> ListingFacets:
+    """Build the facets from the ``facets`` column of :func:`facets_subquery`."""
+    facets = ListingFacets()
+    for is_condition_row, category, condition, category_count, condition_count in (
+        value or []
+    ):
+        if is_condition_row:
+            if condition is not None and condition_count:
+                facets.condition[condition] = condition_count
+        elif category is not None and category_count:
+            facets.category[category] = category_count
+    return facets
@@ -0,0 +1,172 @@
+"""Fast serialisation of listing pages straight from row tuples.
+
+The regular ``GET /listings/`` path loads ORM entities and validates each
+one through ``ListingWithSeller``, ``UserPublic`` and ``PhotoResponse``.
+This module selects plain columns instead and builds the JSON payload
+directly. The output is byte-for-byte identical to
+``ListingPage.model_dump_json()`` for the same rows, so both paths share
+cache entries and ETags.
+"""
+
+import json
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Row, Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.listing import Listing
+from app.models.listing_photo import ListingPhoto
+from app.models.user import User
+from app.schemas.listing import ListingFacets
+from app.schemas.photo import thumbnail_url
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None  # type: ignore[assignment]
+
+# Labels match the ``ListingWithSeller`` fields; seller columns are prefixed
+LISTING_ROW_COLUMNS = (
+    Listing.title,
+    Listing.description,
+    Listing.price_minor_units,
+    Listing.currency,
+    Listing.id,
+    Listing.seller_id,
+    Listing.created_at,
+    Listing.updated_at,
+    User.telegram_id.label("seller_telegram_id"),
+    User.username.label("seller_username"),
+    User.first_name.label("seller_first_name"),
+    User.last_name.label("seller_last_name"),
+    User.photo_url.label("seller_photo_url"),
+    User.updated_at.label("seller_updated_at"),
+)
+
+PHOTO_ROW_COLUMNS = (
+    ListingPhoto.listing_id,
+    ListingPhoto.id,
+    ListingPhoto.photo_url,
+    ListingPhoto.display_order,
+    ListingPhoto.renditions,
+    ListingPhoto.file_size_bytes,
+    ListingPhoto.original_filename,
+    ListingPhoto.created_at,
+)
+
+
+def listing_rows_select() -> Select:
+    """Select listing rows joined with their seller's public fields."""
+    return select(*LISTING_ROW_COLUMNS).join(User, User.id == Listing.seller_id)
+
+
+async def fetch_photo_rows(
+    db: AsyncSession, listing_ids: Sequence[int]
+) -> dict[int, list[Row]]:
+    """Fetch the photos of several listings in one query, grouped by listing."""
+    photos: dict[int, list[Row]] = defaultdict(list)
+    if not listing_ids:
+        return photos
+    result = await db.execute(
+        select(*PHOTO_ROW_COLUMNS)
+        .where(ListingPhoto.listing_id.in_(listing_ids))
+        # Same order as the Listing.photos relationship
+        .order_by(ListingPhoto.listing_id, ListingPhoto.display_order, ListingPhoto.id)
+    )
+    for photo in result:
+        photos[photo.listing_id].append(photo)
+    return photos
+
+
+def _default(value: Any) -> str:
+    """Encode datetimes the way Pydantic does, for the stdlib fallback."""
+    if isinstance(value, datetime):
+        return value.isoformat().replace("+00:00", "Z")
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(payload: Any) -> bytes:
+    """Encode a payload as compact UTF-8 JSON, using orjson when installed."""
+    if orjson is not None:
+        return orjson.dumps(payload, option=orjson.OPT_UTC_Z)
+    return json.dumps(
+        payload, default=_default, ensure_ascii=False, separators=(",", ":")
+    ).encode()
+
+
+def _renditions(value: list[dict[str, Any]] | None) -> list[dict[str, Any]] | None:
+    # JSONB does not keep key order; restore PhotoRendition's
+    if value is None:
+        return None
+    return [
+        {
+            "url": r["url"],
+            "width": r["width"],
+            "height": r["height"],
+            "format": r["format"],
+        }
+        for r in value
+    ]
+
+
+def render_listing_page(
+    rows: Iterable[Row],
+    photos: dict[int, list[Row]],
+    next_cursor: str | None,
+    facets: ListingFacets | None,
+) -> bytes:
+    """Encode a ``ListingPage`` from listing and photo rows.
+
+    Keys are emitted in schema field order so the bytes match Pydantic's.
+
+    Args:
+        rows: Rows selected with ``LISTING_ROW_COLUMNS``
+        photos: Photo rows per listing id, from ``fetch_photo_rows``
+        next_cursor: Cursor of the following page
+        facets: Facet counts, if the page has them
+    """
+    items = [
+        {
+            "title": row.title,
+            "description": row.description,
+            "price_minor_units": row.price_minor_units,
+            "currency": row.currency,
+            "id": row.id,
+            "seller_id": row.seller_id,
+            "created_at": row.created_at,
+            "updated_at": row.updated_at,
+            "photos": [
+                {
+                    "id": photo.id,
+                    "photo_url": photo.photo_url,
+                    "display_order": photo.display_order,
+                    "renditions": _renditions(photo.renditions),
+                    "file_size_bytes": photo.file_size_bytes,
+                    "original_filename": photo.original_filename,
+                    "created_at": photo.created_at,
+                    # Computed fields come last
+                    "thumbnail_url": thumbnail_url(photo.id),
+                }
+                for photo in photos.get(row.id, ())
+            ],
+            "seller": {
+                "id": row.seller_id,
+                "telegram_id": row.seller_telegram_id,
+                "username": row.seller_username,
+                "first_name": row.seller_first_name,
+                "last_name": row.seller_last_name,
+                "photo_url": row.seller_photo_url,
+            },
+        }
+        for row in rows
+    ]
+    return dumps(
+        {
+            "items": items,
+            "next_cursor": next_cursor,
+            "facets": facets.model_dump() if facets is not None else None,
+        }
+    )
@@ -0,0 +1,64 @@
+"""Keyset (cursor) pagination helpers for listing feeds."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import NamedTuple
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class ListingCursor(NamedTuple):
+    """Position of the last listing on a page in ``(created_at DESC, id DESC)`` order.
+
+    Search results are ordered by relevance first, so their cursors also carry
+    the search rank of the last row.
+    """
+
+    created_at: datetime
+    id: int
+    rank: float | None = None
+
+
+def encode_cursor(cursor: ListingCursor) -> str:
+    """Encode a cursor as an opaque URL-safe token.
+
+    Args:
+        cursor: Sort key of the last listing returned on the current page
+
+    Returns:
+        URL-safe base64 string without padding
+    """
+    values: list[object] = [cursor.created_at.isoformat(), cursor.id]
+    if cursor.rank is not None:
+        values.append(cursor.rank)
+    payload = json.dumps(values, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> ListingCursor:
+    """Decode a token produced by :func:`encode_cursor`.
+
+    Args:
+        token: Opaque cursor received from the client
+
+    Returns:
+        Decoded cursor
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        created_at, listing_id, *rank = json.loads(base64.urlsafe_b64decode(padded))
+        if len(rank) > 1:
+            raise ValueError("Unexpected cursor fields")
+        return ListingCursor(
+            datetime.fromisoformat(created_at),
+            int(listing_id),
+            float(rank[0]) if rank else None,
+        )
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError) as exc:
+        raise ValueError("Invalid pagination cursor") from exc
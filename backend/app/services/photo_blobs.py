@@ -0,0 +1,176 @@
+"""Content-addressed storage of listing photo files.
+
+Photos are stored under a key derived from the SHA-256 of their bytes, and
+``photo_blobs`` has one row per distinct file. A re-upload of a known file
+reuses its object, thumbnail and renditions instead of storing, thumbnailing
+and rendering it again. ``ref_count`` is kept by a trigger on ``listing_photos``. Objects
+are deleted only by :func:`purge_unreferenced_blobs`, once no photo has
+referenced them for a grace period.
+"""
+
+import logging
+from collections.abc import Sequence
+from datetime import timedelta
+from typing import NamedTuple
+
+from sqlalchemy import Row, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.photo_blob import PhotoBlob
+from app.services.storage import StorageBackend
+
+log = logging.getLogger(__name__)
+
+# Blobs examined per purge transaction
+PURGE_BATCH_SIZE = 100
+
+
+class StoredBlob(NamedTuple):
+    """A file uploaded under its content key, not yet recorded as a blob."""
+
+    sha256: str
+    url: str
+    content_type: str | None
+    size_bytes: int
+    thumbnail_bytes: bytes | None = None
+    thumbnail_object_url: str | None = None
+
+
+def blob_key(sha256: str) -> str:
+    """Storage key of the file with the given hex digest."""
+    return f"photos/{sha256}"
+
+
+def blob_thumbnail_key(sha256: str) -> str:
+    """Storage key of the thumbnail of the file with the given hex digest."""
+    return f"thumbnails/{sha256}.jpg"
+
+
+async def find_blob(db: AsyncSession, sha256: str) -> Row | None:
+    """Look up a stored file by digest and hold it until the transaction ends.
+
+    The row lock keeps the purge from deleting the file before the caller's
+    new reference is committed.
+    """
+    result = await db.execute(
+        select(
+            PhotoBlob.id,
+            PhotoBlob.url,
+            PhotoBlob.thumbnail_bytes,
+            PhotoBlob.thumbnail_object_url,
+            PhotoBlob.renditions,
+        )
+        .where(PhotoBlob.sha256 == sha256)
+        # KEY SHARE does not block the reference count updates of other uploads
+        .with_for_update(read=True, key_share=True)
+    )
+    return result.one_or_none()
+
+
+async def record_blob(db: AsyncSession, blob: StoredBlob) -> int:
+    """Record a newly stored file and return its id.
+
+    A concurrent upload of the same bytes may have recorded it first; both
+    wrote the same object, so its row is used. A row left without a
+    thumbnail by a failed upload gets this one.
+    """
+    stmt = insert(PhotoBlob).values(**blob._asdict())
+    result = await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[PhotoBlob.sha256],
+            set_={
+                "thumbnail_bytes": func.coalesce(
+                    PhotoBlob.thumbnail_bytes, stmt.excluded.thumbnail_bytes
+                ),
+                "thumbnail_object_url": func.coalesce(
+                    PhotoBlob.thumbnail_object_url, stmt.excluded.thumbnail_object_url
+                ),
+                "updated_at": func.now(),
+            },
+        ).returning(PhotoBlob.id)
+    )
+    return result.scalar_one()
+
+
+async def record_unreferenced(db: AsyncSession, blobs: Sequence[StoredBlob]) -> None:
+    """Record files stored by a failed upload so the purge removes them.
+
+    Run after the upload's transaction was rolled back; commits.
+    """
+    if not blobs:
+        return
+    await db.execute(
+        insert(PhotoBlob)
+        .values([blob._asdict() for blob in blobs])
+        .on_conflict_do_nothing(index_elements=[PhotoBlob.sha256])
+    )
+    await db.commit()
+
+
+def _blob_objects(row: Row) -> list[str]:
+    """URLs of the file, thumbnail and renditions of a blob."""
+    urls = [row.url, row.thumbnail_object_url]
+    urls.extend(rendition["url"] for rendition in row.renditions or ())
+    return [url for url in urls if url]
+
+
+async def purge_unreferenced_blobs(
+    db: AsyncSession,
+    storage_service: StorageBackend,
+    grace_seconds: float,
+    after_id: int = 0,
+    batch_size: int = PURGE_BATCH_SIZE,
+) -> int | None:
+    """Delete one batch of files unreferenced for ``grace_seconds`` and commit.
+
+    Objects are deleted while the rows are locked, so a concurrent upload
+    of the same bytes waits and then stores the file anew. Rows whose
+    objects could not be deleted are kept for the next run.
+
+    Args:
+        db: Session; the batch is committed
+        storage_service: Backend holding the files
+        grace_seconds: Minimum time since the last reference was released
+        after_id: Only blobs with a greater id are considered
+        batch_size: Maximum blobs per batch
+
+    Returns:
+        Id of the last blob of the batch to continue after, or None when done
+    """
+    result = await db.execute(
+        select(
+            PhotoBlob.id,
+            PhotoBlob.url,
+            PhotoBlob.thumbnail_object_url,
+            PhotoBlob.renditions,
+        )
+        .where(
+            PhotoBlob.id > after_id,
+            PhotoBlob.ref_count == 0,
+            PhotoBlob.updated_at < func.now() - timedelta(seconds=grace_seconds),
+        )
+        .order_by(PhotoBlob.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    objects = {row.id: _blob_objects(row) for row in rows}
+    # The objects of the whole batch go in as few requests as possible
+    deleted = await storage_service.delete_files(
+        [url for urls in objects.values() for url in urls]
+    )
+    for url, error in deleted.failed.items():
+        log.warning("Failed to delete %s: %s", url, error)
+    purged = [
+        row.id
+        for row in rows
+        if not any(url in deleted.failed for url in objects[row.id])
+    ]
+    if purged:
+        await db.execute(delete(PhotoBlob).where(PhotoBlob.id.in_(purged)))
+    await db.commit()
+    return rows[-1].id
@@ -0,0 +1,335 @@
+"""Background rendition pipeline for listing photos.
+
+Uploads only store the original and enqueue a row in ``photo_jobs``.
+Workers claim jobs with ``FOR UPDATE SKIP LOCKED``, download the original,
+encode it at every configured width and format in the image executor,
+store the results under deterministic keys and record them on the photo.
+Renditions of deduplicated photos belong to their blob: they are stored
+under the blob's digest and rendered once, and later photos of the blob
+copy them without a job (see :func:`enqueue_renditions`).
+Photos uploaded straight to storage arrive without a thumbnail; the job
+generates it as well.
+Any number of workers, in API processes or in ``scripts.rendition_worker``,
+can drain the same table.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import Callable, Sequence
+from datetime import timedelta
+from typing import Any, NamedTuple
+
+from sqlalchemy import and_, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.models.listing import Listing
+from app.models.listing_photo import ListingPhoto
+from app.models.photo_blob import PhotoBlob
+from app.models.photo_job import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_PENDING,
+    JOB_RUNNING,
+    PhotoJob,
+)
+from app.services.feed_cache import invalidate_listing
+from app.services.image_executor import image_executor
+from app.services.image_processing import ImageProcessingService
+from app.services.storage import get_storage_service
+from app.services.thumbnails import store_thumbnail, thumbnail_key
+
+log = logging.getLogger(__name__)
+
+# Seconds before the first retry; doubled after every further failure
+RETRY_BASE_DELAY = 10.0
+
+
+class ClaimedJob(NamedTuple):
+    """A job a worker has claimed."""
+
+    id: int
+    photo_id: int
+    attempts: int
+
+
+def rendition_key(owner: int | str, width: int, fmt: str) -> str:
+    """Storage key of a rendition; retries overwrite instead of leaking objects.
+
+    Args:
+        owner: Digest of the photo's blob, or the id of a photo without one
+        width: Rendition width in pixels
+        fmt: Rendition format
+    """
+    ext = "jpg" if fmt == "jpeg" else fmt
+    return f"renditions/{owner}/{width}w.{ext}"
+
+
+async def enqueue_renditions(
+    db: AsyncSession, photos: Sequence[ListingPhoto]
+) -> list[PhotoJob]:
+    """Queue rendition jobs for newly added photos in the caller's transaction.
+
+    Photos added with renditions, copied from their blob, get a job that is
+    already done, so their rendition status reads like any other.
+    Flushes so the photos and jobs have ids; the caller commits.
+    """
+    await db.flush()
+    jobs = [
+        PhotoJob(
+            photo_id=photo.id,
+            status=JOB_PENDING if photo.renditions is None else JOB_DONE,
+            attempts=0,
+        )
+        for photo in photos
+    ]
+    db.add_all(jobs)
+    await db.flush()
+    return jobs
+
+
+def _claim_statement(lease_seconds: float):
+    claimable = (
+        select(PhotoJob.id)
+        .where(
+            or_(
+                and_(PhotoJob.status == JOB_PENDING, PhotoJob.run_after <= func.now()),
+                # Abandoned by a worker that died mid-job
+                and_(
+                    PhotoJob.status == JOB_RUNNING,
+                    PhotoJob.locked_at < func.now() - timedelta(seconds=lease_seconds),
+                ),
+            )
+        )
+        .order_by(PhotoJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    return (
+        update(PhotoJob)
+        .where(PhotoJob.id == claimable)
+        .values(
+            status=JOB_RUNNING,
+            attempts=PhotoJob.attempts + 1,
+            locked_at=func.now(),
+        )
+        .returning(PhotoJob.id, PhotoJob.photo_id, PhotoJob.attempts)
+    )
+
+
+class RenditionWorker:
+    """Drains ``photo_jobs`` with a number of concurrent worker tasks."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        concurrency: int = 1,
+        poll_interval: float = 2.0,
+        max_attempts: int = 5,
+        lease_seconds: float = 300.0,
+    ):
+        """Initialize the worker.
+
+        Args:
+            session_factory: Creates the sessions used for claiming and saving
+            concurrency: Number of jobs processed at once
+            poll_interval: Seconds an idle task waits before polling again
+            max_attempts: Attempts before a job is marked failed
+            lease_seconds: Seconds after which a running job is presumed abandoned
+        """
+        self._session_factory = session_factory
+        self._concurrency = concurrency
+        self._poll_interval = poll_interval
+        self._max_attempts = max_attempts
+        self._lease_seconds = lease_seconds
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    def wake(self) -> None:
+        """Make idle tasks poll now, e.g. right after jobs were enqueued."""
+        self._wake.set()
+
+    async def claim(self) -> ClaimedJob | None:
+        """Claim the oldest runnable job, or return None if there is none."""
+        async with self._session_factory() as session:
+            result = await session.execute(_claim_statement(self._lease_seconds))
+            row = result.one_or_none()
+            await session.commit()
+        return ClaimedJob(*row) if row is not None else None
+
+    async def process_next(self) -> bool:
+        """Claim and process one job. Returns False if none was runnable."""
+        job = await self.claim()
+        if job is None:
+            return False
+        try:
+            await self._render(job)
+        except asyncio.CancelledError:
+            await self._release(job)
+            raise
+        except Exception as e:
+            log.warning(f"Rendition job {job.id} failed: {str(e)}")
+            await self._fail(job, e)
+        return True
+
+    async def _render(self, job: ClaimedJob) -> None:
+        async with self._session_factory() as session:
+            result = await session.execute(
+                select(
+                    ListingPhoto.listing_id,
+                    ListingPhoto.photo_url,
+                    or_(
+                        ListingPhoto.thumbnail_bytes.is_not(None),
+                        ListingPhoto.thumbnail_object_url.is_not(None),
+                        ListingPhoto.thumbnail_data.is_not(None),
+                    ).label("has_thumbnail"),
+                    PhotoBlob.sha256,
+                    PhotoBlob.renditions.label("blob_renditions"),
+                )
+                .outerjoin(PhotoBlob, PhotoBlob.id == ListingPhoto.blob_id)
+                .where(ListingPhoto.id == job.photo_id)
+            )
+            photo = result.one_or_none()
+        if photo is None:
+            # Photo deleted meanwhile; its job goes with it
+            return
+
+        storage_service = get_storage_service()
+        original: bytes | None = None
+        if photo.blob_renditions is not None:
+            # Rendered meanwhile for another photo of the same blob
+            records = photo.blob_renditions
+        else:
+            original = await storage_service.download_file(photo.photo_url)
+            renditions = await image_executor.generate_renditions(
+                original, settings.rendition_widths, settings.rendition_formats
+            )
+            owner = photo.sha256 or job.photo_id
+            urls = await asyncio.gather(
+                *(
+                    storage_service.upload_object(
+                        rendition_key(owner, r.width, r.format),
+                        r.data,
+                        ImageProcessingService.RENDITION_CONTENT_TYPES[r.format],
+                    )
+                    for r in renditions
+                )
+            )
+            records = [
+                {"url": url, "width": r.width, "height": r.height, "format": r.format}
+                for url, r in zip(urls, renditions)
+            ]
+        values: dict[str, Any] = {"renditions": records}
+        if not photo.has_thumbnail:
+            # Uploaded straight to storage (POST .../photos/presign)
+            if original is None:
+                original = await storage_service.download_file(photo.photo_url)
+            thumbnail = await image_executor.generate_thumbnail(original)
+            thumbnail_url = await store_thumbnail(
+                storage_service, thumbnail, thumbnail_key(job.photo_id)
+            )
+            values["thumbnail_bytes"] = None if thumbnail_url else thumbnail
+            values["thumbnail_object_url"] = thumbnail_url
+
+        async with self._session_factory() as session:
+            await session.execute(
+                update(ListingPhoto)
+                .where(ListingPhoto.id == job.photo_id)
+                .values(**values)
+            )
+            if photo.sha256 is not None and photo.blob_renditions is None:
+                # Later photos of the blob copy these instead of rendering
+                await session.execute(
+                    update(PhotoBlob)
+                    .where(PhotoBlob.sha256 == photo.sha256, PhotoBlob.renditions.is_(None))
+                    .values(renditions=records)
+                )
+            # Photos are part of the listing representation; bump its version
+            await session.execute(
+                update(Listing)
+                .where(Listing.id == photo.listing_id)
+                .values(updated_at=func.now())
+            )
+            await session.execute(
+                update(PhotoJob)
+                .where(PhotoJob.id == job.id)
+                .values(status=JOB_DONE, locked_at=None, last_error=None)
+            )
+            await session.commit()
+        await invalidate_listing(photo.listing_id)
+
+    async def _fail(self, job: ClaimedJob, error: Exception) -> None:
+        # Undecodable images fail the same way on every attempt
+        permanent = isinstance(error, ValueError) or job.attempts >= self._max_attempts
+        values: dict[str, Any] = {"locked_at": None, "last_error": str(error)[:1000]}
+        if permanent:
+            values["status"] = JOB_FAILED
+        else:
+            delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            values["status"] = JOB_PENDING
+            values["run_after"] = func.now() + timedelta(seconds=delay)
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(PhotoJob).where(PhotoJob.id == job.id).values(**values)
+                )
+                await session.commit()
+        except Exception:
+            # The lease expires and the job is retried
+            log.exception("Failed to record failure of rendition job %d", job.id)
+
+    async def _release(self, job: ClaimedJob) -> None:
+        """Hand back a job interrupted by shutdown without counting the attempt."""
+        try:
+            async with self._session_factory() as session:
+                await session.execute(
+                    update(PhotoJob)
+                    .where(PhotoJob.id == job.id)
+                    .values(
+                        status=JOB_PENDING,
+                        attempts=PhotoJob.attempts - 1,
+                        locked_at=None,
+                    )
+                )
+                await session.commit()
+        except Exception:
+            log.exception("Failed to release rendition job %d", job.id)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                found = await self.process_next()
+            except Exception:
+                log.exception("Rendition worker failed to claim a job")
+                found = False
+            if not found:
+                self._wake.clear()
+                with contextlib.suppress(TimeoutError):
+                    await asyncio.wait_for(self._wake.wait(), self._poll_interval)
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop."""
+        if not self._tasks:
+            self._tasks = [
+                asyncio.create_task(self._run()) for _ in range(self._concurrency)
+            ]
+
+    async def stop(self) -> None:
+        """Stop the worker tasks; interrupted jobs are retried after their lease."""
+        for task in self._tasks:
+            task.cancel()
+        for task in self._tasks:
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+        self._tasks = []
+
+
+rendition_worker = RenditionWorker(
+    concurrency=settings.rendition_workers,
+    poll_interval=settings.rendition_poll_interval_seconds,
+    max_attempts=settings.rendition_max_attempts,
+    lease_seconds=settings.rendition_lease_seconds,
+)
@@ -0,0 +1,76 @@
+"""Listing search backed by Postgres full-text and trigram indexes."""
+
+import re
+from typing import NamedTuple
+
+from sqlalchemy import Float, cast, func, literal, or_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.listing import SEARCH_CONFIGS, Listing
+
+# Longer queries are truncated; they only add tsquery terms without improving recall
+MAX_QUERY_LENGTH = 200
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+class ListingSearch(NamedTuple):
+    """SQL clauses for a single search query."""
+
+    condition: ColumnElement[bool]  # Row filter, served by the GIN indexes
+    rank: ColumnElement[float]  # Relevance score, higher is better
+
+
+def normalize_query(query: str | None) -> str | None:
+    """Collapse whitespace and trim a user query.
+
+    Returns:
+        Normalized query, or None if nothing searchable is left
+    """
+    if not query:
+        return None
+    normalized = _WHITESPACE.sub(" ", query).strip()[:MAX_QUERY_LENGTH]
+    return normalized or None
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_listing_search(query: str) -> ListingSearch:
+    """Build the filter and ranking expressions for a normalized query.
+
+    A listing matches when any of the following holds:
+
+    - its ``search_vector`` matches the query in one of ``SEARCH_CONFIGS``
+      (stemmed words, served by ``ix_listings_search_vector``);
+    - the title or description contains the query as a substring
+      (served by the ``*_trgm`` indexes);
+    - the query is similar to a word in the title, which tolerates typos
+      (``<%`` operator, served by ``ix_listings_title_trgm``).
+
+    Args:
+        query: Output of :func:`normalize_query`
+
+    Returns:
+        Condition and rank expressions to apply to a ``Listing`` select
+    """
+    ts_query = func.websearch_to_tsquery(SEARCH_CONFIGS[0], query)
+    for config in SEARCH_CONFIGS[1:]:
+        ts_query = ts_query.op("||")(func.websearch_to_tsquery(config, query))
+
+    pattern = f"%{_escape_like(query)}%"
+    condition = or_(
+        Listing.search_vector.op("@@")(ts_query),
+        Listing.title.ilike(pattern, escape="\\"),
+        Listing.description.ilike(pattern, escape="\\"),
+        literal(query).op("<%")(Listing.title),
+    )
+
+    # Cast to double precision so cursor values round-trip exactly
+    rank = cast(
+        func.ts_rank_cd(Listing.search_vector, ts_query)
+        + func.word_similarity(query, Listing.title),
+        Float,
+    )
+    return ListingSearch(condition=condition, rank=rank)
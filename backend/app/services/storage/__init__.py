@@ -3,7 +3,13 @@
 from typing import Union
 
 from app.core.config import settings
-from app.services.storage.base import StorageBackend
+from app.services.storage.base import (
+    BatchResult,
+    ObjectInfo,
+    PresignedUpload,
+    StorageBackend,
+    StoredObject,
+)
 from app.services.storage.s3_backend import S3StorageService
 from app.services.storage.supabase_backend import SupabaseStorageService
 
@@ -38,4 +44,21 @@ def get_storage_service() -> StorageBackend:
     return _storage_service
 
 
-__all__ = ["get_storage_service", "StorageBackend"]
+async def close_storage_service() -> None:
+    """Close the storage service's connections, if it was created."""
+    global _storage_service
+
+    if _storage_service is not None:
+        await _storage_service.aclose()
+        _storage_service = None
+
+
+__all__ = [
+    "BatchResult",
+    "close_storage_service",
+    "get_storage_service",
+    "ObjectInfo",
+    "PresignedUpload",
+    "StorageBackend",
+    "StoredObject",
+]
@@ -1,10 +1,44 @@
 """Base storage backend protocol."""
 
-from typing import Protocol
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
+from typing import NamedTuple, Protocol
 
 from fastapi import UploadFile
 
 
+class StoredObject(NamedTuple):
+    """An object found by listing the bucket."""
+
+    key: str
+    size: int
+    last_modified: datetime
+
+
+class PresignedUpload(NamedTuple):
+    """Where and how a client uploads one file straight to storage."""
+
+    key: str
+    url: str
+    method: str  # "POST": multipart form of ``fields`` then the file; "PUT": raw body
+    fields: dict[str, str]
+    headers: dict[str, str]
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a batch operation that may partly fail."""
+
+    succeeded: list[str]
+    failed: dict[str, str]  # Error message by input
+
+
+class ObjectInfo(NamedTuple):
+    """Metadata of a stored object."""
+
+    size: int
+    content_type: str | None
+
+
 class StorageBackend(Protocol):
     """Protocol for storage backends."""
 
@@ -38,7 +72,141 @@ class StorageBackend(Protocol):
         """
         ...
 
-    def delete_file(self, url: str) -> bool:
+    async def upload_bytes(
+        self,
+        data: bytes | memoryview,
+        filename: str | None,
+        content_type: str | None,
+        folder: str = "listings",
+    ) -> str:
+        """Upload an already read and validated file and return public URL.
+
+        Args:
+            data: File contents; streamed to storage without copying
+            filename: Original filename; only its extension is used
+            content_type: MIME type of the file
+            folder: Folder path in storage
+
+        Returns:
+            Public URL of the uploaded file
+
+        Raises:
+            Exception: If upload fails
+        """
+        ...
+
+    async def upload_object(
+        self, key: str, data: bytes | memoryview, content_type: str
+    ) -> str:
+        """Store ``data`` under a caller-chosen key, replacing any existing object.
+
+        Args:
+            key: Object key / storage path
+            data: Object contents
+            content_type: MIME type of the object
+
+        Returns:
+            Public URL of the object
+
+        Raises:
+            Exception: If upload fails
+        """
+        ...
+
+    async def download_file(self, url: str) -> bytes:
+        """Download a stored file.
+
+        Args:
+            url: Public URL of the file
+
+        Returns:
+            The file contents
+
+        Raises:
+            ValueError: If the URL does not belong to this storage
+            Exception: If download fails
+        """
+        ...
+
+    def public_url(self, key: str) -> str:
+        """Return the public URL of an object key."""
+        ...
+
+    async def presign_upload(
+        self, key: str, content_type: str, max_size: int, expires_in: int
+    ) -> PresignedUpload:
+        """Authorize a client to upload one object under ``key`` directly.
+
+        Args:
+            key: Object key / storage path the file must be stored under
+            content_type: MIME type the object must be stored with
+            max_size: Maximum accepted size in bytes, where the backend can enforce it
+            expires_in: Seconds the authorization is valid, where supported
+
+        Raises:
+            Exception: If the backend refuses to sign the upload
+        """
+        ...
+
+    async def head_object(self, key: str) -> ObjectInfo | None:
+        """Return the size and type of an object, or None if it does not exist.
+
+        Raises:
+            Exception: If the request fails
+        """
+        ...
+
+    def list_objects(
+        self, prefix: str, page_size: int = 1000
+    ) -> AsyncIterator[list[StoredObject]]:
+        """Iterate over the objects under a folder, one page at a time.
+
+        Only one page is held at a time, so any number of objects can be
+        listed in bounded memory.
+
+        Args:
+            prefix: Folder to list, ending with "/"; listed recursively
+            page_size: Maximum objects per page
+
+        Raises:
+            Exception: If a request fails
+        """
+        ...
+
+    async def exists_many(self, keys: Iterable[str]) -> set[str]:
+        """Return those of ``keys`` that exist.
+
+        Raises:
+            Exception: If a request fails
+        """
+        ...
+
+    async def copy(self, source_key: str, dest_key: str) -> str:
+        """Copy an object within the bucket, replacing ``dest_key``.
+
+        Returns:
+            Public URL of the copy
+
+        Raises:
+            Exception: If the copy fails
+        """
+        ...
+
+    async def delete_files(self, urls: Sequence[str]) -> BatchResult:
+        """Delete many files in as few requests as the backend allows.
+
+        Files that do not exist count as deleted. Never raises for the
+        failures of individual files or batches; they are reported.
+
+        Args:
+            urls: Public URLs of the files to delete
+
+        Returns:
+            The deleted URLs, and the error of each URL that was not deleted
+        """
+        ...
+
+    async def delete_file(self, url: str) -> bool:
         """Delete file from storage.
 
         Args:
@@ -48,3 +216,7 @@ class StorageBackend(Protocol):
             True if deletion was successful, False otherwise
         """
         ...
+
+    async def aclose(self) -> None:
+        """Close the backend's pooled connections."""
+        ...
@@ -0,0 +1,25 @@
+"""Pooled async HTTP client shared by the storage backends."""
+
+import httpx
+
+from app.core.config import settings
+
+
+def create_http_client(**kwargs) -> httpx.AsyncClient:
+    """Create a keep-alive connection pool with per-request timeouts.
+
+    Args:
+        kwargs: Extra ``httpx.AsyncClient`` arguments, e.g. ``base_url``
+    """
+    return httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=settings.storage_max_connections,
+            max_keepalive_connections=settings.storage_max_keepalive_connections,
+            keepalive_expiry=settings.storage_keepalive_expiry_seconds,
+        ),
+        timeout=httpx.Timeout(
+            settings.storage_timeout_seconds,
+            connect=settings.storage_connect_timeout_seconds,
+        ),
+        **kwargs,
+    )
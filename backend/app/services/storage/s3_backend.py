@@ -1,18 +1,48 @@
 """S3-compatible storage service for file uploads."""
 
+import asyncio
+import base64
+import contextlib
+import hashlib
+import json
 import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-
-import boto3
-from botocore.client import Config
-from botocore.exceptions import ClientError
+from urllib.parse import quote, urlencode
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import httpx
+from botocore.auth import S3SigV4Auth, S3SigV4PostAuth
+from botocore.awsrequest import AWSRequest
+from botocore.credentials import Credentials
 from fastapi import UploadFile
 
 from app.core.config import settings
+from app.services.storage.base import (
+    BatchResult,
+    ObjectInfo,
+    PresignedUpload,
+    StoredObject,
+)
+from app.services.storage.http import create_http_client
+from app.services.storage.streaming import file_too_large, iter_chunks, read_upload
+
+# Bodies above this size are hashed for signing off the event loop
+_SIGN_IN_THREAD_BYTES = 256 * 1024
+
+# Most keys S3 accepts in one DeleteObjects request, and returns per listing
+DELETE_OBJECTS_MAX_KEYS = 1000
+LIST_OBJECTS_MAX_KEYS = 1000
 
 
 class S3StorageService:
-    """Service for uploading files to S3-compatible storage (MinIO, AWS S3, etc)."""
+    """Service for uploading files to S3-compatible storage (MinIO, AWS S3, etc).
+
+    Talks to the S3 REST API through a pooled ``httpx.AsyncClient`` with
+    SigV4-signed requests, so no call blocks the event loop.
+    """
 
     # Allowed file extensions
     ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -21,45 +51,99 @@ class S3StorageService:
     MAX_FILE_SIZE = 10 * 1024 * 1024
 
     def __init__(self):
-        """Initialize S3 client."""
-        s3_config = {}
-
-        if settings.s3_endpoint_url:
-            s3_config["endpoint_url"] = settings.s3_endpoint_url
-
-        self.s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=settings.s3_access_key_id,
-            aws_secret_access_key=settings.s3_secret_access_key,
-            region_name=settings.s3_region,
-            config=Config(signature_version="s3v4"),
-            **s3_config,
+        """Initialize the S3 HTTP client. The bucket is checked on first use."""
+        self.credentials = Credentials(
+            settings.s3_access_key_id, settings.s3_secret_access_key
         )
-
+        self.region = settings.s3_region
+        self.endpoint_url = (settings.s3_endpoint_url or "").rstrip("/") or None
         self.bucket_name = settings.s3_bucket_name
         self.public_url_base = settings.s3_public_url_base
+        self.multipart_threshold = settings.s3_multipart_threshold_bytes
+        self.multipart_part_size = settings.s3_multipart_part_size_bytes
+
+        self.http = create_http_client()
+        self._bucket_ready = False
+        self._bucket_lock = asyncio.Lock()
+
+    def _bucket_url(self) -> str:
+        if self.endpoint_url:
+            # Path-style addressing for MinIO and other S3-compatible servers
+            return f"{self.endpoint_url}/{self.bucket_name}"
+        if self.region == "us-east-1":
+            return f"https://{self.bucket_name}.s3.amazonaws.com"
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com"
+
+    def _object_url(self, key: str) -> str:
+        return f"{self._bucket_url()}/{quote(key, safe='/~')}"
+
+    def _sign(
+        self, method: str, url: str, body: bytes, headers: dict[str, str]
+    ) -> dict[str, str]:
+        request = AWSRequest(method=method, url=url, data=body, headers=headers)
+        S3SigV4Auth(self.credentials, "s3", self.region).add_auth(request)
+        return dict(request.headers.items())
+
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        body: bytes | memoryview = b"",
+        headers: dict[str, str] | None = None,
+        params: dict[str, str] | None = None,
+        timeout: float | None = None,
+    ) -> httpx.Response:
+        """Send a signed request to S3.
 
-        # Ensure bucket exists
-        self._ensure_bucket_exists()
+        Args:
+            method: HTTP method
+            url: Bucket or object URL without query string
+            body: Request body; a memoryview is streamed without copying
+            headers: Extra headers to sign and send
+            params: Query parameters
+            timeout: Overrides the client's timeout for this call
+        """
+        if params:
+            # Encoded as SigV4 canonicalizes them, "/" included (continuation tokens)
+            url = f"{url}?{urlencode(sorted(params.items()), quote_via=quote, safe='~')}"
+        headers = dict(headers or {})
+        if len(body) > _SIGN_IN_THREAD_BYTES:
+            # SigV4 hashes the payload; keep that CPU work off the loop
+            signed = await asyncio.to_thread(self._sign, method, url, body, headers)
+        else:
+            signed = self._sign(method, url, body, headers)
+        content = body
+        if isinstance(body, memoryview):
+            content = iter_chunks(body)
+            signed["Content-Length"] = str(len(body))
+        return await self.http.request(
+            method,
+            url,
+            content=content,
+            headers=signed,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+        )
 
-    def _ensure_bucket_exists(self):
+    async def _ensure_bucket_exists(self) -> None:
         """Create bucket if it doesn't exist."""
-        try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
-        except ClientError as e:
-            error_code = e.response["Error"]["Code"]
-            if error_code == "404":
-                # Bucket doesn't exist, create it
-                try:
-                    if settings.s3_region == "us-east-1":
-                        self.s3_client.create_bucket(Bucket=self.bucket_name)
-                    else:
-                        self.s3_client.create_bucket(
-                            Bucket=self.bucket_name,
-                            CreateBucketConfiguration={
-                                "LocationConstraint": settings.s3_region
-                            },
-                        )
+        if self._bucket_ready:
+            return
+        async with self._bucket_lock:
+            if self._bucket_ready:
+                return
+            try:
+                response = await self._request("HEAD", self._bucket_url())
+                if response.status_code == 404:
+                    # Bucket doesn't exist, create it
+                    body = b""
+                    if self.region != "us-east-1":
+                        body = (
+                            "<CreateBucketConfiguration>"
+                            f"<LocationConstraint>{self.region}</LocationConstraint>"
+                            "</CreateBucketConfiguration>"
+                        ).encode()
+                    response = await self._request("PUT", self._bucket_url(), body)
+                    response.raise_for_status()
 
                     # Set bucket policy to make objects publicly readable
                     policy = {
@@ -74,15 +158,18 @@ class S3StorageService:
                             }
                         ],
                     }
-                    import json
-
-                    self.s3_client.put_bucket_policy(
-                        Bucket=self.bucket_name, Policy=json.dumps(policy)
+                    response = await self._request(
+                        "PUT",
+                        self._bucket_url(),
+                        json.dumps(policy).encode(),
+                        params={"policy": ""},
                     )
-                except ClientError as create_error:
-                    # If bucket creation fails, log but continue
-                    # (bucket might be created manually)
-                    print(f"Warning: Could not create bucket: {create_error}")
+                    response.raise_for_status()
+            except httpx.HTTPError as create_error:
+                # If bucket creation fails, log but continue
+                # (bucket might be created manually)
+                print(f"Warning: Could not create bucket: {create_error}")
+            self._bucket_ready = True
 
     def validate_file(self, file: UploadFile) -> None:
         """Validate file type and size.
@@ -101,15 +188,32 @@ class S3StorageService:
                     f"Invalid file type. Allowed types: {', '.join(self.ALLOWED_IMAGE_EXTENSIONS)}"
                 )
 
-        # Check file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
-
-        if file_size > self.MAX_FILE_SIZE:
-            raise ValueError(
-                f"File too large. Maximum size: {self.MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
+        # Reject sizes the multipart parser already knows to be too large;
+        # read_upload enforces the limit while reading
+        if file.size is not None and file.size > self.MAX_FILE_SIZE:
+            raise file_too_large(self.MAX_FILE_SIZE)
+
+    def public_url(self, key: str) -> str:
+        """Return the public URL of an object key."""
+        if self.public_url_base:
+            return f"{self.public_url_base}/{key}"
+        if self.endpoint_url:
+            return f"{self.endpoint_url}/{self.bucket_name}/{key}"
+        # AWS S3 standard URL format
+        if self.region == "us-east-1":
+            return f"https://{self.bucket_name}.s3.amazonaws.com/{key}"
+        return f"https://{self.bucket_name}.s3.{self.region}.amazonaws.com/{key}"
+
+    def key_from_url(self, url: str) -> str | None:
+        """Return the object key of a public URL, or None if it is not ours."""
+        # Handle different URL formats
+        if self.public_url_base and url.startswith(f"{self.public_url_base}/"):
+            return url[len(self.public_url_base) + 1 :]
+        if self.bucket_name in url:
+            parts = url.split(f"{self.bucket_name}/")
+            if len(parts) > 1:
+                return parts[-1]
+        return None
 
     async def upload_file(self, file: UploadFile, folder: str = "listings") -> str:
         """Upload file to S3 and return public URL.
@@ -127,40 +231,325 @@ class S3StorageService:
         """
         # Validate file
         self.validate_file(file)
+        contents = await read_upload(file, self.MAX_FILE_SIZE)
+        return await self.upload_bytes(
+            contents, file.filename, file.content_type, folder=folder
+        )
+
+    async def upload_bytes(
+        self,
+        data: bytes | memoryview,
+        filename: str | None,
+        content_type: str | None,
+        folder: str = "listings",
+    ) -> str:
+        """Upload an already read file to S3 and return public URL.
+
+        The body is streamed from ``data`` without copying it. Files of at
+        least ``S3_MULTIPART_THRESHOLD_BYTES`` are sent as a multipart upload.
+
+        Args:
+            data: File contents, e.g. a view of the buffer from read_upload
+            filename: Original filename; only its extension is used
+            content_type: MIME type, defaults to image/jpeg
+            folder: Folder path in S3 bucket
 
+        Returns:
+            Public URL of the uploaded file
+
+        Raises:
+            Exception: If upload fails
+        """
         # Generate unique filename
-        ext = Path(file.filename or "image.jpg").suffix.lower()
+        ext = Path(filename or "image.jpg").suffix.lower()
         unique_filename = f"{uuid.uuid4()}{ext}"
         s3_key = f"{folder}/{unique_filename}"
+        return await self.upload_object(s3_key, data, content_type or "image/jpeg")
+
+    async def upload_object(
+        self, key: str, data: bytes | memoryview, content_type: str
+    ) -> str:
+        """Store ``data`` under ``key``, replacing any existing object.
+
+        Args:
+            key: Object key in the bucket
+            data: Object contents
+            content_type: MIME type of the object
+
+        Returns:
+            Public URL of the object
+
+        Raises:
+            Exception: If upload fails
+        """
+        headers = {"Content-Type": content_type}
 
         try:
-            # Upload file
-            contents = await file.read()
-            self.s3_client.put_object(
-                Bucket=self.bucket_name,
-                Key=s3_key,
-                Body=contents,
-                ContentType=file.content_type or "image/jpeg",
-            )
+            await self._ensure_bucket_exists()
 
-            # Generate public URL
-            if self.public_url_base:
-                public_url = f"{self.public_url_base}/{s3_key}"
-            elif settings.s3_endpoint_url:
-                public_url = f"{settings.s3_endpoint_url}/{self.bucket_name}/{s3_key}"
+            # Upload file
+            if len(data) >= self.multipart_threshold:
+                await self._multipart_upload(key, memoryview(data), headers)
             else:
-                # AWS S3 standard URL format
-                if settings.s3_region == "us-east-1":
-                    public_url = f"https://{self.bucket_name}.s3.amazonaws.com/{s3_key}"
-                else:
-                    public_url = f"https://{self.bucket_name}.s3.{settings.s3_region}.amazonaws.com/{s3_key}"
+                response = await self._request(
+                    "PUT", self._object_url(key), memoryview(data), headers=headers
+                )
+                response.raise_for_status()
 
-            return public_url
+            return self.public_url(key)
 
         except Exception as e:
             raise Exception(f"Failed to upload file: {str(e)}")
 
-    def delete_file(self, url: str) -> bool:
+    async def download_file(self, url: str) -> bytes:
+        """Download a stored file.
+
+        Args:
+            url: Public URL of the file
+
+        Returns:
+            The file contents
+
+        Raises:
+            ValueError: If the URL does not belong to this bucket
+            Exception: If download fails
+        """
+        s3_key = self.key_from_url(url)
+        if s3_key is None:
+            raise ValueError(f"Not a URL of bucket {self.bucket_name}: {url}")
+
+        try:
+            response = await self._request("GET", self._object_url(s3_key))
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            raise Exception(f"Failed to download file: {str(e)}")
+
+    async def presign_upload(
+        self, key: str, content_type: str, max_size: int, expires_in: int
+    ) -> PresignedUpload:
+        """Sign a POST policy for uploading one object straight to the bucket.
+
+        The policy pins the key and content type and limits the size, so S3
+        rejects any other upload made with it.
+
+        Args:
+            key: Object key the file must be stored under
+            content_type: Content-Type the form must send
+            max_size: Maximum object size in bytes
+            expires_in: Seconds the policy is valid
+
+        Returns:
+            The bucket URL and the form fields to send before the file
+        """
+        await self._ensure_bucket_exists()
+        expiration = datetime.now(timezone.utc) + timedelta(seconds=expires_in)
+        fields = {"key": key, "Content-Type": content_type}
+        request = AWSRequest(method="POST", url=self._bucket_url())
+        request.context["s3-presign-post-fields"] = fields
+        request.context["s3-presign-post-policy"] = {
+            "expiration": expiration.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "conditions": [
+                {"bucket": self.bucket_name},
+                {"key": key},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, max_size],
+            ],
+        }
+        # Adds the credential, date, policy and signature fields
+        S3SigV4PostAuth(self.credentials, "s3", self.region).add_auth(request)
+        return PresignedUpload(key, self._bucket_url(), "POST", fields, {})
+
+    async def head_object(self, key: str) -> ObjectInfo | None:
+        """Return the size and type of an object, or None if it does not exist."""
+        response = await self._request("HEAD", self._object_url(key))
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return ObjectInfo(
+            int(response.headers["Content-Length"]),
+            response.headers.get("Content-Type"),
+        )
+
+    async def list_objects(
+        self, prefix: str, page_size: int = LIST_OBJECTS_MAX_KEYS
+    ) -> AsyncIterator[list[StoredObject]]:
+        """Iterate over the objects under ``prefix`` with ListObjectsV2.
+
+        Pages are requested one after the other with continuation tokens;
+        objects deleted meanwhile do not disturb the listing.
+
+        Args:
+            prefix: Key prefix to list
+            page_size: Maximum objects per page, at most 1000
+        """
+        params = {"list-type": "2", "max-keys": str(page_size), "prefix": prefix}
+        while True:
+            response = await self._request("GET", self._bucket_url(), params=params)
+            response.raise_for_status()
+            root = ElementTree.fromstring(response.content)
+            page = [
+                StoredObject(
+                    item.findtext("{*}Key"),
+                    int(item.findtext("{*}Size")),
+                    datetime.fromisoformat(item.findtext("{*}LastModified")),
+                )
+                for item in root.iterfind("{*}Contents")
+            ]
+            if page:
+                yield page
+            token = root.findtext("{*}NextContinuationToken")
+            if root.findtext("{*}IsTruncated") != "true" or not token:
+                return
+            params["continuation-token"] = token
+
+    async def exists_many(self, keys: Iterable[str]) -> set[str]:
+        """Return those of ``keys`` that exist.
+
+        S3 has no batch HEAD; the HEAD requests run concurrently, at most
+        as many as the connection pool holds.
+        """
+        semaphore = asyncio.Semaphore(settings.storage_max_connections)
+
+        async def exists(key: str) -> bool:
+            async with semaphore:
+                return await self.head_object(key) is not None
+
+        keys = list(dict.fromkeys(keys))
+        found = await asyncio.gather(*(exists(key) for key in keys))
+        return {key for key, ok in zip(keys, found) if ok}
+
+    async def copy(self, source_key: str, dest_key: str) -> str:
+        """Copy an object within the bucket on the server side.
+
+        Returns:
+            Public URL of the copy
+
+        Raises:
+            Exception: If the copy fails
+        """
+        source = quote(f"/{self.bucket_name}/{source_key}", safe="/~")
+        response = await self._request(
+            "PUT", self._object_url(dest_key), headers={"x-amz-copy-source": source}
+        )
+        response.raise_for_status()
+        # Copies can fail after the 200 status line has been sent
+        if ElementTree.fromstring(response.content).tag == "Error":
+            raise Exception(f"Copy failed: {response.text}")
+        return self.public_url(dest_key)
+
+    async def delete_files(self, urls: Sequence[str]) -> BatchResult:
+        """Delete many files with DeleteObjects, up to 1000 keys per request.
+
+        The requests run concurrently. Keys that do not exist count as
+        deleted, as with S3's DeleteObjects itself.
+
+        Args:
+            urls: Public URLs of the files to delete
+
+        Returns:
+            The deleted URLs, and the error of each URL that was not deleted
+        """
+        keys: dict[str, str] = {}
+        failed: dict[str, str] = {}
+        for url in urls:
+            key = self.key_from_url(url)
+            if key is None:
+                failed[url] = f"Not a URL of bucket {self.bucket_name}"
+            else:
+                keys[key] = url
+
+        all_keys = list(keys)
+        batches = [
+            all_keys[start : start + DELETE_OBJECTS_MAX_KEYS]
+            for start in range(0, len(all_keys), DELETE_OBJECTS_MAX_KEYS)
+        ]
+        results = await asyncio.gather(
+            *(self._delete_objects(batch) for batch in batches), return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                failed.update({keys[key]: str(result) for key in batch})
+            elif isinstance(result, BaseException):
+                raise result
+            else:
+                failed.update({keys[key]: error for key, error in result.items()})
+        return BatchResult([url for url in keys.values() if url not in failed], failed)
+
+    async def _delete_objects(self, keys: list[str]) -> dict[str, str]:
+        """Send one DeleteObjects request; returns the error of each failed key."""
+        objects = "".join(f"<Object><Key>{escape(key)}</Key></Object>" for key in keys)
+        body = f"<Delete><Quiet>true</Quiet>{objects}</Delete>".encode()
+        response = await self._request(
+            "POST",
+            self._bucket_url(),
+            body,
+            # Required by DeleteObjects
+            headers={"Content-MD5": base64.b64encode(hashlib.md5(body).digest()).decode()},
+            params={"delete": ""},
+        )
+        response.raise_for_status()
+        root = ElementTree.fromstring(response.content)
+        if root.tag == "Error":
+            raise Exception(f"DeleteObjects failed: {response.text}")
+        # Quiet mode lists only the keys that could not be deleted
+        return {
+            error.findtext("{*}Key"): (
+                f"{error.findtext('{*}Code')}: {error.findtext('{*}Message')}"
+            )
+            for error in root.iterfind("{*}Error")
+        }
+
+    async def _multipart_upload(
+        self, key: str, data: memoryview, headers: dict[str, str]
+    ) -> None:
+        """Upload ``data`` in parts, aborting the upload if any part fails."""
+        url = self._object_url(key)
+        response = await self._request("POST", url, headers=headers, params={"uploads": ""})
+        response.raise_for_status()
+        upload_id = ElementTree.fromstring(response.content).findtext("{*}UploadId")
+
+        async def upload_part(number: int, start: int) -> str:
+            part = data[start : start + self.multipart_part_size]
+            response = await self._request(
+                "PUT",
+                url,
+                part,
+                params={"partNumber": str(number), "uploadId": upload_id},
+            )
+            response.raise_for_status()
+            return response.headers["ETag"]
+
+        try:
+            etags = await asyncio.gather(
+                *(
+                    upload_part(number, start)
+                    for number, start in enumerate(
+                        range(0, len(data), self.multipart_part_size), start=1
+                    )
+                )
+            )
+            parts = "".join(
+                f"<Part><PartNumber>{number}</PartNumber><ETag>{escape(etag)}</ETag></Part>"
+                for number, etag in enumerate(etags, start=1)
+            )
+            response = await self._request(
+                "POST",
+                url,
+                f"<CompleteMultipartUpload>{parts}</CompleteMultipartUpload>".encode(),
+                params={"uploadId": upload_id},
+            )
+            response.raise_for_status()
+            # Completion can fail after the 200 status line has been sent
+            if ElementTree.fromstring(response.content).tag == "Error":
+                raise Exception(f"Multipart upload failed: {response.text}")
+        except BaseException:
+            # Abort so S3 discards the parts already stored
+            with contextlib.suppress(httpx.HTTPError):
+                await self._request("DELETE", url, params={"uploadId": upload_id})
+            raise
+
+    async def delete_file(self, url: str) -> bool:
         """Delete file from S3.
 
         Args:
@@ -171,32 +560,19 @@ class S3StorageService:
         """
         try:
             # Extract S3 key from URL
-            # Handle different URL formats
-            if self.bucket_name in url:
-                parts = url.split(f"{self.bucket_name}/")
-                if len(parts) > 1:
-                    s3_key = parts[-1]
-                else:
-                    return False
-            else:
+            s3_key = self.key_from_url(url)
+            if s3_key is None:
                 return False
 
             # Delete object
-            self.s3_client.delete_object(Bucket=self.bucket_name, Key=s3_key)
+            response = await self._request("DELETE", self._object_url(s3_key))
+            response.raise_for_status()
             return True
 
         except Exception as e:
             print(f"Failed to delete file: {str(e)}")
             return False
 
-
-# Singleton instance
-_storage_service: S3StorageService | None = None
-
-
-def get_storage_service() -> S3StorageService:
-    """Get or create storage service instance."""
-    global _storage_service
-    if _storage_service is None:
-        _storage_service = S3StorageService()
-    return _storage_service
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.http.aclose()
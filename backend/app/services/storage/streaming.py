@@ -0,0 +1,70 @@
+"""Bounded reading of uploads into a single shared buffer.
+
+An upload is read once, in chunks, into one preallocated buffer. The
+thumbnailer and the storage backend both get a ``memoryview`` of it, so a
+photo is held in memory once rather than once per consumer, and reading
+stops as soon as the size limit is exceeded.
+"""
+
+import hashlib
+from collections.abc import AsyncIterator
+
+from fastapi import UploadFile
+
+# Bytes read from the spooled upload, and sent to storage, per chunk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+
+def file_too_large(max_size: int) -> ValueError:
+    """The error raised for uploads above ``max_size`` bytes."""
+    return ValueError(f"File too large. Maximum size: {max_size / 1024 / 1024}MB")
+
+
+async def read_upload(
+    file: UploadFile, max_size: int, digest: "hashlib._Hash | None" = None
+) -> memoryview:
+    """Read an upload into one buffer, enforcing ``max_size`` while reading.
+
+    Args:
+        file: The uploaded file, read from its current position
+        max_size: Maximum number of bytes accepted
+        digest: Hash object updated with each chunk as it arrives
+
+    Returns:
+        A read-only view of exactly the bytes read
+
+    Raises:
+        ValueError: As soon as more than ``max_size`` bytes have been read
+    """
+    # The multipart parser records the size; preallocate when it is known
+    size_hint = file.size if file.size is not None else UPLOAD_CHUNK_SIZE
+    if size_hint > max_size:
+        raise file_too_large(max_size)
+
+    buffer = bytearray(size_hint)
+    length = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if length + len(chunk) > max_size:
+            raise file_too_large(max_size)
+        end = length + len(chunk)
+        if end > len(buffer):
+            # Size unknown or understated: grow geometrically up to the limit
+            capacity = max(end, min(2 * len(buffer), max_size))
+            buffer.extend(bytes(capacity - len(buffer)))
+        buffer[length:end] = chunk
+        length = end
+        if digest is not None:
+            digest.update(chunk)
+
+    return memoryview(buffer)[:length].toreadonly()
+
+
+async def iter_chunks(
+    data: memoryview, chunk_size: int = UPLOAD_CHUNK_SIZE
+) -> AsyncIterator[memoryview]:
+    """Yield zero-copy slices of ``data`` as an HTTP request body."""
+    for start in range(0, len(data), chunk_size):
+        yield data[start : start + chunk_size]
@@ -1,15 +1,36 @@
 """Supabase Storage backend implementation."""
 
+import asyncio
 import uuid
+from collections.abc import AsyncIterator, Iterable, Sequence
+from datetime import datetime
 from pathlib import Path
+from urllib.parse import quote
 
+import httpx
 from fastapi import UploadFile
 
 from app.core.config import settings
+from app.services.storage.base import (
+    BatchResult,
+    ObjectInfo,
+    PresignedUpload,
+    StoredObject,
+)
+from app.services.storage.http import create_http_client
+from app.services.storage.streaming import file_too_large, iter_chunks, read_upload
+
+# Most paths the Storage API removes in one request
+REMOVE_MAX_PATHS = 1000
 
 
 class SupabaseStorageService:
-    """Service for uploading files to Supabase Storage."""
+    """Service for uploading files to Supabase Storage.
+
+    Calls the Storage REST API directly through a pooled
+    ``httpx.AsyncClient``; the synchronous supabase-py client would block
+    the event loop on every request.
+    """
 
     # Allowed file extensions
     ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
@@ -18,45 +39,49 @@ class SupabaseStorageService:
     MAX_FILE_SIZE = 10 * 1024 * 1024
 
     def __init__(self):
-        """Initialize Supabase Storage client."""
-        # Import here to avoid requiring supabase-py if not using this backend
-        try:
-            from supabase import Client, create_client
-        except ImportError:
-            raise ImportError(
-                "supabase-py is required for SupabaseStorageService. "
-                "Install it with: poetry add supabase"
-            )
-
+        """Initialize the Storage API client. The bucket is checked on first use."""
         if not settings.supabase_url or not settings.supabase_key:
             raise ValueError(
                 "SUPABASE_URL and SUPABASE_KEY must be set to use Supabase storage backend"
             )
 
-        self.client: Client = create_client(
-            settings.supabase_url, settings.supabase_key
-        )
+        self.url = settings.supabase_url.rstrip("/")
         self.bucket_name = settings.supabase_bucket or "listing-photos"
+        self.http = create_http_client(
+            base_url=f"{self.url}/storage/v1",
+            headers={
+                "Authorization": f"Bearer {settings.supabase_key}",
+                "apikey": settings.supabase_key,
+            },
+        )
+        self._bucket_ready = False
+        self._bucket_lock = asyncio.Lock()
 
-        # Ensure bucket exists
-        self._ensure_bucket_exists()
-
-    def _ensure_bucket_exists(self):
+    async def _ensure_bucket_exists(self) -> None:
         """Create bucket if it doesn't exist."""
-        try:
-            # List buckets to check if our bucket exists
-            buckets = self.client.storage.list_buckets()
-            bucket_names = [b.name for b in buckets]
-
-            if self.bucket_name not in bucket_names:
-                # Create bucket with public access
-                self.client.storage.create_bucket(
-                    self.bucket_name, options={"public": True}
-                )
-        except Exception as e:
-            # If bucket check fails, log but continue
-            # (bucket might be created manually)
-            print(f"Warning: Could not verify/create bucket: {e}")
+        if self._bucket_ready:
+            return
+        async with self._bucket_lock:
+            if self._bucket_ready:
+                return
+            try:
+                response = await self.http.get(f"/bucket/{self.bucket_name}")
+                if response.status_code in (400, 404):
+                    # Create bucket with public access
+                    response = await self.http.post(
+                        "/bucket",
+                        json={
+                            "id": self.bucket_name,
+                            "name": self.bucket_name,
+                            "public": True,
+                        },
+                    )
+                    response.raise_for_status()
+            except httpx.HTTPError as e:
+                # If bucket check fails, log but continue
+                # (bucket might be created manually)
+                print(f"Warning: Could not verify/create bucket: {e}")
+            self._bucket_ready = True
 
     def validate_file(self, file: UploadFile) -> None:
         """Validate file type and size.
@@ -75,15 +100,26 @@ class SupabaseStorageService:
                     f"Invalid file type. Allowed types: {', '.join(self.ALLOWED_IMAGE_EXTENSIONS)}"
                 )
 
-        # Check file size
-        file.file.seek(0, 2)  # Seek to end
-        file_size = file.file.tell()
-        file.file.seek(0)  # Reset to beginning
+        # Reject sizes the multipart parser already knows to be too large;
+        # read_upload enforces the limit while reading
+        if file.size is not None and file.size > self.MAX_FILE_SIZE:
+            raise file_too_large(self.MAX_FILE_SIZE)
 
-        if file_size > self.MAX_FILE_SIZE:
-            raise ValueError(
-                f"File too large. Maximum size: {self.MAX_FILE_SIZE / 1024 / 1024}MB"
-            )
+    def public_url(self, path: str) -> str:
+        """Return the public URL of a storage path."""
+        return f"{self.url}/storage/v1/object/public/{self.bucket_name}/{path}"
+
+    def key_from_url(self, url: str) -> str | None:
+        """Return the storage path of a public URL, or None if it is not ours."""
+        # Supabase URLs typically look like:
+        # https://{project}.supabase.co/storage/v1/object/public/{bucket}/{path}
+        marker = f"/storage/v1/object/public/{self.bucket_name}/"
+        if marker in url:
+            return url.split(marker)[-1]
+        return None
+
+    def _object_path(self, path: str) -> str:
+        return f"/object/{self.bucket_name}/{quote(path, safe='/~')}"
 
     async def upload_file(self, file: UploadFile, folder: str = "listings") -> str:
         """Upload file to Supabase Storage and return public URL.
@@ -101,35 +137,289 @@ class SupabaseStorageService:
         """
         # Validate file
         self.validate_file(file)
+        contents = await read_upload(file, self.MAX_FILE_SIZE)
+        return await self.upload_bytes(
+            contents, file.filename, file.content_type, folder=folder
+        )
+
+    async def upload_bytes(
+        self,
+        data: bytes | memoryview,
+        filename: str | None,
+        content_type: str | None,
+        folder: str = "listings",
+    ) -> str:
+        """Upload an already read file and return public URL.
+
+        The body is streamed from ``data`` without copying it.
+
+        Args:
+            data: File contents, e.g. a view of the buffer from read_upload
+            filename: Original filename; only its extension is used
+            content_type: MIME type, defaults to image/jpeg
+            folder: Folder path in storage bucket
+
+        Returns:
+            Public URL of the uploaded file
 
+        Raises:
+            Exception: If upload fails
+        """
         # Generate unique filename
-        ext = Path(file.filename or "image.jpg").suffix.lower()
+        ext = Path(filename or "image.jpg").suffix.lower()
         unique_filename = f"{uuid.uuid4()}{ext}"
         storage_path = f"{folder}/{unique_filename}"
+        return await self.upload_object(
+            storage_path, data, content_type or "image/jpeg"
+        )
+
+    async def upload_object(
+        self, key: str, data: bytes | memoryview, content_type: str
+    ) -> str:
+        """Store ``data`` at storage path ``key``, replacing any existing object.
 
+        Args:
+            key: Storage path in the bucket
+            data: Object contents
+            content_type: MIME type of the object
+
+        Returns:
+            Public URL of the object
+
+        Raises:
+            Exception: If upload fails
+        """
         try:
+            await self._ensure_bucket_exists()
+
             # Upload file
-            contents = await file.read()
+            response = await self.http.post(
+                self._object_path(key),
+                content=iter_chunks(memoryview(data)),
+                headers={
+                    "Content-Type": content_type,
+                    "Content-Length": str(len(data)),
+                    "x-upsert": "true",
+                },
+            )
+            response.raise_for_status()
+
+            return self.public_url(key)
+
+        except Exception as e:
+            raise Exception(f"Failed to upload file to Supabase: {str(e)}")
+
+    async def download_file(self, url: str) -> bytes:
+        """Download a stored file.
+
+        Args:
+            url: Public URL of the file
+
+        Returns:
+            The file contents
+
+        Raises:
+            ValueError: If the URL does not belong to this bucket
+            Exception: If download fails
+        """
+        storage_path = self.key_from_url(url)
+        if storage_path is None:
+            raise ValueError(f"Not a URL of bucket {self.bucket_name}: {url}")
+
+        try:
+            response = await self.http.get(self._object_path(storage_path))
+            response.raise_for_status()
+            return response.content
+        except Exception as e:
+            raise Exception(f"Failed to download file from Supabase: {str(e)}")
 
-            self.client.storage.from_(self.bucket_name).upload(
-                path=storage_path,
-                file=contents,
-                file_options={
-                    "content-type": file.content_type or "image/jpeg",
+    async def presign_upload(
+        self, key: str, content_type: str, max_size: int, expires_in: int
+    ) -> PresignedUpload:
+        """Create a signed upload URL for one object.
+
+        Signed upload URLs carry no size or type conditions and expire after
+        a period fixed by Supabase, so ``max_size`` and ``expires_in`` are not
+        enforced here; callers verify the object with :meth:`head_object`.
+        Limits can also be set on the bucket (file_size_limit,
+        allowed_mime_types).
+
+        Args:
+            key: Storage path the file must be stored at
+            content_type: Content-Type the client sends with the PUT
+            max_size: Maximum object size in bytes; checked after upload
+            expires_in: Ignored; Supabase decides the validity
+
+        Returns:
+            The signed URL to PUT the file to
+
+        Raises:
+            Exception: If signing fails
+        """
+        try:
+            await self._ensure_bucket_exists()
+            response = await self.http.post(
+                f"/object/upload/sign/{self.bucket_name}/{quote(key, safe='/~')}"
+            )
+            response.raise_for_status()
+            # Relative to the Storage API, with the token in the query string
+            signed_path = response.json()["url"]
+            return PresignedUpload(
+                key,
+                f"{self.url}/storage/v1{signed_path}",
+                "PUT",
+                {},
+                {"Content-Type": content_type},
+            )
+        except Exception as e:
+            raise Exception(f"Failed to sign upload to Supabase: {str(e)}")
+
+    async def head_object(self, key: str) -> ObjectInfo | None:
+        """Return the size and type of an object, or None if it does not exist."""
+        response = await self.http.head(
+            f"/object/authenticated/{self.bucket_name}/{quote(key, safe='/~')}"
+        )
+        if response.status_code in (400, 404):
+            return None
+        response.raise_for_status()
+        return ObjectInfo(
+            int(response.headers["Content-Length"]),
+            response.headers.get("Content-Type"),
+        )
+
+    async def list_objects(
+        self, prefix: str, page_size: int = 1000
+    ) -> AsyncIterator[list[StoredObject]]:
+        """Iterate over the objects under a folder, recursively.
+
+        The Storage API lists one folder level per request, with offsets.
+        Subfolders are walked depth first as they are found, so memory
+        holds one page per level. Objects deleted meanwhile may shift the
+        offsets and hide a few objects until the next listing.
+
+        Args:
+            prefix: Folder to list, ending with "/"
+            page_size: Maximum entries per request
+        """
+        folder = prefix.rstrip("/")
+        offset = 0
+        while True:
+            response = await self.http.post(
+                f"/object/list/{self.bucket_name}",
+                json={
+                    "prefix": folder,
+                    "limit": page_size,
+                    "offset": offset,
+                    "sortBy": {"column": "name", "order": "asc"},
                 },
             )
+            response.raise_for_status()
+            entries = response.json()
+            page = [
+                StoredObject(
+                    f"{folder}/{entry['name']}" if folder else entry["name"],
+                    int((entry.get("metadata") or {}).get("size") or 0),
+                    datetime.fromisoformat(entry["updated_at"] or entry["created_at"]),
+                )
+                for entry in entries
+                # Folders have no id
+                if entry.get("id") is not None
+            ]
+            if page:
+                yield page
+            for entry in entries:
+                if entry.get("id") is None:
+                    subfolder = f"{folder}/{entry['name']}/" if folder else f"{entry['name']}/"
+                    async for subpage in self.list_objects(subfolder, page_size):
+                        yield subpage
+            if len(entries) < page_size:
+                return
+            offset += page_size
+
+    async def exists_many(self, keys: Iterable[str]) -> set[str]:
+        """Return those of ``keys`` that exist.
+
+        The Storage API has no batch lookup; the HEAD requests run
+        concurrently, at most as many as the connection pool holds.
+        """
+        semaphore = asyncio.Semaphore(settings.storage_max_connections)
+
+        async def exists(key: str) -> bool:
+            async with semaphore:
+                return await self.head_object(key) is not None
 
-            # Get public URL
-            public_url_data = self.client.storage.from_(
-                self.bucket_name
-            ).get_public_url(storage_path)
+        keys = list(dict.fromkeys(keys))
+        found = await asyncio.gather(*(exists(key) for key in keys))
+        return {key for key, ok in zip(keys, found) if ok}
 
-            return public_url_data
+    async def copy(self, source_key: str, dest_key: str) -> str:
+        """Copy an object within the bucket on the server side.
+
+        Returns:
+            Public URL of the copy
 
+        Raises:
+            Exception: If the copy fails
+        """
+        try:
+            response = await self.http.post(
+                "/object/copy",
+                json={
+                    "bucketId": self.bucket_name,
+                    "sourceKey": source_key,
+                    "destinationKey": dest_key,
+                },
+                headers={"x-upsert": "true"},
+            )
+            response.raise_for_status()
+            return self.public_url(dest_key)
         except Exception as e:
-            raise Exception(f"Failed to upload file to Supabase: {str(e)}")
+            raise Exception(f"Failed to copy file in Supabase: {str(e)}")
 
-    def delete_file(self, url: str) -> bool:
+    async def delete_files(self, urls: Sequence[str]) -> BatchResult:
+        """Delete many files, up to 1000 per remove request.
+
+        The requests run concurrently. The Storage API skips paths that do
+        not exist, so only failed requests are reported.
+
+        Args:
+            urls: Public URLs of the files to delete
+
+        Returns:
+            The deleted URLs, and the error of each URL that was not deleted
+        """
+        paths: dict[str, str] = {}
+        failed: dict[str, str] = {}
+        for url in urls:
+            path = self.key_from_url(url)
+            if path is None:
+                failed[url] = f"Not a URL of bucket {self.bucket_name}"
+            else:
+                paths[path] = url
+
+        all_paths = list(paths)
+        batches = [
+            all_paths[start : start + REMOVE_MAX_PATHS]
+            for start in range(0, len(all_paths), REMOVE_MAX_PATHS)
+        ]
+
+        async def remove(batch: list[str]) -> None:
+            response = await self.http.request(
+                "DELETE", f"/object/{self.bucket_name}", json={"prefixes": batch}
+            )
+            response.raise_for_status()
+
+        results = await asyncio.gather(
+            *(remove(batch) for batch in batches), return_exceptions=True
+        )
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                failed.update({paths[path]: str(result) for path in batch})
+            elif isinstance(result, BaseException):
+                raise result
+        return BatchResult([url for url in paths.values() if url not in failed], failed)
+
+    async def delete_file(self, url: str) -> bool:
         """Delete file from Supabase Storage.
 
         Args:
@@ -140,19 +430,23 @@ class SupabaseStorageService:
         """
         try:
             # Extract storage path from URL
-            # Supabase URLs typically look like:
-            # https://{project}.supabase.co/storage/v1/object/public/{bucket}/{path}
-            if f"/storage/v1/object/public/{self.bucket_name}/" in url:
-                storage_path = url.split(
-                    f"/storage/v1/object/public/{self.bucket_name}/"
-                )[-1]
-            else:
+            storage_path = self.key_from_url(url)
+            if storage_path is None:
                 return False
 
             # Delete object
-            self.client.storage.from_(self.bucket_name).remove([storage_path])
+            response = await self.http.request(
+                "DELETE",
+                f"/object/{self.bucket_name}",
+                json={"prefixes": [storage_path]},
+            )
+            response.raise_for_status()
             return True
 
         except Exception as e:
             print(f"Failed to delete file from Supabase: {str(e)}")
             return False
+
+    async def aclose(self) -> None:
+        """Close pooled connections."""
+        await self.http.aclose()
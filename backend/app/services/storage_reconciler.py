@@ -0,0 +1,198 @@
+"""Reconciliation of storage objects against the database.
+
+Objects can outlive the rows that reference them: uploads whose
+transaction failed or whose process crashed, photos removed with their
+listing by the cascade, and direct uploads that were never finalized.
+:func:`reconcile_storage` lists the bucket page by page and deletes the
+objects no row references once they are older than a grace period.
+
+Which rows may reference a key follows from its layout:
+
+- ``renditions/{photo_id}/...`` and ``thumbnails/{photo_id}.jpg``: the photo
+- ``photos/{sha256}``, ``thumbnails/{sha256}.jpg`` and
+  ``renditions/{sha256}/...``: the ``photo_blobs`` row; unreferenced blobs
+  are left to ``purge_unreferenced_blobs``
+- anything else, e.g. ``listings/`` and ``uploads/``: a ``photo_url``
+
+Every page is checked with one indexed query per kind, and deletions are
+batched, so memory stays bounded however many objects the bucket holds.
+"""
+
+import logging
+import re
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import SessionLocal
+from app.models.listing_photo import ListingPhoto
+from app.models.photo_blob import PhotoBlob
+from app.services.storage import StorageBackend
+
+log = logging.getLogger(__name__)
+
+# Folders written by the application; other keys are never touched
+MANAGED_PREFIXES = ("listings/", "photos/", "renditions/", "thumbnails/", "uploads/")
+
+# Objects listed, and checked against the database, per request
+RECONCILE_PAGE_SIZE = 1000
+# Orphans deleted per batch request
+RECONCILE_DELETE_BATCH_SIZE = 1000
+
+_BLOB_KEY = re.compile(
+    r"(?:photos/([0-9a-f]{64})$|thumbnails/([0-9a-f]{64})\.jpg$|renditions/([0-9a-f]{64})/)"
+)
+# Ids beyond the integer column's range cannot belong to a photo
+_PHOTO_KEY = re.compile(r"(?:renditions/(\d{1,9})/|thumbnails/(\d{1,9})\.jpg$)")
+
+
+@dataclass
+class ReconcileStats:
+    """Counts of one reconciliation run."""
+
+    listed: int = 0
+    recent: int = 0  # Younger than the grace period, not checked
+    orphaned: int = 0
+    deleted: int = 0
+    failed: int = 0
+
+
+async def check_url_base(db: AsyncSession, storage_service: StorageBackend) -> None:
+    """Refuse to reconcile if photo URLs do not use the backend's public URLs.
+
+    Photo URLs are matched as stored, so after a change of the public URL
+    base (e.g. S3_PUBLIC_URL_BASE) every photo would look orphaned.
+
+    Raises:
+        RuntimeError: If a photo URL is not under the current base
+    """
+    base = storage_service.public_url("")
+    result = await db.execute(
+        select(ListingPhoto.photo_url)
+        .where(~ListingPhoto.photo_url.startswith(base, autoescape=True))
+        .limit(1)
+    )
+    foreign = result.scalar_one_or_none()
+    if foreign is not None:
+        raise RuntimeError(
+            f"Photo URL {foreign} is not under {base}; "
+            "refusing to reconcile against a different public URL base"
+        )
+
+
+async def find_referenced(
+    db: AsyncSession, storage_service: StorageBackend, keys: Iterable[str]
+) -> set[str]:
+    """Return those of ``keys`` that rows reference.
+
+    Args:
+        db: Session to query
+        storage_service: Backend the keys belong to; maps keys to URLs
+        keys: Object keys, e.g. one page of a listing
+
+    Returns:
+        The referenced keys
+    """
+    photo_ids: dict[str, int] = {}
+    digests: dict[str, str] = {}
+    urls: dict[str, str] = {}
+    for key in keys:
+        if match := _BLOB_KEY.match(key):
+            digests[key] = match.group(1) or match.group(2) or match.group(3)
+        elif match := _PHOTO_KEY.match(key):
+            photo_ids[key] = int(match.group(1) or match.group(2))
+        else:
+            urls[key] = storage_service.public_url(key)
+
+    referenced: set[str] = set()
+    if photo_ids:
+        result = await db.execute(
+            select(ListingPhoto.id).where(ListingPhoto.id.in_(set(photo_ids.values())))
+        )
+        existing = set(result.scalars().all())
+        referenced.update(key for key, photo_id in photo_ids.items() if photo_id in existing)
+    if digests:
+        result = await db.execute(
+            select(PhotoBlob.sha256).where(PhotoBlob.sha256.in_(set(digests.values())))
+        )
+        existing = set(result.scalars().all())
+        referenced.update(key for key, digest in digests.items() if digest in existing)
+    if urls:
+        result = await db.execute(
+            select(ListingPhoto.photo_url).where(ListingPhoto.photo_url.in_(urls.values()))
+        )
+        existing = set(result.scalars().all())
+        referenced.update(key for key, url in urls.items() if url in existing)
+    return referenced
+
+
+async def reconcile_storage(
+    storage_service: StorageBackend,
+    grace_seconds: float,
+    dry_run: bool = False,
+    prefixes: Sequence[str] = MANAGED_PREFIXES,
+    page_size: int = RECONCILE_PAGE_SIZE,
+    delete_batch_size: int = RECONCILE_DELETE_BATCH_SIZE,
+    session_factory: Callable[[], AsyncSession] = SessionLocal,
+) -> ReconcileStats:
+    """Delete the objects under ``prefixes`` that no row references.
+
+    Objects modified within ``grace_seconds`` are skipped, since their
+    rows may not be committed yet; it must exceed the time from upload to
+    commit, including presigned direct uploads. Each page is checked in
+    its own short transaction.
+
+    Args:
+        storage_service: Backend to reconcile
+        grace_seconds: Minimum age of an object before it can be deleted
+        dry_run: Only log the orphans that would be deleted
+        prefixes: Folders to list
+        page_size: Objects listed and checked at a time
+        delete_batch_size: Orphans collected before a batch deletion
+        session_factory: Creates the sessions of the page checks
+
+    Returns:
+        What was listed, found and deleted
+
+    Raises:
+        RuntimeError: If photo URLs do not match the backend's public URLs
+    """
+    stats = ReconcileStats()
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+    async with session_factory() as session:
+        await check_url_base(session, storage_service)
+
+    orphans: list[str] = []
+
+    async def delete_orphans() -> None:
+        if dry_run:
+            for url in orphans:
+                log.info("Orphan (dry run): %s", url)
+        else:
+            result = await storage_service.delete_files(orphans)
+            stats.deleted += len(result.succeeded)
+            stats.failed += len(result.failed)
+            for url, error in result.failed.items():
+                log.warning("Failed to delete orphan %s: %s", url, error)
+        orphans.clear()
+
+    for prefix in prefixes:
+        async for page in storage_service.list_objects(prefix, page_size):
+            stats.listed += len(page)
+            keys = [obj.key for obj in page if obj.last_modified < cutoff]
+            stats.recent += len(page) - len(keys)
+            if not keys:
+                continue
+            async with session_factory() as session:
+                referenced = await find_referenced(session, storage_service, keys)
+            found = [key for key in keys if key not in referenced]
+            stats.orphaned += len(found)
+            orphans.extend(storage_service.public_url(key) for key in found)
+            if len(orphans) >= delete_batch_size:
+                await delete_orphans()
+    if orphans:
+        await delete_orphans()
+    return stats
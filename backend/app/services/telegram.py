@@ -2,6 +2,9 @@
 
 import hmac
 import json
+import time
+from collections import OrderedDict
+from functools import lru_cache
 from hashlib import sha256
 from typing import Any
 from urllib.parse import parse_qsl
@@ -21,8 +24,13 @@ class TelegramAuthError(HTTPException):
         )
 
 
+@lru_cache(maxsize=4)
+def _secret_key(bot_token: str) -> bytes:
+    return sha256(bot_token.encode()).digest()
+
+
 def _compute_hash(data_check_string: str) -> str:
-    secret_key = sha256(settings.telegram_bot_token.encode()).digest()
+    secret_key = _secret_key(settings.telegram_bot_token)
     return hmac.new(secret_key, data_check_string.encode(), sha256).hexdigest()
 
 
@@ -43,6 +51,70 @@ def verify_telegram_auth(init_data: str) -> dict[str, Any]:
         raise TelegramAuthError() from exc
 
 
+class InitDataCache:
+    """Bounded LRU cache of verified init data.
+
+    A mini-app session sends the same initData with every request, so after
+    the first verification the user payload is a single dict lookup. Keys are
+    digests of the raw header; entries expire ``max_age`` seconds after the
+    init data's ``auth_date``.
+    """
+
+    def __init__(self, max_entries: int, max_age: float):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of cached sessions
+            max_age: Seconds after ``auth_date`` that init data stays cached
+        """
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries: OrderedDict[bytes, tuple[float, dict[str, Any]]] = OrderedDict()
+
+    @staticmethod
+    def _key(init_data: str) -> bytes:
+        return sha256(init_data.encode()).digest()
+
+    def get(self, init_data: str) -> dict[str, Any] | None:
+        """Return the cached payload for this init data, if still valid."""
+        key = self._key(init_data)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, user_data = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return user_data
+
+    def put(self, init_data: str, user_data: dict[str, Any]) -> None:
+        """Cache the verified payload until its ``auth_date`` expires."""
+        try:
+            auth_date = int(dict(parse_qsl(init_data)).get("auth_date", ""))
+        except ValueError:
+            return  # Without auth_date there is no safe expiry
+        expires_at = auth_date + self.max_age
+        if expires_at <= time.time():
+            return
+
+        key = self._key(init_data)
+        self._entries[key] = (expires_at, user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached entries."""
+        self._entries.clear()
+
+
+init_data_cache = InitDataCache(
+    max_entries=settings.telegram_auth_cache_size,
+    max_age=settings.telegram_auth_max_age_seconds,
+)
+
+
 def fake_verify_telegram_auth(init_data: str) -> dict[str, Any]:
     """Fake verification for testing purposes."""
     fakeUser = {
@@ -0,0 +1,171 @@
+"""Thumbnail storage and the backfill of legacy base64 thumbnails.
+
+Thumbnails are small JPEGs served by ``GET /photos/{id}/thumb``. New ones
+are kept either inline in ``listing_photos.thumbnail_bytes`` or as objects
+in the storage backend, depending on ``THUMBNAIL_STORAGE``. Rows written
+before that still hold base64 text in ``thumbnail_data`` until backfilled
+in short batches by the migration or ``scripts.migrate_thumbnails``.
+"""
+
+import asyncio
+import base64
+import binascii
+import logging
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.listing_photo import ListingPhoto
+from app.services.storage import StorageBackend
+
+log = logging.getLogger(__name__)
+
+THUMBNAIL_STORAGE_MODES = ("bytea", "object")
+THUMBNAIL_CONTENT_TYPE = "image/jpeg"
+
+# Rows converted per transaction; keeps row locks short
+BACKFILL_BATCH_SIZE = 500
+
+# Legacy values Postgres' decode(..., 'base64') accepts; others are left alone
+BASE64_PATTERN = "^[A-Za-z0-9+/]*={0,2}$"
+
+
+def thumbnail_key(photo_id: int) -> str:
+    """Storage key of a backfilled thumbnail; retries overwrite the same object."""
+    return f"thumbnails/{photo_id}.jpg"
+
+
+async def store_thumbnail(
+    storage_service: StorageBackend, thumbnail: bytes, key: str
+) -> str | None:
+    """Upload a new thumbnail under ``key`` if ``THUMBNAIL_STORAGE`` is ``object``.
+
+    Returns:
+        Public URL of the object, or None if the thumbnail is kept inline
+    """
+    if settings.thumbnail_storage != "object":
+        return None
+    return await storage_service.upload_object(key, thumbnail, THUMBNAIL_CONTENT_TYPE)
+
+
+def decode_legacy(value: str) -> bytes | None:
+    """Decode a legacy base64 thumbnail, or return None if it is corrupt."""
+    try:
+        return base64.b64decode(value, validate=True)
+    except binascii.Error:
+        return None
+
+
+async def backfill_bytea_batch(
+    db: AsyncSession, after_id: int = 0, batch_size: int = BACKFILL_BATCH_SIZE
+) -> int | None:
+    """Decode one batch of legacy thumbnails into ``thumbnail_bytes`` and commit.
+
+    Decoding happens in the database. Batches walk the primary key from
+    ``after_id``, so none rescans the rows converted before it. Rows locked
+    by someone else are skipped and left for a later run; corrupt values
+    are left in place.
+
+    Args:
+        db: Session; the batch is committed
+        after_id: Only rows with a greater id are considered
+        batch_size: Maximum rows per batch
+
+    Returns:
+        Id of the last row of the batch to continue after, or None when done
+    """
+    batch = (
+        select(ListingPhoto.id)
+        .where(
+            ListingPhoto.id > after_id,
+            ListingPhoto.thumbnail_data.is_not(None),
+            ListingPhoto.thumbnail_data.regexp_match(BASE64_PATTERN),
+            func.length(ListingPhoto.thumbnail_data) % 4 == 0,
+        )
+        .order_by(ListingPhoto.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        update(ListingPhoto)
+        .where(ListingPhoto.id.in_(batch))
+        .values(
+            thumbnail_bytes=func.decode(ListingPhoto.thumbnail_data, "base64"),
+            thumbnail_data=None,
+        )
+        .returning(ListingPhoto.id)
+        .execution_options(synchronize_session=False)
+    )
+    converted = result.scalars().all()
+    await db.commit()
+    return max(converted) if converted else None
+
+
+async def backfill_object_batch(
+    db: AsyncSession,
+    storage_service: StorageBackend,
+    after_id: int = 0,
+    batch_size: int = BACKFILL_BATCH_SIZE,
+) -> int | None:
+    """Move one batch of inline or legacy thumbnails to object storage and commit.
+
+    Objects are uploaded under deterministic keys before the rows are
+    updated, so a batch interrupted at any point is simply redone.
+
+    Args:
+        db: Session; the batch is committed, or rolled back by the caller
+        storage_service: Backend the thumbnails are uploaded to
+        after_id: Only rows with a greater id are considered
+        batch_size: Maximum rows per batch
+
+    Returns:
+        Id of the last row of the batch to continue after, or None when done
+    """
+    result = await db.execute(
+        select(
+            ListingPhoto.id, ListingPhoto.thumbnail_bytes, ListingPhoto.thumbnail_data
+        )
+        .where(
+            ListingPhoto.id > after_id,
+            ListingPhoto.thumbnail_object_url.is_(None),
+            or_(
+                ListingPhoto.thumbnail_bytes.is_not(None),
+                ListingPhoto.thumbnail_data.is_not(None),
+            ),
+        )
+        .order_by(ListingPhoto.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+
+    thumbnails = []
+    for row in rows:
+        data = row.thumbnail_bytes
+        if data is None:
+            data = decode_legacy(row.thumbnail_data)
+        if data is None:
+            log.warning("Skipping corrupt thumbnail of photo %d", row.id)
+            continue
+        thumbnails.append((row.id, data))
+
+    urls = await asyncio.gather(
+        *(
+            storage_service.upload_object(
+                thumbnail_key(photo_id), data, THUMBNAIL_CONTENT_TYPE
+            )
+            for photo_id, data in thumbnails
+        )
+    )
+    for (photo_id, _), url in zip(thumbnails, urls):
+        await db.execute(
+            update(ListingPhoto)
+            .where(ListingPhoto.id == photo_id)
+            .values(thumbnail_object_url=url, thumbnail_bytes=None, thumbnail_data=None)
+            .execution_options(synchronize_session=False)
+        )
+    await db.commit()
+    return rows[-1].id
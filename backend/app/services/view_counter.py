@@ -0,0 +1,121 @@
+"""Buffered listing view counting.
+
+Views are coalesced in memory per listing and written periodically as one
+batched ``UPDATE ... FROM (VALUES ...)``, so popular listings never become
+row-lock hot spots and the request path never touches the database.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Callable
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+
+log = logging.getLogger(__name__)
+
+# Rows per UPDATE statement, keeps bind parameter counts well below limits
+FLUSH_BATCH_SIZE = 1000
+
+
+def _increment_statement(rows: int):
+    """Build the batched increment for ``rows`` (listing id, views) pairs.
+
+    Written as text: a Core ``update()`` would also apply the
+    ``updated_at`` onupdate default, which must not move for a view.
+    """
+    values = ", ".join(
+        f"(CAST(:id_{i} AS integer), CAST(:views_{i} AS integer))" for i in range(rows)
+    )
+    return text(
+        "UPDATE listings SET view_count = listings.view_count + v.views "
+        f"FROM (VALUES {values}) AS v(id, views) "
+        "WHERE listings.id = v.id"
+    )
+
+
+class ViewCounter:
+    """In-memory aggregator of listing views with periodic flushing."""
+
+    def __init__(
+        self,
+        session_factory: Callable[[], AsyncSession] = SessionLocal,
+        flush_interval: float = 5.0,
+    ):
+        """Initialize the counter.
+
+        Args:
+            session_factory: Creates the sessions used for flushing
+            flush_interval: Seconds between flushes
+        """
+        self._session_factory = session_factory
+        self._flush_interval = flush_interval
+        self._pending: Counter[int] = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered views not yet written."""
+        return sum(self._pending.values())
+
+    def record(self, listing_id: int) -> None:
+        """Count one view of a listing. O(1), never touches the database."""
+        self._pending[listing_id] += 1
+
+    async def flush(self) -> int:
+        """Write all buffered views and return how many were written.
+
+        Views of a failed flush are put back and retried on the next one.
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            # Swap the buffer so views recorded during the write go to the next flush
+            pending, self._pending = self._pending, Counter()
+            items = sorted(pending.items())
+
+            try:
+                async with self._session_factory() as session:
+                    for start in range(0, len(items), FLUSH_BATCH_SIZE):
+                        batch = items[start : start + FLUSH_BATCH_SIZE]
+                        params: dict[str, int] = {}
+                        for i, (listing_id, views) in enumerate(batch):
+                            params[f"id_{i}"] = listing_id
+                            params[f"views_{i}"] = views
+                        await session.execute(_increment_statement(len(batch)), params)
+                    await session.commit()
+            except Exception:
+                log.exception("Failed to flush %d listing view counts", len(items))
+                self._pending.update(pending)
+                return 0
+
+            return sum(pending.values())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        """Start periodic flushing on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and drain the remaining views."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+view_counter = ViewCounter(flush_interval=settings.view_flush_interval_seconds)
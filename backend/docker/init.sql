@@ -3,6 +3,8 @@
 
 -- Create any additional extensions if needed
 CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Trigram indexes for listing search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
 
 -- You can add any initial database setup here
 -- For example:
@@ -0,0 +1,115 @@
+"""Measure the CPU time per image of photo thumbnailing and renditions.
+
+"before" decodes at full resolution and resamples in one step; "after"
+is the current ImageProcessingService, which reads dimensions from the
+header and decodes JPEGs at reduced scale. Without paths, a synthetic
+12 megapixel phone photo is used.
+
+Usage:
+    python -m scripts.benchmark_images
+    python -m scripts.benchmark_images photo1.jpg photo2.jpg --iterations 10
+"""
+
+import argparse
+import io
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from PIL import Image, ImageOps
+
+from app.core.config import settings
+from app.services.image_processing import ImageProcessingService, Rendition, _flatten
+
+PHONE_PHOTO_SIZE = (4032, 3024)
+
+
+def synthetic_photo() -> bytes:
+    """A noisy gradient, which compresses about as badly as a real photo."""
+    noise = Image.effect_noise(PHONE_PHOTO_SIZE, 40).convert("RGB")
+    gradient = Image.linear_gradient("L").resize(PHONE_PHOTO_SIZE).convert("RGB")
+    buffer = io.BytesIO()
+    Image.blend(noise, gradient, 0.6).save(buffer, format="JPEG", quality=90)
+    return buffer.getvalue()
+
+
+def thumbnail_before(data: bytes) -> bytes:
+    """Thumbnail decoded at full resolution, resampled in one step."""
+    image = _flatten(Image.open(io.BytesIO(data)))
+    image.load()
+    image.thumbnail(
+        ImageProcessingService.THUMBNAIL_SIZE, Image.Resampling.LANCZOS, reducing_gap=None
+    )
+    buffer = io.BytesIO()
+    image.save(
+        buffer,
+        format="JPEG",
+        quality=ImageProcessingService.THUMBNAIL_QUALITY,
+        optimize=True,
+    )
+    return buffer.getvalue()
+
+
+def renditions_before(data: bytes) -> list[bytes]:
+    """Renditions decoded at full resolution, each resampled in one step."""
+    image = _flatten(ImageOps.exif_transpose(Image.open(io.BytesIO(data))))
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+    encoded = []
+    source = image
+    widths = {min(w, image.width) for w in settings.rendition_widths}
+    for width in sorted(widths, reverse=True):
+        height = max(1, round(image.height * width / image.width))
+        source = source.resize((width, height), Image.Resampling.LANCZOS)
+        for fmt in settings.rendition_formats:
+            buffer = io.BytesIO()
+            source.save(buffer, **ImageProcessingService.RENDITION_SAVE_OPTIONS[fmt])
+            encoded.append(buffer.getvalue())
+    return encoded
+
+
+def renditions_after(data: bytes) -> list[Rendition]:
+    """Renditions at the configured widths and formats."""
+    return ImageProcessingService.generate_renditions(
+        data, settings.rendition_widths, settings.rendition_formats
+    )
+
+
+def dimensions_before(data: bytes) -> tuple[int, int]:
+    """Dimensions from a fully decoded image."""
+    image = Image.open(io.BytesIO(data))
+    image.load()
+    return image.size
+
+
+def cpu_ms(func: Callable[[bytes], object], images: list[bytes], iterations: int) -> float:
+    """Mean CPU milliseconds of ``func`` per image."""
+    start = time.process_time()
+    for _ in range(iterations):
+        for data in images:
+            func(data)
+    return (time.process_time() - start) * 1000 / (iterations * len(images))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", type=Path, help="images (default: synthetic)")
+    parser.add_argument("--iterations", type=int, default=5)
+    args = parser.parse_args()
+
+    images = [path.read_bytes() for path in args.paths] or [synthetic_photo()]
+    cases = [
+        ("thumbnail", thumbnail_before, ImageProcessingService.generate_thumbnail),
+        ("renditions", renditions_before, renditions_after),
+        ("dimensions", dimensions_before, ImageProcessingService.get_image_dimensions),
+    ]
+
+    print(f"{'CPU ms/image':<14}{'before':>10}{'after':>10}{'speedup':>10}")
+    for name, before, after in cases:
+        before_ms = cpu_ms(before, images, args.iterations)
+        after_ms = cpu_ms(after, images, args.iterations)
+        print(f"{name:<14}{before_ms:>10.2f}{after_ms:>10.2f}{before_ms / after_ms:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
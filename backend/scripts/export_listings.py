@@ -0,0 +1,51 @@
+"""Export all listings as NDJSON or CSV.
+
+Usage:
+    python -m scripts.export_listings --format csv --output listings.csv
+    python -m scripts.export_listings --include-thumbnails > listings.ndjson
+"""
+
+import argparse
+import asyncio
+import sys
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.services.listing_export import EXPORT_FORMATS, export_listings
+
+
+async def export(export_format: str, include_thumbnails: bool, output: str | None) -> None:
+    """Stream the catalogue to a file or stdout."""
+    engine = create_async_engine(settings.database_url)
+    async_session = async_sessionmaker(engine, class_=AsyncSession)
+
+    out = open(output, "wb") if output else sys.stdout.buffer
+    try:
+        async with async_session() as session:
+            async for chunk in export_listings(session, export_format, include_thumbnails):
+                out.write(chunk)
+    finally:
+        if output:
+            out.close()
+        else:
+            out.flush()
+        await engine.dispose()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument(
+        "--include-thumbnails",
+        action="store_true",
+        help="include base64 photo thumbnails",
+    )
+    parser.add_argument("--output", help="output file (default: stdout)")
+    args = parser.parse_args()
+
+    asyncio.run(export(args.format, args.include_thumbnails, args.output))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Move photo thumbnails to the configured thumbnail storage.
+
+``--to bytea`` decodes legacy base64 thumbnails into ``thumbnail_bytes``,
+finishing what the migration skipped. ``--to object`` uploads inline and
+legacy thumbnails to the storage backend. Work is done in short batches
+that each commit, so the script can be stopped and rerun at any time.
+
+Usage:
+    python -m scripts.migrate_thumbnails --to object
+    python -m scripts.migrate_thumbnails --to bytea --batch-size 200
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.storage import close_storage_service, get_storage_service
+from app.services.thumbnails import (
+    BACKFILL_BATCH_SIZE,
+    THUMBNAIL_STORAGE_MODES,
+    backfill_bytea_batch,
+    backfill_object_batch,
+)
+
+log = logging.getLogger(__name__)
+
+
+async def migrate(target: str, batch_size: int) -> int:
+    """Convert batches until none is left; returns the number of batches."""
+    batches = 0
+    try:
+        storage_service = get_storage_service() if target == "object" else None
+        after_id = 0
+        while True:
+            async with SessionLocal() as session:
+                if storage_service is None:
+                    last_id = await backfill_bytea_batch(session, after_id, batch_size)
+                else:
+                    last_id = await backfill_object_batch(
+                        session, storage_service, after_id, batch_size
+                    )
+            if last_id is None:
+                return batches
+            batches += 1
+            after_id = last_id
+            log.info("Moved thumbnails up to photo %d", after_id)
+    finally:
+        await close_storage_service()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--to",
+        choices=THUMBNAIL_STORAGE_MODES,
+        default=settings.thumbnail_storage,
+        help="target storage (default: THUMBNAIL_STORAGE)",
+    )
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE)
+    args = parser.parse_args()
+
+    batches = asyncio.run(migrate(args.to, args.batch_size))
+    log.info("Done after %d batches", batches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Delete stored photo files that no listing photo references any more.
+
+Files are kept for PHOTO_BLOB_GRACE_SECONDS after their last reference is
+released, so a seller re-listing an item can reuse them. Work is done in
+short batches that each commit; run it periodically, e.g. from cron.
+
+Usage:
+    python -m scripts.purge_photo_blobs
+    python -m scripts.purge_photo_blobs --grace-seconds 3600
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.photo_blobs import PURGE_BATCH_SIZE, purge_unreferenced_blobs
+from app.services.storage import close_storage_service, get_storage_service
+
+log = logging.getLogger(__name__)
+
+
+async def purge(grace_seconds: float, batch_size: int) -> int:
+    """Purge batches until none is left; returns the number of batches."""
+    storage_service = get_storage_service()
+    batches = 0
+    after_id = 0
+    try:
+        while True:
+            async with SessionLocal() as session:
+                last_id = await purge_unreferenced_blobs(
+                    session, storage_service, grace_seconds, after_id, batch_size
+                )
+            if last_id is None:
+                return batches
+            batches += 1
+            after_id = last_id
+    finally:
+        await close_storage_service()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--grace-seconds",
+        type=float,
+        default=settings.photo_blob_grace_seconds,
+        help="minimum age of the last release (default: PHOTO_BLOB_GRACE_SECONDS)",
+    )
+    parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    batches = asyncio.run(purge(args.grace_seconds, args.batch_size))
+    log.info("Done after %d batches", batches)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Delete storage objects that no database row references.
+
+Finds the files of failed or crashed uploads, of photos deleted with their
+listing, and of direct uploads that were never finalized. Objects younger
+than ORPHAN_GRACE_SECONDS are left alone. The bucket is listed page by
+page, so it runs in bounded memory; run it periodically, e.g. from cron.
+
+Usage:
+    python -m scripts.reconcile_storage --dry-run
+    python -m scripts.reconcile_storage --prefix uploads/ --grace-seconds 3600
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import settings
+from app.services.storage import close_storage_service, get_storage_service
+from app.services.storage_reconciler import (
+    MANAGED_PREFIXES,
+    RECONCILE_DELETE_BATCH_SIZE,
+    RECONCILE_PAGE_SIZE,
+    ReconcileStats,
+    reconcile_storage,
+)
+
+log = logging.getLogger(__name__)
+
+
+async def reconcile(
+    grace_seconds: float,
+    dry_run: bool,
+    prefixes: list[str],
+    page_size: int,
+    delete_batch_size: int,
+) -> ReconcileStats:
+    """Reconcile the configured storage backend, then close it."""
+    try:
+        return await reconcile_storage(
+            get_storage_service(),
+            grace_seconds,
+            dry_run=dry_run,
+            prefixes=prefixes,
+            page_size=page_size,
+            delete_batch_size=delete_batch_size,
+        )
+    finally:
+        await close_storage_service()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--dry-run", action="store_true", help="log the orphans instead of deleting them"
+    )
+    parser.add_argument(
+        "--grace-seconds",
+        type=float,
+        default=settings.orphan_grace_seconds,
+        help="minimum object age (default: ORPHAN_GRACE_SECONDS)",
+    )
+    parser.add_argument(
+        "--prefix",
+        action="append",
+        choices=MANAGED_PREFIXES,
+        help="folder to reconcile; repeatable (default: all managed folders)",
+    )
+    parser.add_argument("--page-size", type=int, default=RECONCILE_PAGE_SIZE)
+    parser.add_argument("--delete-batch-size", type=int, default=RECONCILE_DELETE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    stats = asyncio.run(
+        reconcile(
+            args.grace_seconds,
+            args.dry_run,
+            args.prefix or list(MANAGED_PREFIXES),
+            args.page_size,
+            args.delete_batch_size,
+        )
+    )
+    log.info(
+        "Listed %d objects (%d within the grace period), found %d orphans, "
+        "deleted %d, failed %d",
+        stats.listed,
+        stats.recent,
+        stats.orphaned,
+        stats.deleted,
+        stats.failed,
+    )
+
+
+if __name__ == "__main__":
+    main()
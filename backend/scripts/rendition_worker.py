@@ -0,0 +1,66 @@
+"""Process queued photo rendition jobs.
+
+Runs alongside or instead of the workers inside API processes (see
+RENDITION_WORKERS); any number of these can drain the same queue.
+
+Usage:
+    python -m scripts.rendition_worker --concurrency 4
+    python -m scripts.rendition_worker --once
+"""
+
+import argparse
+import asyncio
+import contextlib
+import signal
+
+from app.core.config import settings
+from app.services.image_executor import image_executor
+from app.services.renditions import RenditionWorker
+from app.services.storage import close_storage_service
+
+
+async def run(concurrency: int, once: bool) -> None:
+    """Process jobs until stopped, or until the queue is empty with ``once``."""
+    worker = RenditionWorker(
+        concurrency=concurrency,
+        poll_interval=settings.rendition_poll_interval_seconds,
+        max_attempts=settings.rendition_max_attempts,
+        lease_seconds=settings.rendition_lease_seconds,
+    )
+    try:
+        if once:
+            while await worker.process_next():
+                pass
+            return
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            with contextlib.suppress(NotImplementedError):
+                loop.add_signal_handler(sig, stop.set)
+        worker.start()
+        await stop.wait()
+        await worker.stop()
+    finally:
+        image_executor.shutdown()
+        await close_storage_service()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=max(settings.rendition_workers, 1),
+        help="jobs processed at once (default: RENDITION_WORKERS or 1)",
+    )
+    parser.add_argument(
+        "--once", action="store_true", help="exit when no job is runnable"
+    )
+    args = parser.parse_args()
+
+    asyncio.run(run(args.concurrency, args.once))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Change a user's role, e.g. to verify a seller or appoint a moderator.
+
+With CACHE_BACKEND=redis the new identity is written to the shared cache,
+so authenticated requests see the new role right away. With the default
+CACHE_BACKEND=memory this script cannot reach the API processes' caches:
+they keep the old role for up to IDENTITY_CACHE_TTL_SECONDS. The change
+also revokes the user's refresh tokens.
+
+Usage:
+    python -m scripts.set_user_role 123456789 verified
+"""
+
+import argparse
+import asyncio
+import logging
+
+from sqlalchemy import select
+
+from app.db.session import SessionLocal
+from app.models.user import User as UserModel
+from app.services.identity_cache import set_user_role
+
+log = logging.getLogger(__name__)
+
+ROLES = ("unverified", "verified", "moderator", "admin")
+
+
+async def change_role(telegram_id: int, role: str) -> bool:
+    """Set the role of the user with a Telegram id; False if there is none."""
+    async with SessionLocal() as session:
+        result = await session.execute(
+            select(UserModel).where(UserModel.telegram_id == telegram_id)
+        )
+        user = result.scalar_one_or_none()
+        if user is None:
+            return False
+        await set_user_role(session, user, role)
+    return True
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("telegram_id", type=int)
+    parser.add_argument("role", choices=ROLES)
+    args = parser.parse_args()
+
+    if not asyncio.run(change_role(args.telegram_id, args.role)):
+        parser.exit(1, f"No user with Telegram id {args.telegram_id}\n")
+    log.info("User %d is now %s", args.telegram_id, args.role)
+
+
+if __name__ == "__main__":
+    main()
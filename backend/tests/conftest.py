@@ -0,0 +1,133 @@
+"""Shared fakes of the database session and the storage backend.
+
+Services under test compile their statements against PostgreSQL but never
+reach a server: :class:`FakeDatabase` records the statements and answers
+them per verb and table, and :class:`FakeStorage` keeps objects in memory.
+"""
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.selectable import Join
+
+from app.services.storage import BatchResult
+
+
+def statement_key(stmt):
+    """Verb and target table of a statement, e.g. ``"UPDATE photo_jobs"``."""
+    if stmt.is_select:
+        target = stmt.get_final_froms()[0]
+        while isinstance(target, Join):
+            target = target.left
+        return f"SELECT {target.name}"
+    verb = "INSERT" if stmt.is_insert else "UPDATE" if stmt.is_update else "DELETE"
+    return f"{verb} {stmt.table.name}"
+
+
+class FakeResult:
+    """Result of a fake statement, handing out its rows in any shape asked for."""
+
+    def __init__(self, rows):
+        self.rows = list(rows)
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def all(self):
+        return self.rows
+
+    def one_or_none(self):
+        return self.rows[0] if self.rows else None
+
+    scalar_one_or_none = one_or_none
+
+    def scalar_one(self):
+        [row] = self.rows
+        return row
+
+    def scalars(self):
+        return self
+
+
+class FakeDatabase:
+    """Session stand-in recording statements and answering them per table.
+
+    ``answers`` maps statement keys (see :func:`statement_key`) either to a
+    list of row lists, handed out one per statement until used up, or to a
+    callable taking the compiled statement and returning its rows. Other
+    statements return no rows. The database is its own session factory:
+    pass ``db.session``.
+    """
+
+    def __init__(self, answers=None):
+        self.answers = dict(answers or {})
+        self.executed = []  # (statement key, compiled statement)
+        self.commits = 0
+
+    @property
+    def statements(self):
+        return [compiled for _, compiled in self.executed]
+
+    def session(self):
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, *args, **kwargs):
+        key = statement_key(stmt)
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.executed.append((key, compiled))
+        answer = self.answers.get(key, [])
+        if callable(answer):
+            return FakeResult(answer(compiled))
+        return FakeResult(answer.pop(0) if answer else [])
+
+    async def commit(self):
+        self.commits += 1
+
+    def updates_of(self, table):
+        """Parameters of the updates of ``table`` that return no rows."""
+        return [
+            compiled.params
+            for key, compiled in self.executed
+            if key == f"UPDATE {table}" and "RETURNING" not in compiled.string
+        ]
+
+
+class FakeStorage:
+    """Storage stand-in keeping uploads in memory.
+
+    Downloads return ``original``, or raise ``fail_with``; listings yield
+    ``listed``. Uploaded objects are kept in ``objects`` and batch deletions
+    in ``deletes``.
+    """
+
+    def __init__(self, original=b"", fail_with=None, listed=()):
+        self.original = original
+        self.fail_with = fail_with
+        self.listed = list(listed)
+        self.objects = {}
+        self.deletes = []
+
+    def public_url(self, key):
+        return f"https://cdn.example/{key}"
+
+    async def download_file(self, url):
+        if self.fail_with is not None:
+            raise self.fail_with
+        return self.original
+
+    async def upload_object(self, key, data, content_type):
+        self.objects[key] = (data, content_type)
+        return self.public_url(key)
+
+    async def list_objects(self, prefix, page_size=1000):
+        listed = [obj for obj in self.listed if obj.key.startswith(prefix)]
+        for start in range(0, len(listed), page_size):
+            yield listed[start : start + page_size]
+
+    async def delete_files(self, urls):
+        self.deletes.append(list(urls))
+        return BatchResult(list(urls), {})
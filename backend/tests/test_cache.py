@@ -0,0 +1,63 @@
+"""Tests for the in-process response cache."""
+
+import pytest
+
+from app.services.cache.memory_backend import InMemoryCache
+
+
+@pytest.mark.asyncio
+async def test_hit_and_miss_are_counted():
+    cache = InMemoryCache(max_entries=10, max_bytes=1024, default_ttl=60)
+
+    assert await cache.get("a") is None
+    await cache.set("a", b"1")
+    assert await cache.get("a") == b"1"
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.entries) == (1, 1, 1)
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted():
+    cache = InMemoryCache(max_entries=2, max_bytes=1024, default_ttl=60)
+    await cache.set("a", b"1")
+    await cache.set("b", b"2")
+    await cache.get("a")
+
+    await cache.set("c", b"3")
+
+    assert await cache.get("b") is None
+    assert await cache.get("a") == b"1"
+    assert cache.stats().evictions == 1
+
+
+@pytest.mark.asyncio
+async def test_memory_cap_bounds_total_size():
+    cache = InMemoryCache(max_entries=100, max_bytes=25, default_ttl=60)
+
+    for key in "abcde":
+        await cache.set(key, b"x" * 9)
+
+    assert cache.stats().size_bytes <= 25
+    assert await cache.get("e") == b"x" * 9
+
+
+@pytest.mark.asyncio
+async def test_expired_entry_is_a_miss():
+    cache = InMemoryCache(max_entries=10, max_bytes=1024, default_ttl=60)
+    await cache.set("a", b"1", ttl=0)
+
+    assert await cache.get("a") is None
+    assert cache.stats().entries == 0
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_only_tagged_entries():
+    cache = InMemoryCache(max_entries=10, max_bytes=1024, default_ttl=60)
+    await cache.set("page1", b"1", tags=["feed:head", "listing:1"])
+    await cache.set("page2", b"2", tags=["listing:2"])
+
+    assert await cache.invalidate_tags(["listing:1"]) == 1
+
+    assert await cache.get("page1") is None
+    assert await cache.get("page2") == b"2"
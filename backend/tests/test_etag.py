@@ -0,0 +1,59 @@
+"""Tests for ETag computation and If-None-Match evaluation."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.main import app
+from app.services.etag import compute_etag, etag_matches, listing_page_etag
+
+
+def test_etag_is_strong_and_quoted():
+    etag = compute_etag("thumb", 1)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag == compute_etag("thumb", 1)
+
+
+@pytest.mark.parametrize(
+    ("header", "expected"),
+    [
+        (None, False),
+        ('"abc"', True),
+        ('W/"abc"', True),
+        ('"xyz", "abc"', True),
+        ("*", True),
+        ('"xyz"', False),
+    ],
+)
+def test_if_none_match(header, expected):
+    assert etag_matches(header, '"abc"') is expected
+
+
+def test_page_etag_changes_with_rows_and_versions():
+    now = datetime.now(timezone.utc)
+    page = [(2, now), (1, now)]
+    etag = listing_page_etag("cards:key", page, None)
+
+    assert listing_page_etag("cards:key", page, None) == etag
+    assert listing_page_etag("cards:key", page[:1], None) != etag
+    assert listing_page_etag("cards:key", page, "next") != etag
+    page[1] = (1, now + timedelta(seconds=1))
+    assert listing_page_etag("cards:key", page, None) != etag
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_revalidation_skips_database():
+    etag = compute_etag("thumb", 5)
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        response = await client.get(
+            "/api/v1/photos/5/thumb", headers={"If-None-Match": etag}
+        )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
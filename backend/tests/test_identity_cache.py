@@ -0,0 +1,97 @@
+"""Tests for cached user identities and lazy profile syncing."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core.config import settings
+from app.dependencies.auth import get_current_user
+from app.services import cache, telegram
+from app.services.identity_cache import get_cached_identity, set_user_role
+from tests.test_telegram_auth import TOKEN, _init_data
+
+
+class _CountingSession:
+    """Session stand-in that returns one user row and records statements."""
+
+    def __init__(self, user):
+        self.user = user
+        self.statements = []
+
+    async def execute(self, stmt, **kwargs):
+        self.statements.append(stmt)
+        return SimpleNamespace(scalar_one=lambda: self.user)
+
+    async def commit(self):
+        pass
+
+    async def refresh(self, obj):
+        pass
+
+
+def _user_row(**fields):
+    return SimpleNamespace(
+        **{
+            "id": 1,
+            "telegram_id": 42,
+            "username": "old_name",
+            "first_name": "A",
+            "last_name": None,
+            "photo_url": None,
+            "role": "verified",
+            **fields,
+        }
+    )
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches(monkeypatch):
+    monkeypatch.setattr(settings, "telegram_bot_token", TOKEN)
+    monkeypatch.setattr(cache, "_identity_cache", None)
+    monkeypatch.setattr(cache, "_response_cache", None)
+    telegram.init_data_cache.clear()
+    yield
+    telegram.init_data_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_identity_is_looked_up_once():
+    db = _CountingSession(_user_row())
+    init_data = _init_data(username="old_name")
+
+    for _ in range(3):
+        user = await get_current_user(authorization=init_data, db=db)
+        assert (user.id, user.role) == (1, "verified")
+
+    assert len(db.statements) == 1
+
+
+@pytest.mark.asyncio
+async def test_profile_changes_are_written_back_debounced():
+    db = _CountingSession(_user_row())
+
+    user = await get_current_user(
+        authorization=_init_data(username="new_name"), db=db
+    )
+
+    assert user.username == "new_name"
+    assert len(db.statements) == 2  # Lookup, then one UPDATE
+    assert "UPDATE users" in str(db.statements[1])
+
+    # Another change within the interval is not written yet
+    user = await get_current_user(
+        authorization=_init_data(username="newer_name"), db=db
+    )
+    assert user.username == "new_name"
+    assert len(db.statements) == 2
+
+
+@pytest.mark.asyncio
+async def test_role_change_is_written_through():
+    db = _CountingSession(_user_row())
+    await get_current_user(authorization=_init_data(username="old_name"), db=db)
+
+    await set_user_role(db, _user_row(role="moderator"), "moderator")
+
+    identity = await get_cached_identity(42)
+    assert identity.user.role == "moderator"
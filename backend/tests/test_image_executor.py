@@ -0,0 +1,111 @@
+"""Tests for the off-loop image executor."""
+
+import asyncio
+import io
+import time
+
+import pytest
+from PIL import Image
+
+from app.services.image_executor import ImageExecutor, ImageExecutorBusy
+
+
+def _jpeg(size=(1200, 900)):
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _thumbnail_size(thumbnail):
+    return Image.open(io.BytesIO(thumbnail)).size
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind", ["thread", "process"])
+async def test_generates_thumbnails(kind):
+    executor = ImageExecutor(kind=kind, max_workers=2)
+    try:
+        thumbnails = await asyncio.gather(
+            *(executor.generate_thumbnail(_jpeg()) for _ in range(3))
+        )
+    finally:
+        executor.shutdown()
+
+    assert [_thumbnail_size(t) for t in thumbnails] == [(300, 225)] * 3
+
+
+@pytest.mark.asyncio
+async def test_invalid_images_raise_value_error():
+    executor = ImageExecutor(kind="thread", max_workers=1)
+    try:
+        with pytest.raises(ValueError):
+            await executor.generate_thumbnail(b"not an image")
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_event_loop_keeps_running_during_image_work():
+    executor = ImageExecutor(kind="thread", max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.005)
+
+    task = asyncio.create_task(ticker())
+    try:
+        await executor.run(time.sleep, 0.2)
+    finally:
+        task.cancel()
+        executor.shutdown()
+
+    assert ticks >= 10
+
+
+@pytest.mark.asyncio
+async def test_queue_depth_is_bounded():
+    executor = ImageExecutor(kind="thread", max_workers=1, max_pending=2)
+    try:
+        running = [asyncio.create_task(executor.run(time.sleep, 0.2)) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(ImageExecutorBusy):
+            await executor.run(time.sleep, 0)
+
+        await asyncio.gather(*running)
+        assert executor.pending == 0
+    finally:
+        executor.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_slow_jobs_time_out():
+    executor = ImageExecutor(kind="thread", max_workers=1, timeout=0.05)
+    try:
+        with pytest.raises(TimeoutError):
+            await executor.run(time.sleep, 0.3)
+    finally:
+        executor.shutdown()
+    assert executor.pending == 0
+
+
+@pytest.mark.asyncio
+async def test_timed_out_jobs_hold_their_slot_until_they_finish():
+    executor = ImageExecutor(kind="thread", max_workers=1, max_pending=1, timeout=0.05)
+    try:
+        with pytest.raises(TimeoutError):
+            await executor.run(time.sleep, 0.3)
+
+        # The worker is still sleeping, so the pool is still fully loaded
+        assert executor.pending == 1
+        with pytest.raises(ImageExecutorBusy):
+            await executor.run(time.sleep, 0)
+
+        await asyncio.sleep(0.4)
+        assert executor.pending == 0
+        await executor.run(time.sleep, 0)
+    finally:
+        executor.shutdown()
@@ -0,0 +1,105 @@
+"""Tests for header-only image inspection and reduced decoding."""
+
+import io
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.core.config import settings
+from app.services import image_inspection
+from app.services.image_inspection import inspect_image, inspect_upload, sniff_image
+from app.services.image_processing import ImageProcessingService
+
+
+def _encode(fmt, size=(321, 123), mode="RGB", **options):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 60, 255)[: len(mode)]).save(
+        buffer, format=fmt, **options
+    )
+    return buffer.getvalue()
+
+
+@pytest.mark.parametrize(
+    "fmt, mode, options",
+    [
+        ("JPEG", "RGB", {}),
+        ("JPEG", "RGB", {"progressive": True}),
+        ("PNG", "RGBA", {}),
+        ("GIF", "P", {}),
+        ("WEBP", "RGB", {}),  # VP8
+        ("WEBP", "RGBA", {"lossless": True}),  # VP8L
+        ("WEBP", "RGBA", {"exif": b"Exif\x00\x00"}),  # VP8X
+    ],
+)
+def test_sniffed_dimensions_match_pillow(fmt, mode, options):
+    data = _encode(fmt, mode=mode, **options)
+
+    info = sniff_image(data)
+
+    assert info == (fmt, 321, 123)
+    assert Image.open(io.BytesIO(data)).size == (321, 123)
+
+
+def test_prefixes_need_more_bytes_and_garbage_is_rejected():
+    data = _encode("JPEG")
+
+    assert sniff_image(data[:11]) is None
+    assert sniff_image(data[:100]) is None
+    with pytest.raises(ValueError, match="Unsupported image format"):
+        sniff_image(b"%PDF-1.7 " + bytes(100))
+    with pytest.raises(ValueError, match="Corrupt JPEG header"):
+        sniff_image(b"\xff\xd8\x00" + bytes(100))
+    with pytest.raises(ValueError, match="Corrupt image: truncated header"):
+        inspect_image(data[:100], 10**9)
+
+
+@pytest.mark.asyncio
+async def test_upload_header_is_read_until_the_frame_and_rewound():
+    # A frame header behind 60KB of EXIF, as in phone photos
+    data = _encode("JPEG", exif=b"Exif\x00\x00" + bytes(60_000))
+    file = UploadFile(io.BytesIO(data), filename="phone.jpg")
+
+    info = await inspect_upload(file, 10**9)
+
+    assert info == ("JPEG", 321, 123)
+    assert await file.read() == data
+
+
+@pytest.mark.asyncio
+async def test_header_search_is_bounded(monkeypatch):
+    monkeypatch.setattr(image_inspection, "MAX_HEADER_BYTES", 16 * 1024)
+    data = _encode("JPEG", exif=b"Exif\x00\x00" + bytes(60_000))
+
+    with pytest.raises(ValueError, match="Invalid image 'a.jpg': Image header too long"):
+        await inspect_upload(UploadFile(io.BytesIO(data), filename="a.jpg"), 10**9)
+
+
+def test_decompression_bomb_is_rejected_before_decoding(monkeypatch):
+    monkeypatch.setattr(settings, "image_max_pixels", 1_000_000)
+    # Compresses to a few KB, decodes to 100 megapixels
+    bomb = _encode("PNG", size=(10_000, 10_000), mode="L")
+    assert len(bomb) < 200_000
+
+    with pytest.raises(ValueError, match="Image too large: 10000x10000 pixels"):
+        ImageProcessingService.generate_thumbnail(bomb)
+    with pytest.raises(ValueError, match="Image too large"):
+        ImageProcessingService.get_image_dimensions(bomb)
+
+
+def test_non_images_never_reach_other_decoders():
+    with pytest.raises(ValueError, match="Unsupported image format"):
+        ImageProcessingService.generate_thumbnail(_encode("BMP"))
+
+
+def test_jpeg_renditions_are_drafted_but_keep_their_size():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees: stored 4000x1000, shown 1000x4000
+    data = _encode("JPEG", size=(4000, 1000), exif=exif.tobytes())
+
+    renditions = ImageProcessingService.generate_renditions(data, [160, 480], ["jpeg"])
+
+    assert [(r.width, r.height) for r in renditions] == [(160, 640), (480, 1920)]
+    assert Image.open(io.BytesIO(renditions[1].data)).size == (480, 1920)
+    thumbnail = Image.open(io.BytesIO(ImageProcessingService.generate_thumbnail(data)))
+    assert thumbnail.size == (300, 75)
@@ -0,0 +1,102 @@
+"""Tests for the streaming listing export."""
+
+import csv
+import io
+import json
+from datetime import datetime, timezone
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.schemas.user import User
+from app.services.listing_export import (
+    CSV_FIELDS,
+    export_csv,
+    export_ndjson,
+    listing_export_select,
+)
+
+NOW = datetime(2025, 11, 8, 13, 35, 18, tzinfo=timezone.utc)
+
+
+def _record(listing_id):
+    return {
+        "id": listing_id,
+        "title": "Книга, \"новая\"",
+        "description": "line one\nline two",
+        "price_minor_units": 150000,
+        "currency": "KZT",
+        "category": "books",
+        "condition": None,
+        "status": "active",
+        "view_count": 3,
+        "seller_id": 1,
+        "created_at": NOW,
+        "updated_at": NOW,
+        "seller_telegram_id": 42,
+        "seller_username": None,
+        "seller_first_name": "A",
+        "seller_last_name": None,
+        "photos": [{"id": 5, "photo_url": "https://cdn/5.jpg", "display_order": 0}],
+    }
+
+
+async def _records(count):
+    for listing_id in range(1, count + 1):
+        yield _record(listing_id)
+
+
+async def _collect(chunks):
+    return [chunk async for chunk in chunks]
+
+
+@pytest.mark.asyncio
+async def test_ndjson_emits_one_line_per_listing():
+    chunks = await _collect(export_ndjson(_records(3)))
+
+    assert len(chunks) == 3
+    first = json.loads(chunks[0])
+    assert first["id"] == 1
+    assert first["created_at"] == "2025-11-08T13:35:18Z"
+    assert first["photos"][0]["photo_url"] == "https://cdn/5.jpg"
+
+
+@pytest.mark.asyncio
+async def test_csv_streams_header_then_rows():
+    chunks = await _collect(export_csv(_records(2)))
+
+    assert len(chunks) == 3
+    rows = list(csv.DictReader(io.StringIO(b"".join(chunks).decode())))
+    assert list(rows[0]) == CSV_FIELDS
+    assert rows[1]["title"] == "Книга, \"новая\""
+    assert rows[1]["description"] == "line one\nline two"
+    assert json.loads(rows[1]["photos"])[0]["id"] == 5
+
+
+def test_thumbnails_are_only_selected_on_request():
+    def sql(include_thumbnails):
+        stmt = listing_export_select(include_thumbnails)
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "thumbnail_data" not in sql(False)
+    assert "thumbnail_data" in sql(True)
+    assert listing_export_select().get_execution_options()["yield_per"] > 0
+
+
+@pytest.mark.asyncio
+async def test_export_requires_moderator():
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, telegram_id=42, first_name="A", role="verified"
+    )
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/listings/export")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 403
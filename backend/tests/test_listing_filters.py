@@ -0,0 +1,113 @@
+"""Tests for listing filters."""
+
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes.listings import _fetch_listing_page
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.listing import Listing
+from app.schemas.user import User
+from app.services.listing_filters import ListingFilters, parse_facets
+from app.services.listing_json import listing_rows_select
+from app.services.pagination import ListingCursor
+
+
+def _sql(clauses):
+    return [str(c.compile(dialect=postgresql.dialect())) for c in clauses]
+
+
+def test_only_set_filters_produce_clauses():
+    filters = ListingFilters(category="books", min_price=100)
+
+    assert _sql(filters.clauses()) == [
+        "listings.category = %(category_1)s::VARCHAR",
+        "listings.price_minor_units >= %(price_minor_units_1)s::INTEGER",
+    ]
+    assert filters.as_params() == {"category": "books", "min_price": 100}
+
+
+def test_facet_dimensions_can_be_excluded():
+    filters = ListingFilters(category="books", condition="good", status="active")
+
+    assert _sql(filters.clauses("category", "condition")) == [
+        "listings.status = %(status_1)s::VARCHAR",
+    ]
+
+
+def test_facets_are_read_from_the_grouping_set_rows():
+    facets = parse_facets(
+        [
+            [0, "books", None, 3, 1],
+            [0, "games", None, 0, 0],
+            [1, None, "new", 2, 1],
+            [1, None, None, 1, 1],
+        ]
+    )
+
+    assert facets.category == {"books": 3}
+    assert facets.condition == {"new": 1}
+    assert parse_facets(None).category == {}
+
+
+class _Session:
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(str(stmt.compile(dialect=postgresql.dialect())))
+        return SimpleNamespace(all=lambda: self.rows)
+
+
+@pytest.mark.asyncio
+async def test_first_page_and_facets_share_one_query():
+    # The outer join yields a single row without a listing when the page is empty
+    db = _Session([SimpleNamespace(id=None, facets=[[0, "books", None, 3, 3]])])
+
+    rows, next_cursor, facets = await _fetch_listing_page(
+        db, Listing, None, ListingFilters(category="toys"), None, 20,
+        base=listing_rows_select(),
+    )
+
+    assert (rows, next_cursor) == ([], None)
+    assert facets.category == {"books": 3}
+    [sql] = db.statements
+    assert "GROUPING SETS" in sql
+    assert "FROM (SELECT jsonb_agg(" in sql
+    assert "LEFT OUTER JOIN (SELECT" in sql
+
+
+@pytest.mark.asyncio
+async def test_later_pages_skip_the_facets():
+    db = _Session([])
+
+    after = ListingCursor(datetime(2024, 1, 1, tzinfo=timezone.utc), 7)
+
+    _, _, facets = await _fetch_listing_page(
+        db, Listing, None, ListingFilters(), after, 20, base=listing_rows_select()
+    )
+
+    assert facets is None
+    [sql] = db.statements
+    assert "GROUPING SETS" not in sql
+
+
+@pytest.mark.asyncio
+async def test_unknown_status_is_not_accepted():
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, telegram_id=42, first_name="A", role="verified"
+    )
+    try:
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test", follow_redirects=True
+        ) as client:
+            response = await client.get("/api/v1/listings/?status=deleted")
+    finally:
+        app.dependency_overrides.pop(get_current_user, None)
+
+    assert response.status_code == 422
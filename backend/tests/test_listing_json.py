@@ -0,0 +1,152 @@
+"""Tests for the fast listing page serialisation path."""
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.models.listing import Listing
+from app.schemas.listing import ListingFacets, ListingPage, ListingWithSeller
+from app.services import listing_json
+from app.services.listing_json import fetch_photo_rows, render_listing_page
+from tests.conftest import FakeDatabase
+
+NOW = datetime(2025, 11, 8, 13, 35, 18, 207793, tzinfo=timezone.utc)
+
+
+def _seller(seller_id, **fields):
+    return SimpleNamespace(
+        id=seller_id,
+        telegram_id=1000 + seller_id,
+        username=fields.get("username"),
+        first_name=fields.get("first_name", "Алия"),
+        last_name=fields.get("last_name"),
+        photo_url=fields.get("photo_url"),
+        updated_at=NOW,
+    )
+
+
+def _photo(photo_id, listing_id, display_order, **fields):
+    return SimpleNamespace(
+        id=photo_id,
+        listing_id=listing_id,
+        photo_url=f"https://cdn.example/{photo_id}.jpg",
+        display_order=display_order,
+        renditions=fields.get("renditions"),
+        file_size_bytes=fields.get("file_size_bytes"),
+        original_filename=fields.get("original_filename"),
+        created_at=fields.get("created_at", NOW),
+    )
+
+
+def _listing(listing_id, seller, photos, **fields):
+    return SimpleNamespace(
+        id=listing_id,
+        title=fields.get("title", f"Listing {listing_id}"),
+        description=fields.get("description", "Описание\n\"quoted\" \\ / é  "),
+        price_minor_units=fields.get("price_minor_units", 150000),
+        currency="KZT",
+        seller_id=seller.id,
+        created_at=fields.get("created_at", NOW),
+        updated_at=fields.get("updated_at", NOW),
+        seller=seller,
+        photos=photos,
+    )
+
+
+def _row(listing):
+    """The row ``listing_rows_select`` would return for a listing."""
+    seller = listing.seller
+    return SimpleNamespace(
+        **{k: v for k, v in vars(listing).items() if k not in ("seller", "photos")},
+        seller_telegram_id=seller.telegram_id,
+        seller_username=seller.username,
+        seller_first_name=seller.first_name,
+        seller_last_name=seller.last_name,
+        seller_photo_url=seller.photo_url,
+        seller_updated_at=seller.updated_at,
+    )
+
+
+def _pages():
+    first = _listing(
+        2,
+        _seller(7, username="seller", last_name="K", photo_url="https://t.me/p.jpg"),
+        [
+            _photo(10, 2, 0, file_size_bytes=2048,
+                   original_filename="фото.jpg"),
+            _photo(11, 2, 1, created_at=datetime(2025, 1, 1, tzinfo=timezone.utc),
+                   # Key order as JSONB returns it
+                   renditions=[{"url": "https://cdn.example/r/11/160.webp",
+                                "width": 160, "format": "webp", "height": 120}]),
+        ],
+        updated_at=NOW + timedelta(microseconds=1),
+    )
+    second = _listing(
+        1,
+        _seller(8),
+        [],
+        created_at=datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5))),
+    )
+    facets = ListingFacets(category={"books": 3}, condition={"new": 1, "used": 2})
+    return [
+        ([first, second], "eyJjdXJzb3IiOjF9", facets),
+        ([second], None, None),
+        ([], None, ListingFacets()),
+    ]
+
+
+def _assert_byte_compatible():
+    for listings, next_cursor, facets in _pages():
+        expected = ListingPage(
+            items=[ListingWithSeller.model_validate(listing) for listing in listings],
+            next_cursor=next_cursor,
+            facets=facets,
+        ).model_dump_json().encode()
+
+        photos = {listing.id: listing.photos for listing in listings}
+        rendered = render_listing_page(
+            [_row(listing) for listing in listings], photos, next_cursor, facets
+        )
+
+        assert rendered == expected
+
+
+def test_fast_page_matches_pydantic_bytes():
+    pytest.importorskip("orjson")
+
+    _assert_byte_compatible()
+
+
+def test_stdlib_fallback_matches_pydantic_bytes(monkeypatch):
+    monkeypatch.setattr(listing_json, "orjson", None)
+
+    _assert_byte_compatible()
+
+
+def _ordered(rows, columns):
+    return sorted(rows, key=lambda row: tuple(getattr(row, c.name) for c in columns))
+
+
+@pytest.mark.asyncio
+async def test_both_paths_order_photos_alike():
+    # Reordered after upload: insertion order differs from display order
+    photos = [_photo(20, 3, 2), _photo(21, 3, 0), _photo(22, 3, 1), _photo(5, 4, 0)]
+    listing = _listing(3, _seller(7), [])
+
+    def answer(compiled):
+        return _ordered(photos, compiled.statement._order_by_clauses)
+
+    db = FakeDatabase({"SELECT listing_photos": answer})
+    rows = await fetch_photo_rows(db, [3, 4])
+    # What selectinload returns for the relationship
+    listing.photos = _ordered(
+        [p for p in photos if p.listing_id == 3], Listing.photos.property.order_by
+    )
+
+    assert [p.id for p in rows[3]] == [p.id for p in listing.photos] == [21, 22, 20]
+    assert render_listing_page([_row(listing)], rows, None, None) == (
+        ListingPage(items=[ListingWithSeller.model_validate(listing)])
+        .model_dump_json()
+        .encode()
+    )
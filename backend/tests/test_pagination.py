@@ -0,0 +1,28 @@
+"""Tests for keyset pagination cursors."""
+
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.pagination import ListingCursor, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    cursor = ListingCursor(datetime(2025, 11, 8, 13, 35, 18, 207793, tzinfo=timezone.utc), 42)
+
+    token = encode_cursor(cursor)
+
+    assert "=" not in token
+    assert decode_cursor(token) == cursor
+
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "W10", "eyJhIjoxfQ"])
+def test_decode_cursor_rejects_malformed_tokens(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+
+def test_search_cursor_round_trip_keeps_rank():
+    cursor = ListingCursor(datetime(2025, 11, 8, tzinfo=timezone.utc), 7, 0.30000001192092896)
+
+    assert decode_cursor(encode_cursor(cursor)) == cursor
@@ -0,0 +1,118 @@
+"""Tests for content-addressed photo files and their purge."""
+
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.photo_blobs import (
+    StoredBlob,
+    find_blob,
+    purge_unreferenced_blobs,
+    record_blob,
+)
+from app.services.storage import BatchResult
+
+
+class _Session:
+    """Records statements; SELECTs return ``rows``."""
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.statements = []
+        self.commits = 0
+
+    async def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.statements.append(compiled)
+        return SimpleNamespace(
+            all=lambda: self.rows,
+            one_or_none=lambda: None,
+            scalar_one=lambda: 1,
+        )
+
+    async def commit(self):
+        self.commits += 1
+
+
+class _Storage:
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.deleted = []
+        self.requests = 0
+
+    async def delete_files(self, urls):
+        self.requests += 1
+        self.deleted.extend(url for url in urls if url not in self.failing)
+        return BatchResult(
+            [url for url in urls if url not in self.failing],
+            {url: "AccessDenied" for url in urls if url in self.failing},
+        )
+
+
+def _blob(blob_id, thumbnail_object_url=None, renditions=None):
+    return SimpleNamespace(
+        id=blob_id,
+        url=f"https://cdn.example/photos/{blob_id}",
+        thumbnail_object_url=thumbnail_object_url,
+        renditions=renditions,
+    )
+
+
+@pytest.mark.asyncio
+async def test_lookup_locks_against_purge_but_not_other_uploads():
+    db = _Session()
+
+    await find_blob(db, "ab" * 32)
+
+    assert db.statements[0].string.endswith("FOR KEY SHARE")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_record_of_same_file_shares_the_row():
+    db = _Session()
+
+    await record_blob(db, StoredBlob("ab" * 32, "https://cdn.example/photos/ab", None, 10))
+
+    sql = db.statements[0].string
+    assert "ON CONFLICT (sha256) DO UPDATE" in sql
+    assert "RETURNING photo_blobs.id" in sql
+
+
+@pytest.mark.asyncio
+async def test_purge_deletes_objects_before_rows():
+    db = _Session(
+        rows=[
+            _blob(1, thumbnail_object_url="https://cdn.example/thumbnails/1.jpg"),
+            _blob(2),
+            _blob(3, renditions=[{"url": "https://cdn.example/renditions/3/160w.webp"}]),
+            _blob(4, renditions=[{"url": "https://cdn.example/renditions/4/160w.webp"}]),
+        ]
+    )
+    storage = _Storage(
+        failing={"https://cdn.example/photos/2", "https://cdn.example/renditions/4/160w.webp"}
+    )
+
+    last_id = await purge_unreferenced_blobs(db, storage, grace_seconds=60, after_id=0)
+
+    assert last_id == 4
+    # One batch request for the objects of all blobs
+    assert storage.requests == 1
+    assert sorted(storage.deleted) == [
+        "https://cdn.example/photos/1",
+        "https://cdn.example/photos/3",
+        "https://cdn.example/photos/4",
+        "https://cdn.example/renditions/3/160w.webp",
+        "https://cdn.example/thumbnails/1.jpg",
+    ]
+    select_sql, delete_sql = (c.string for c in db.statements)
+    assert "ref_count = " in select_sql and "FOR UPDATE SKIP LOCKED" in select_sql
+    assert delete_sql.startswith("DELETE FROM photo_blobs")
+    # Blobs with an object that survived are kept for the next run
+    assert db.statements[1].params["id_1"] == [1, 3]
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_purge_reports_completion():
+    assert await purge_unreferenced_blobs(_Session(), _Storage(), grace_seconds=60) is None
@@ -0,0 +1,499 @@
+"""Tests for the concurrent, all-or-nothing photo upload pipeline."""
+
+import asyncio
+import hashlib
+import io
+import time
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+from PIL import Image
+from sqlalchemy.dialects import postgresql
+
+from app.api.routes import listings
+from app.core.config import settings
+from app.db.session import get_db
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.models.listing_photo import ListingPhoto
+from app.models.photo_job import PhotoJob
+from app.schemas.user import User
+from app.services.image_executor import ImageExecutor
+from app.services.storage import BatchResult, ObjectInfo, PresignedUpload
+
+UPLOAD_DELAY = 0.2
+
+
+def _jpeg(shade=0):
+    buffer = io.BytesIO()
+    Image.new("RGB", (800, 600), (10, 120, shade)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _jpeg_header(width, height):
+    """SOI, a baseline frame header and EOI: the header of a huge JPEG."""
+    sof = b"\xff\xc0\x00\x11\x08" + height.to_bytes(2, "big") + width.to_bytes(2, "big")
+    return b"\xff\xd8" + sof + b"\x03" + b"\x01\x22\x00\x02\x11\x01\x03\x11\x01" + b"\xff\xd9"
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class _ListingSession:
+    """Session stand-in owning listing 1 with no photos yet.
+
+    ``blobs`` plays the photo_blobs table, keyed by digest.
+    """
+
+    def __init__(self):
+        self.added = []
+        self.committed = False
+        self.blobs = {}
+        self.unreferenced = []
+        self.photo_count = 0
+        self.photo_urls = set()
+        self.statements = []
+
+    async def execute(self, stmt):
+        compiled = stmt.compile(dialect=postgresql.dialect())
+        self.statements.append(compiled.string)
+        if compiled.string.startswith("SELECT count(*)"):
+            if "photo_url IN" in compiled.string:
+                count = len(self.photo_urls & set(compiled.params["photo_url_1"]))
+            else:
+                count = self.photo_count
+            return SimpleNamespace(scalar_one=lambda: count)
+        if compiled.string.startswith("SELECT photo_blobs"):
+            blob = self.blobs.get(compiled.params["sha256_1"])
+            return SimpleNamespace(one_or_none=lambda: blob)
+        if compiled.string.startswith("INSERT INTO photo_blobs"):
+            if "RETURNING" not in compiled.string:
+                self.unreferenced.append(compiled.params)
+                return None
+            params = compiled.params
+            blob = self.blobs.setdefault(
+                params["sha256"],
+                SimpleNamespace(
+                    id=100 + len(self.blobs),
+                    url=params["url"],
+                    thumbnail_bytes=params["thumbnail_bytes"],
+                    thumbnail_object_url=params["thumbnail_object_url"],
+                    renditions=None,
+                ),
+            )
+            return SimpleNamespace(scalar_one=lambda: blob.id)
+        listing = SimpleNamespace(id=1, seller_id=1, updated_at=None)
+        return SimpleNamespace(
+            scalar_one_or_none=lambda: listing,
+            scalars=lambda: SimpleNamespace(all=lambda: []),
+        )
+
+    def add(self, obj):
+        self.added.append(obj)
+
+    def add_all(self, objs):
+        self.added.extend(objs)
+
+    async def flush(self):
+        for n, obj in enumerate(self.added, start=1):
+            if obj.id is None:
+                obj.id = n
+
+    async def commit(self):
+        self.committed = True
+
+    async def rollback(self):
+        self.added.clear()
+
+
+class _SlowStorage:
+    """Storage stand-in whose uploads each take ``UPLOAD_DELAY`` seconds."""
+
+    MAX_FILE_SIZE = 1024 * 1024
+
+    ALLOWED_IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".gif", ".webp"}
+
+    def __init__(self):
+        self.uploaded = []
+        self.deleted = []
+        self.bodies = []
+        self.types = []
+        self.objects = {}  # Uploaded straight to storage, by key
+
+    def validate_file(self, file):
+        pass
+
+    def public_url(self, key):
+        return f"https://cdn.example/{key}"
+
+    async def presign_upload(self, key, content_type, max_size, expires_in):
+        return PresignedUpload(
+            key, "https://bucket.example", "POST", {"key": key, "Content-Type": content_type}, {}
+        )
+
+    async def head_object(self, key):
+        return self.objects.get(key)
+
+    async def upload_object(self, key, data, content_type):
+        self.bodies.append(data)
+        self.types.append(content_type)
+        await asyncio.sleep(UPLOAD_DELAY)
+        url = f"https://cdn.example/{key}"
+        self.uploaded.append(url)
+        return url
+
+    async def delete_files(self, urls):
+        self.deleted.extend(urls)
+        return BatchResult(list(urls), {})
+
+
+@pytest.fixture
+def upload_env(monkeypatch):
+    db = _ListingSession()
+    storage = _SlowStorage()
+    executor = ImageExecutor(kind="thread", max_workers=5)
+
+    async def override_db():
+        yield db
+
+    app.dependency_overrides[get_db] = override_db
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, telegram_id=42, first_name="A", role="verified"
+    )
+    monkeypatch.setattr(listings, "get_storage_service", lambda: storage)
+    monkeypatch.setattr(listings, "image_executor", executor)
+    monkeypatch.setattr(listings, "invalidate_listing", lambda listing_id: asyncio.sleep(0))
+    yield db, storage
+    executor.shutdown()
+    app.dependency_overrides.pop(get_db, None)
+    app.dependency_overrides.pop(get_current_user, None)
+
+
+async def _upload(files):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(
+            "/api/v1/listings/1/photos",
+            files=[("photos", (name, data, "image/jpeg")) for name, data in files],
+        )
+
+
+@pytest.mark.asyncio
+async def test_photos_are_processed_concurrently(upload_env):
+    db, storage = upload_env
+    images = [_jpeg(n) for n in range(5)]
+
+    started = time.perf_counter()
+    response = await _upload([(f"{n}.jpg", image) for n, image in enumerate(images)])
+    elapsed = time.perf_counter() - started
+
+    assert response.status_code == 200
+    # Stored under the digest of their contents
+    assert [p["url"] for p in response.json()] == [
+        f"https://cdn.example/photos/{_sha256(image)}" for image in images
+    ]
+    photos = [o for o in db.added if isinstance(o, ListingPhoto)]
+    assert [p.display_order for p in photos] == list(range(5))
+    assert [p.blob_id for p in photos] == [db.blobs[_sha256(i)].id for i in images]
+    # Each photo's rendition job is queued in the same transaction
+    jobs = [o for o in db.added if isinstance(o, PhotoJob)]
+    assert [j.photo_id for j in jobs] == [p.id for p in photos]
+    assert [p["job"]["status"] for p in response.json()] == ["pending"] * 5
+    assert [p["job"]["photo_id"] for p in response.json()] == [p.id for p in photos]
+    assert db.committed
+    # Thumbnails are kept inline by default
+    assert all(p.thumbnail_bytes.startswith(b"\xff\xd8") for p in photos)
+    assert all(p.thumbnail_object_url is None for p in photos)
+    # Sequential processing would take at least 5 * UPLOAD_DELAY
+    assert elapsed < 3 * UPLOAD_DELAY
+
+
+@pytest.mark.asyncio
+async def test_listing_is_locked_before_its_photos_are_counted(upload_env):
+    db, storage = upload_env
+    db.photo_count = 4
+
+    response = await _upload([("0.jpg", _jpeg(0)), ("1.jpg", _jpeg(1))])
+
+    assert response.status_code == 400
+    assert "Currently 4 photos exist" in response.json()["detail"]
+    # Concurrent uploads to the listing wait for the lock, then count again
+    lock, count = db.statements
+    assert lock.startswith("SELECT listings.") and lock.endswith("FOR UPDATE")
+    assert count.startswith("SELECT count(*)")
+    assert storage.uploaded == []
+
+
+@pytest.mark.asyncio
+async def test_one_bad_photo_rolls_back_all_uploads(upload_env):
+    db, storage = upload_env
+
+    # A valid header, so only decoding fails
+    response = await _upload(
+        [("0.jpg", _jpeg(0)), ("1.jpg", _jpeg(1)[:1000]), ("2.jpg", _jpeg(2))]
+    )
+
+    assert response.status_code == 400
+    assert "1.jpg" in response.json()["detail"]
+    # Rolled back; only the unreferenced files are committed
+    assert db.added == []
+    assert len(storage.uploaded) == 3
+    # Nothing is deleted directly; the files are left for the purge
+    assert storage.deleted == []
+    assert sorted(
+        db.unreferenced[0][f"url_m{n}"] for n in range(3)
+    ) == sorted(storage.uploaded)
+
+
+@pytest.mark.asyncio
+async def test_thumbnailer_and_upload_share_one_buffer(upload_env, monkeypatch):
+    db, storage = upload_env
+    thumbnailed = []
+
+    async def thumbnail(filename, contents):
+        thumbnailed.append(contents)
+        return b"thumb"
+
+    monkeypatch.setattr(listings, "_thumbnail", thumbnail)
+    image = _jpeg()
+
+    response = await _upload([("0.jpg", image)])
+
+    assert response.status_code == 200
+    [body] = storage.bodies
+    assert isinstance(body, memoryview) and body.obj is thumbnailed[0].obj
+    assert bytes(body) == image
+    assert db.added[0].file_size_bytes == len(image)
+
+
+@pytest.mark.asyncio
+async def test_oversized_photo_is_rejected_before_upload(upload_env):
+    db, storage = upload_env
+
+    response = await _upload(
+        [("0.jpg", _jpeg()), ("big.jpg", _jpeg() + bytes(storage.MAX_FILE_SIZE))]
+    )
+
+    assert response.status_code == 400
+    assert "File too large" in response.json()["detail"]
+    assert db.added == []
+    assert len(storage.uploaded) == 1
+    assert db.unreferenced[0]["url_m0"] == storage.uploaded[0]
+
+
+@pytest.mark.asyncio
+async def test_non_images_and_bombs_are_rejected_from_their_header(upload_env, monkeypatch):
+    db, storage = upload_env
+    monkeypatch.setattr(settings, "image_max_pixels", 1_000_000)
+
+    response = await _upload([("0.jpg", b"<html>" + bytes(100_000))])
+    assert response.status_code == 400
+    assert "Invalid image '0.jpg': Unsupported image format" in response.json()["detail"]
+
+    # 2000x2000 pixels, but the file is tiny
+    response = await _upload([("bomb.jpg", _jpeg_header(2000, 2000))])
+    assert response.status_code == 400
+    assert "Image too large: 2000x2000 pixels" in response.json()["detail"]
+
+    assert storage.bodies == [] and storage.uploaded == []
+    assert db.unreferenced == []
+
+
+@pytest.mark.asyncio
+async def test_sniffed_content_type_is_stored(upload_env):
+    db, storage = upload_env
+    buffer = io.BytesIO()
+    Image.new("RGB", (40, 30)).save(buffer, format="PNG")
+
+    # Neither the extension nor the declared type are trusted
+    response = await _upload([("photo.jpg", buffer.getvalue())])
+
+    assert response.status_code == 200, response.text
+    [blob] = db.blobs.values()
+    assert db.added[0].blob_id == blob.id
+    assert storage.types == ["image/png"]
+
+
+@pytest.mark.asyncio
+async def test_object_thumbnails_are_uploaded_and_left_for_purge(upload_env, monkeypatch):
+    db, storage = upload_env
+    monkeypatch.setattr(settings, "thumbnail_storage", "object")
+    image = _jpeg()
+    thumbnail_url = f"https://cdn.example/thumbnails/{_sha256(image)}.jpg"
+
+    response = await _upload([("0.jpg", image)])
+
+    assert response.status_code == 200
+    [photo] = [o for o in db.added if isinstance(o, ListingPhoto)]
+    assert photo.thumbnail_object_url == thumbnail_url
+    assert photo.thumbnail_bytes is None
+    assert response.json()[0]["thumbnail"].startswith("/9j/")
+
+    other = _jpeg(1)
+    response = await _upload([("0.jpg", other), ("1.jpg", b"not an image")])
+
+    assert response.status_code == 400
+    [unreferenced] = db.unreferenced
+    assert f"https://cdn.example/thumbnails/{_sha256(other)}.jpg" in unreferenced.values()
+    assert storage.deleted == []
+
+
+@pytest.mark.asyncio
+async def test_duplicate_photo_reuses_stored_file_and_thumbnail(upload_env, monkeypatch):
+    db, storage = upload_env
+    image = _jpeg()
+    db.blobs[_sha256(image)] = SimpleNamespace(
+        id=7,
+        url="https://cdn.example/photos/known",
+        thumbnail_bytes=b"\xff\xd8known",
+        thumbnail_object_url=None,
+        renditions=None,
+    )
+
+    async def thumbnail(filename, contents):
+        raise AssertionError("duplicates are not thumbnailed")
+
+    monkeypatch.setattr(listings, "_thumbnail", thumbnail)
+
+    response = await _upload([("again.jpg", image)])
+
+    assert response.status_code == 200
+    assert storage.uploaded == []
+    [photo] = [o for o in db.added if isinstance(o, ListingPhoto)]
+    assert photo.blob_id == 7
+    assert photo.photo_url == "https://cdn.example/photos/known"
+    assert photo.thumbnail_bytes == b"\xff\xd8known"
+    assert response.json()[0]["url"] == "https://cdn.example/photos/known"
+    # Not rendered yet, so the job renders the blob
+    assert response.json()[0]["job"]["status"] == "pending"
+
+
+@pytest.mark.asyncio
+async def test_duplicate_photo_copies_the_renditions_of_its_blob(upload_env):
+    db, storage = upload_env
+    image = _jpeg()
+    blob_renditions = [
+        {
+            "url": f"https://cdn.example/renditions/{_sha256(image)}/160w.webp",
+            "width": 160,
+            "height": 120,
+            "format": "webp",
+        }
+    ]
+    db.blobs[_sha256(image)] = SimpleNamespace(
+        id=7,
+        url="https://cdn.example/photos/known",
+        thumbnail_bytes=b"\xff\xd8known",
+        thumbnail_object_url=None,
+        renditions=blob_renditions,
+    )
+
+    response = await _upload([("again.jpg", image)])
+
+    assert response.status_code == 200
+    [photo] = [o for o in db.added if isinstance(o, ListingPhoto)]
+    assert photo.renditions == blob_renditions
+    # Nothing for a worker to download or render
+    [job] = [o for o in db.added if isinstance(o, PhotoJob)]
+    assert job.status == "done"
+    assert response.json()[0]["job"]["status"] == "done"
+
+
+async def _post(path, body):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(f"/api/v1/listings/1/photos/{path}", json=body)
+
+
+@pytest.mark.asyncio
+async def test_presign_returns_a_target_per_file(upload_env):
+    db, storage = upload_env
+    files = [
+        {"filename": "a.JPG", "content_type": "image/jpeg", "size": 1000},
+        {"filename": "b.png", "content_type": "image/png", "size": 2000},
+    ]
+
+    response = await _post("presign", {"files": files})
+
+    assert response.status_code == 200, response.text
+    targets = response.json()
+    assert [t["method"] for t in targets] == ["POST", "POST"]
+    assert targets[0]["key"].startswith("uploads/1/") and targets[0]["key"].endswith(".jpg")
+    assert targets[1]["fields"]["Content-Type"] == "image/png"
+    assert targets[0]["key"] != targets[1]["key"]
+    # Nothing passes through or is stored by the API
+    assert storage.uploaded == [] and db.added == []
+
+
+@pytest.mark.asyncio
+async def test_presign_enforces_type_size_and_photo_limit(upload_env):
+    db, storage = upload_env
+
+    def presign(**file):
+        return _post(
+            "presign",
+            {"files": [{"filename": "a.jpg", "content_type": "image/jpeg", "size": 1, **file}]},
+        )
+
+    assert (await presign(filename="a.svg")).status_code == 400
+    assert (await presign(content_type="text/html")).status_code == 400
+    response = await presign(size=storage.MAX_FILE_SIZE + 1)
+    assert response.status_code == 400 and "too large" in response.json()["detail"]
+
+    db.photo_count = 5
+    response = await presign()
+    assert response.status_code == 400 and "Maximum 5 photos" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_finalize_adds_uploaded_photos_and_queues_thumbnails(upload_env):
+    db, storage = upload_env
+    db.photo_count = 2
+    storage.objects["uploads/1/a.jpg"] = ObjectInfo(1000, "image/jpeg")
+    storage.objects["uploads/1/b.webp"] = ObjectInfo(2000, "image/webp")
+
+    response = await _post(
+        "finalize",
+        {"photos": [{"key": "uploads/1/a.jpg", "filename": "a.jpg"}, {"key": "uploads/1/b.webp"}]},
+    )
+
+    assert response.status_code == 200, response.text
+    assert db.committed
+    photos = [obj for obj in db.added if isinstance(obj, ListingPhoto)]
+    assert [(p.photo_url, p.display_order, p.file_size_bytes) for p in photos] == [
+        ("https://cdn.example/uploads/1/a.jpg", 2, 1000),
+        ("https://cdn.example/uploads/1/b.webp", 3, 2000),
+    ]
+    # The rendition job generates the thumbnail
+    assert all(p.thumbnail_bytes is None and p.blob_id is None for p in photos)
+    jobs = [obj for obj in db.added if isinstance(obj, PhotoJob)]
+    assert [j.photo_id for j in jobs] == [p.id for p in photos]
+    body = response.json()
+    assert [b["thumbnail"] for b in body] == [None, None]
+    assert [b["job"]["status"] for b in body] == ["pending", "pending"]
+
+
+@pytest.mark.asyncio
+async def test_finalize_rejects_missing_foreign_and_oversized_objects(upload_env):
+    db, storage = upload_env
+
+    response = await _post("finalize", {"photos": [{"key": "uploads/1/gone.jpg"}]})
+    assert response.status_code == 400 and "not uploaded" in response.json()["detail"]
+
+    storage.objects["uploads/2/a.jpg"] = ObjectInfo(1000, "image/jpeg")
+    response = await _post("finalize", {"photos": [{"key": "uploads/2/a.jpg"}]})
+    assert response.status_code == 400
+
+    # Supabase signed URLs do not limit the size; finalizing does
+    storage.objects["uploads/1/big.jpg"] = ObjectInfo(storage.MAX_FILE_SIZE + 1, "image/jpeg")
+    storage.objects["uploads/1/ok.jpg"] = ObjectInfo(1000, "image/jpeg")
+    response = await _post(
+        "finalize", {"photos": [{"key": "uploads/1/ok.jpg"}, {"key": "uploads/1/big.jpg"}]}
+    )
+    assert response.status_code == 400
+    assert storage.deleted == ["https://cdn.example/uploads/1/big.jpg"]
+    assert not db.committed and db.added == []
+
+    db.photo_urls.add("https://cdn.example/uploads/1/ok.jpg")
+    response = await _post("finalize", {"photos": [{"key": "uploads/1/ok.jpg"}]})
+    assert response.status_code == 400 and "already added" in response.json()["detail"]
@@ -0,0 +1,172 @@
+"""Tests for photo thumbnails and lean listing cards."""
+
+import base64
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from app.db.session import get_db
+from app.main import app
+from app.schemas.listing import ListingCard
+
+
+class _RowSession:
+    """Session stand-in whose queries all return the same row."""
+
+    def __init__(self, row):
+        self.row = row
+
+    async def execute(self, stmt):
+        return SimpleNamespace(one_or_none=lambda: self.row)
+
+
+@pytest.fixture
+def db_returning():
+    def install(row):
+        async def override():
+            yield _RowSession(row)
+
+        app.dependency_overrides[get_db] = override
+
+    yield install
+    app.dependency_overrides.pop(get_db, None)
+
+
+def _thumbnail_row(**columns):
+    return SimpleNamespace(
+        thumbnail_bytes=columns.get("thumbnail_bytes"),
+        thumbnail_object_url=columns.get("thumbnail_object_url"),
+        thumbnail_data=columns.get("thumbnail_data"),
+    )
+
+
+async def _get_thumb():
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://test"
+    ) as client:
+        return await client.get("/api/v1/photos/1/thumb")
+
+
+JPEG = b"\xff\xd8\xff\xe0fake-jpeg"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "columns",
+    [
+        {"thumbnail_bytes": JPEG},
+        # Legacy row not backfilled yet
+        {"thumbnail_data": base64.b64encode(JPEG).decode()},
+    ],
+)
+async def test_thumbnail_is_served_as_cacheable_binary(db_returning, columns):
+    db_returning(_thumbnail_row(**columns))
+
+    response = await _get_thumb()
+
+    assert response.status_code == 200
+    assert response.content == JPEG
+    assert response.headers["content-type"] == "image/jpeg"
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_object_thumbnail_redirects_to_storage(db_returning):
+    db_returning(_thumbnail_row(thumbnail_object_url="https://cdn.example/thumbnails/1.jpg"))
+
+    response = await _get_thumb()
+
+    assert response.status_code == 301
+    assert response.headers["location"] == "https://cdn.example/thumbnails/1.jpg"
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("row", [None, _thumbnail_row()])
+async def test_missing_thumbnail_returns_404(db_returning, row):
+    db_returning(row)
+
+    response = await _get_thumb()
+
+    assert response.status_code == 404
+
+
+def test_listing_card_references_cover_thumbnail():
+    now = datetime.now(timezone.utc)
+    listing = SimpleNamespace(
+        id=3,
+        title="Guitar",
+        description="Yamaha F310",
+        price_minor_units=3000000,
+        currency="KZT",
+        seller_id=1,
+        category="musical_instruments",
+        condition="good",
+        created_at=now,
+        updated_at=now,
+        seller=SimpleNamespace(
+            id=1, telegram_id=42, username=None, first_name="A", last_name=None, photo_url=None
+        ),
+        photos=[
+            SimpleNamespace(
+                id=11, photo_url="https://cdn/b.jpg", display_order=1, renditions=None
+            ),
+            SimpleNamespace(
+                id=10,
+                photo_url="https://cdn/a.jpg",
+                display_order=0,
+                renditions=[
+                    {
+                        "url": "https://cdn/r/10/160.webp",
+                        "width": 160,
+                        "height": 90,
+                        "format": "webp",
+                    }
+                ],
+            ),
+        ],
+    )
+
+    card = ListingCard.from_listing(listing)
+
+    assert card.photo_count == 2
+    assert card.cover_photo_url == "https://cdn/a.jpg"
+    assert card.cover_thumbnail_url == "/api/v1/photos/10/thumb"
+    assert [r.width for r in card.cover_renditions] == [160]
+
+
+def test_listing_card_from_read_model_row():
+    now = datetime.now(timezone.utc)
+    row = SimpleNamespace(
+        id=3,
+        title="Guitar",
+        description="Yamaha F310",
+        price_minor_units=3000000,
+        currency="KZT",
+        seller_id=1,
+        category="musical_instruments",
+        condition="good",
+        created_at=now,
+        updated_at=now,
+        seller_telegram_id=42,
+        seller_username="seller",
+        seller_first_name="A",
+        seller_last_name=None,
+        seller_photo_url=None,
+        photo_count=2,
+        cover_photo_id=10,
+        cover_photo_url="https://cdn/a.jpg",
+        cover_photo_renditions=None,
+    )
+
+    card = ListingCard.from_card(row)
+
+    assert card.seller.telegram_id == 42
+    assert card.seller.username == "seller"
+    assert card.photo_count == 2
+    assert card.cover_thumbnail_url == "/api/v1/photos/10/thumb"
+    assert ListingCard.from_card(
+        SimpleNamespace(**{**vars(row), "cover_photo_id": None, "cover_photo_url": None})
+    ).cover_thumbnail_url is None
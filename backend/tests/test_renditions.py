@@ -0,0 +1,314 @@
+"""Tests for the background photo rendition pipeline.
+
+The job queue tests need a disposable PostgreSQL database and only run
+when ``TEST_DATABASE_URL`` points at one, see ``test_user_upsert``.
+"""
+
+import asyncio
+import io
+import os
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+import pytest_asyncio
+from PIL import Image
+from sqlalchemy import delete, func, insert, select, update
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.models.base import Base
+from app.models.listing import Listing
+from app.models.listing_photo import ListingPhoto
+from app.models.photo_job import JOB_RUNNING, PhotoJob
+from app.models.user import User as UserModel
+from app.services import renditions
+from app.services.image_executor import ImageExecutor
+from app.services.image_processing import ImageProcessingService
+from app.services.renditions import RenditionWorker, _claim_statement
+from tests.conftest import FakeDatabase, FakeStorage
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+# Owner of the queued photos; below test_user_upsert's range
+QUEUE_TELEGRAM_ID = 8_900_000_000_000
+QUEUED_JOBS = 40
+
+
+def _png(size=(1200, 900)):
+    buffer = io.BytesIO()
+    Image.new("RGBA", size, (10, 120, 200, 128)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    executor = ImageExecutor(kind="thread", max_workers=2)
+    invalidated = []
+
+    async def invalidate_listing(listing_id):
+        invalidated.append(listing_id)
+
+    monkeypatch.setattr(renditions, "image_executor", executor)
+    monkeypatch.setattr(renditions, "invalidate_listing", invalidate_listing)
+    monkeypatch.setattr(settings, "rendition_widths", [160, 480, 2000])
+    monkeypatch.setattr(settings, "rendition_formats", ["webp", "jpeg"])
+
+    def make(storage, has_thumbnail=True, sha256=None, blob_renditions=None):
+        monkeypatch.setattr(renditions, "get_storage_service", lambda: storage)
+        photo = SimpleNamespace(
+            listing_id=1,
+            photo_url="https://cdn.example/a.png",
+            has_thumbnail=has_thumbnail,
+            sha256=sha256,
+            blob_renditions=blob_renditions,
+        )
+        # One job, then the queue is empty
+        db = FakeDatabase(
+            {"UPDATE photo_jobs": [[(7, 3, 1)]], "SELECT listing_photos": [[photo]]}
+        )
+        return RenditionWorker(session_factory=db.session), db
+
+    yield make, invalidated
+    executor.shutdown()
+
+
+def test_claim_skips_locked_jobs():
+    sql = str(_claim_statement(300).compile(dialect=postgresql.dialect()))
+
+    assert "FOR UPDATE SKIP LOCKED" in sql
+    assert sql.startswith("UPDATE photo_jobs SET status=")
+
+
+def test_renditions_are_scaled_down_never_up():
+    result = ImageProcessingService.generate_renditions(
+        _png((800, 600)), [160, 480, 1080], ["webp", "jpeg"]
+    )
+
+    assert [(r.width, r.height, r.format) for r in result] == [
+        (160, 120, "webp"),
+        (160, 120, "jpeg"),
+        (480, 360, "webp"),
+        (480, 360, "jpeg"),
+        (800, 600, "webp"),
+        (800, 600, "jpeg"),
+    ]
+    assert Image.open(io.BytesIO(result[0].data)).format == "WEBP"
+    assert Image.open(io.BytesIO(result[1].data)).format == "JPEG"
+
+
+@pytest.mark.asyncio
+async def test_worker_renders_stores_and_records(pipeline):
+    make, invalidated = pipeline
+    storage = FakeStorage(_png())
+    worker, db = make(storage)
+
+    assert await worker.process_next() is True
+
+    assert sorted(storage.objects) == [
+        "renditions/3/1200w.jpg",
+        "renditions/3/1200w.webp",
+        "renditions/3/160w.jpg",
+        "renditions/3/160w.webp",
+        "renditions/3/480w.jpg",
+        "renditions/3/480w.webp",
+    ]
+    assert storage.objects["renditions/3/160w.webp"][1] == "image/webp"
+    [photo_update] = db.updates_of("listing_photos")
+    assert [(r["width"], r["format"]) for r in photo_update["renditions"]] == [
+        (160, "webp"), (160, "jpeg"), (480, "webp"), (480, "jpeg"),
+        (1200, "webp"), (1200, "jpeg"),
+    ]
+    assert photo_update["renditions"][0] == {
+        "url": "https://cdn.example/renditions/3/160w.webp",
+        "width": 160,
+        "height": 120,
+        "format": "webp",
+    }
+    [job_update] = db.updates_of("photo_jobs")
+    assert job_update["status"] == "done"
+    assert db.updates_of("listings")
+    assert invalidated == [1]
+    # Without a blob there is nothing to share the renditions with
+    assert not db.updates_of("photo_blobs")
+    # Queue is now empty
+    assert await worker.process_next() is False
+
+
+@pytest.mark.asyncio
+async def test_blob_renditions_are_rendered_once_and_shared(pipeline):
+    make, _ = pipeline
+    sha256 = "ab" * 32
+    storage = FakeStorage(_png())
+    worker, db = make(storage, sha256=sha256)
+
+    assert await worker.process_next() is True
+
+    # Keyed by content, so every photo of the blob can use them
+    assert all(key.startswith(f"renditions/{sha256}/") for key in storage.objects)
+    [photo_update] = db.updates_of("listing_photos")
+    [blob_update] = db.updates_of("photo_blobs")
+    assert blob_update["renditions"] == photo_update["renditions"]
+    assert len(blob_update["renditions"]) == 6
+
+    # A job of another photo of the blob, queued before it was rendered
+    storage = FakeStorage(b"never downloaded", fail_with=AssertionError("downloaded"))
+    worker, db = make(storage, sha256=sha256, blob_renditions=blob_update["renditions"])
+
+    assert await worker.process_next() is True
+
+    assert storage.objects == {}
+    [photo_update] = db.updates_of("listing_photos")
+    assert photo_update["renditions"] == blob_update["renditions"]
+    assert not db.updates_of("photo_blobs")
+    [job_update] = db.updates_of("photo_jobs")
+    assert job_update["status"] == "done"
+
+
+@pytest.mark.asyncio
+async def test_missing_thumbnail_of_direct_upload_is_generated(pipeline, monkeypatch):
+    make, _ = pipeline
+    storage = FakeStorage(_png())
+    worker, db = make(storage, has_thumbnail=False)
+
+    assert await worker.process_next() is True
+    [photo_update] = db.updates_of("listing_photos")
+    thumbnail = Image.open(io.BytesIO(photo_update["thumbnail_bytes"]))
+    assert thumbnail.format == "JPEG" and max(thumbnail.size) <= 300
+    assert photo_update["thumbnail_object_url"] is None
+    assert not any(key.startswith("thumbnails/") for key in storage.objects)
+
+    monkeypatch.setattr(settings, "thumbnail_storage", "object")
+    storage = FakeStorage(_png())
+    worker, db = make(storage, has_thumbnail=False)
+
+    assert await worker.process_next() is True
+    [photo_update] = db.updates_of("listing_photos")
+    assert photo_update["thumbnail_bytes"] is None
+    assert photo_update["thumbnail_object_url"] == "https://cdn.example/thumbnails/3.jpg"
+    assert storage.objects["thumbnails/3.jpg"][1] == "image/jpeg"
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried_later(pipeline):
+    make, invalidated = pipeline
+    worker, db = make(FakeStorage(_png(), fail_with=Exception("connection reset")))
+
+    assert await worker.process_next() is True
+
+    [job_update] = db.updates_of("photo_jobs")
+    assert job_update["status"] == "pending"
+    assert "connection reset" in job_update["last_error"]
+    assert any("run_after" in c.string for c in db.statements)
+    assert not db.updates_of("listing_photos")
+    assert invalidated == []
+
+
+@pytest.mark.asyncio
+async def test_undecodable_image_fails_permanently(pipeline):
+    make, _ = pipeline
+    worker, db = make(FakeStorage(b"not an image"))
+
+    assert await worker.process_next() is True
+
+    [job_update] = db.updates_of("photo_jobs")
+    assert job_update["status"] == "failed"
+    assert "Failed to generate renditions" in job_update["last_error"]
+
+
+@pytest_asyncio.fixture
+async def job_queue():
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    engine = create_async_engine(TEST_DATABASE_URL, pool_size=20, max_overflow=20)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with factory() as session:
+        user_id = await session.scalar(
+            insert(UserModel)
+            .values(telegram_id=QUEUE_TELEGRAM_ID, first_name="Queue")
+            .returning(UserModel.id)
+        )
+        listing_id = await session.scalar(
+            insert(Listing)
+            .values(seller_id=user_id, title="Queue", description="", price_minor_units=1)
+            .returning(Listing.id)
+        )
+        photo_ids = (
+            await session.scalars(
+                insert(ListingPhoto).returning(ListingPhoto.id),
+                [
+                    {"listing_id": listing_id, "photo_url": f"https://cdn.example/{n}.jpg"}
+                    for n in range(QUEUED_JOBS)
+                ],
+            )
+        ).all()
+        job_ids = (
+            await session.scalars(
+                insert(PhotoJob).returning(PhotoJob.id),
+                [{"photo_id": photo_id} for photo_id in photo_ids],
+            )
+        ).all()
+        await session.commit()
+    yield factory, set(job_ids)
+
+    async with factory() as session:
+        # Cascades to the listing, its photos and their jobs
+        await session.execute(
+            delete(UserModel).where(UserModel.telegram_id == QUEUE_TELEGRAM_ID)
+        )
+        await session.commit()
+    await engine.dispose()
+
+
+async def _drain(worker):
+    claimed = []
+    while (job := await worker.claim()) is not None:
+        claimed.append(job)
+    return claimed
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_never_claim_a_job_twice(job_queue):
+    factory, job_ids = job_queue
+    workers = [RenditionWorker(session_factory=factory) for _ in range(10)]
+
+    claims = await asyncio.gather(*(_drain(worker) for worker in workers))
+
+    claimed = [job.id for jobs in claims for job in jobs]
+    assert len(claimed) == len(set(claimed))
+    assert job_ids <= set(claimed)
+    async with factory() as session:
+        states = (
+            await session.execute(
+                select(PhotoJob.status, PhotoJob.attempts).where(PhotoJob.id.in_(job_ids))
+            )
+        ).all()
+    assert set(states) == {(JOB_RUNNING, 1)}
+
+
+@pytest.mark.asyncio
+async def test_expired_lease_is_reclaimed(job_queue):
+    factory, job_ids = job_queue
+    worker = RenditionWorker(session_factory=factory, lease_seconds=60)
+    await _drain(worker)
+    abandoned = min(job_ids)
+
+    # Every lease is still held
+    assert await worker.claim() is None
+
+    async with factory() as session:
+        await session.execute(
+            update(PhotoJob)
+            .where(PhotoJob.id == abandoned)
+            .values(locked_at=func.now() - timedelta(seconds=61))
+        )
+        await session.commit()
+
+    job = await worker.claim()
+    assert (job.id, job.attempts) == (abandoned, 2)
+    assert await worker.claim() is None
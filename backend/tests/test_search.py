@@ -0,0 +1,28 @@
+"""Tests for listing search query building."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.services.search import build_listing_search, normalize_query
+
+
+@pytest.mark.parametrize(
+    ("raw", "expected"),
+    [
+        (None, None),
+        ("", None),
+        ("   \t\n", None),
+        ("  горный   велосипед ", "горный велосипед"),
+        ("x" * 500, "x" * 200),
+    ],
+)
+def test_normalize_query(raw, expected):
+    assert normalize_query(raw) == expected
+
+
+def test_substring_pattern_escapes_like_wildcards():
+    search = build_listing_search("100%_off")
+
+    params = search.condition.compile(dialect=postgresql.dialect()).params
+
+    assert "%100\\%\\_off%" in params.values()
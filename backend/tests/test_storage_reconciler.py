@@ -0,0 +1,132 @@
+"""Tests for the reconciliation of storage objects against the database."""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.storage import StoredObject
+from app.services.storage_reconciler import reconcile_storage
+from tests.conftest import FakeDatabase, FakeStorage
+
+SHA_KEPT = "a" * 64
+SHA_GONE = "b" * 64
+OLD = datetime.now(timezone.utc) - timedelta(days=2)
+NEW = datetime.now(timezone.utc)
+
+
+def _database(photo_ids=(), digests=(), photo_urls=(), foreign_url=None):
+    """Answers the reconciler's queries from sets of existing rows."""
+    lookups = []  # Number of values per IN query
+
+    def existing(rows):
+        def answer(compiled):
+            [values] = [v for v in compiled.params.values() if isinstance(v, list)]
+            lookups.append(len(values))
+            return [v for v in values if v in rows]
+
+        return answer
+
+    def photo_lookup(compiled):
+        if not any(isinstance(v, list) for v in compiled.params.values()):
+            # The check of the public URL base
+            return [foreign_url] if foreign_url else []
+        if compiled.statement.selected_columns[0].name == "id":
+            return existing(set(photo_ids))(compiled)
+        return existing(set(photo_urls))(compiled)
+
+    db = FakeDatabase(
+        {
+            "SELECT listing_photos": photo_lookup,
+            "SELECT photo_blobs": existing(set(digests)),
+        }
+    )
+    return db, lookups
+
+
+def _objects(*keys, modified=OLD):
+    return [StoredObject(key, 10, modified) for key in keys]
+
+
+@pytest.mark.asyncio
+async def test_unreferenced_old_objects_are_deleted():
+    db, _ = _database(
+        photo_ids={1},
+        digests={SHA_KEPT},
+        photo_urls={"https://cdn.example/listings/kept.jpg"},
+    )
+    storage = FakeStorage(
+        listed=_objects(
+            "listings/kept.jpg",
+            "listings/gone.jpg",
+            f"photos/{SHA_KEPT}",
+            f"photos/{SHA_GONE}",
+            "renditions/1/160w.webp",
+            "renditions/2/160w.webp",
+            f"renditions/{SHA_KEPT}/160w.webp",
+            f"renditions/{SHA_GONE}/160w.webp",
+            "thumbnails/1.jpg",
+            f"thumbnails/{SHA_KEPT}.jpg",
+            "thumbnails/2.jpg",
+            "uploads/1/unfinished.jpg",
+            "other/not-ours.jpg",
+        )
+        + _objects("uploads/1/in-flight.jpg", modified=NEW)
+    )
+
+    stats = await reconcile_storage(
+        storage, grace_seconds=3600, session_factory=db.session
+    )
+
+    [deleted] = storage.deletes
+    assert sorted(deleted) == [
+        "https://cdn.example/listings/gone.jpg",
+        f"https://cdn.example/photos/{SHA_GONE}",
+        "https://cdn.example/renditions/2/160w.webp",
+        f"https://cdn.example/renditions/{SHA_GONE}/160w.webp",
+        "https://cdn.example/thumbnails/2.jpg",
+        "https://cdn.example/uploads/1/unfinished.jpg",
+    ]
+    assert (stats.listed, stats.recent, stats.orphaned, stats.deleted) == (13, 1, 6, 6)
+
+
+@pytest.mark.asyncio
+async def test_dry_run_deletes_nothing():
+    db, _ = _database()
+    storage = FakeStorage(listed=_objects("listings/a.jpg", "uploads/1/b.jpg"))
+
+    stats = await reconcile_storage(
+        storage, grace_seconds=3600, dry_run=True, session_factory=db.session
+    )
+
+    assert storage.deletes == []
+    assert (stats.orphaned, stats.deleted) == (2, 0)
+
+
+@pytest.mark.asyncio
+async def test_pages_and_deletions_are_bounded():
+    db, lookups = _database()
+    storage = FakeStorage(listed=_objects(*(f"uploads/1/{n}.jpg" for n in range(25))))
+
+    stats = await reconcile_storage(
+        storage,
+        grace_seconds=3600,
+        prefixes=["uploads/"],
+        page_size=4,
+        delete_batch_size=10,
+        session_factory=db.session,
+    )
+
+    assert max(lookups) == 4
+    assert [len(batch) for batch in storage.deletes] == [12, 12, 1]
+    assert stats.deleted == 25
+
+
+@pytest.mark.asyncio
+async def test_refuses_to_run_after_a_public_url_change():
+    db, _ = _database(foreign_url="https://old-cdn.example/listings/a.jpg")
+    storage = FakeStorage(listed=_objects("listings/a.jpg"))
+
+    with pytest.raises(RuntimeError, match="refusing to reconcile"):
+        await reconcile_storage(storage, grace_seconds=3600, session_factory=db.session)
+
+    assert storage.deletes == []
@@ -0,0 +1,239 @@
+"""S3 backend against a local S3 stand-in, checking the event loop stays free."""
+
+import asyncio
+import io
+import time
+
+import httpx
+import pytest
+import pytest_asyncio
+from fastapi import UploadFile
+from starlette.datastructures import Headers
+
+moto_server = pytest.importorskip("moto.server")
+boto3 = pytest.importorskip("boto3")
+
+from app.core.config import settings  # noqa: E402
+from app.services.storage.s3_backend import S3StorageService  # noqa: E402
+
+BUCKET = "test-photos"
+
+# Longest tolerated gap between ticks of a concurrently running task
+MAX_LOOP_STALL = 0.05
+
+
+@pytest.fixture(scope="module")
+def s3_endpoint():
+    server = moto_server.ThreadedMotoServer(ip_address="127.0.0.1", port=0)
+    server.start()
+    host, port = server.get_host_and_port()
+    yield f"http://{host}:{port}"
+    server.stop()
+
+
+@pytest_asyncio.fixture
+async def storage(monkeypatch, s3_endpoint):
+    monkeypatch.setattr(settings, "s3_endpoint_url", s3_endpoint)
+    monkeypatch.setattr(settings, "s3_access_key_id", "testing")
+    monkeypatch.setattr(settings, "s3_secret_access_key", "testing")
+    monkeypatch.setattr(settings, "s3_bucket_name", BUCKET)
+    monkeypatch.setattr(settings, "s3_region", "us-east-1")
+    monkeypatch.setattr(settings, "s3_public_url_base", None)
+    service = S3StorageService()
+    yield service
+    await service.aclose()
+
+
+@pytest.fixture
+def s3_client(s3_endpoint):
+    return boto3.client(
+        "s3",
+        endpoint_url=s3_endpoint,
+        aws_access_key_id="testing",
+        aws_secret_access_key="testing",
+        region_name="us-east-1",
+    )
+
+
+def _upload(name: str, size: int) -> UploadFile:
+    return UploadFile(
+        io.BytesIO(b"\xff" * size),
+        filename=name,
+        headers=Headers({"content-type": "image/jpeg"}),
+    )
+
+
+async def _max_loop_stall(coro) -> tuple[object, float]:
+    """Run ``coro`` next to a ticker and return its result and the longest tick gap."""
+    gaps = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.005)
+            now = time.perf_counter()
+            gaps.append(now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    try:
+        result = await coro
+    finally:
+        done.set()
+        await task
+    return result, max(gaps, default=0.0)
+
+
+@pytest.mark.asyncio
+async def test_upload_and_delete_roundtrip(storage, s3_client):
+    url = await storage.upload_file(_upload("photo.jpg", 1024))
+
+    key = storage.key_from_url(url)
+    assert key.startswith("listings/") and key.endswith(".jpg")
+    obj = s3_client.get_object(Bucket=BUCKET, Key=key)
+    assert obj["ContentType"] == "image/jpeg"
+    assert obj["Body"].read() == b"\xff" * 1024
+
+    assert await storage.delete_file(url) is True
+    with pytest.raises(s3_client.exceptions.NoSuchKey):
+        s3_client.get_object(Bucket=BUCKET, Key=key)
+
+
+@pytest.mark.asyncio
+async def test_uploads_do_not_block_event_loop(storage, s3_client):
+    await storage._ensure_bucket_exists()
+
+    uploads = asyncio.gather(
+        *(storage.upload_file(_upload(f"p{i}.jpg", 2 * 1024 * 1024)) for i in range(5))
+    )
+    urls, stall = await _max_loop_stall(uploads)
+
+    assert len(urls) == 5
+    assert stall < MAX_LOOP_STALL
+    _, stall = await _max_loop_stall(
+        asyncio.gather(*(storage.delete_file(url) for url in urls))
+    )
+    assert stall < MAX_LOOP_STALL
+
+
+@pytest.mark.asyncio
+async def test_large_files_use_multipart_upload(storage, s3_client):
+    size = storage.multipart_threshold + 1024
+    data = memoryview(bytes(range(256)) * (size // 256 + 1))[:size]
+
+    url = await storage.upload_bytes(data, "big.jpg", "image/jpeg")
+
+    obj = s3_client.head_object(Bucket=BUCKET, Key=storage.key_from_url(url))
+    assert obj["ContentLength"] == size
+    # Multipart ETags end with the part count
+    assert obj["ETag"].strip('"').endswith("-2")
+    assert s3_client.list_multipart_uploads(Bucket=BUCKET).get("Uploads", []) == []
+    await storage.delete_file(url)
+
+
+@pytest.mark.asyncio
+async def test_delete_of_foreign_url_is_refused(storage):
+    assert await storage.delete_file("https://elsewhere.example/photo.jpg") is False
+
+
+@pytest.mark.asyncio
+async def test_presigned_post_uploads_straight_to_bucket(storage, s3_client):
+    target = await storage.presign_upload("uploads/1/a.jpg", "image/jpeg", 1024, 600)
+
+    assert target.method == "POST" and target.url == storage._bucket_url()
+    assert target.fields["key"] == "uploads/1/a.jpg"
+    assert {"policy", "x-amz-signature", "x-amz-credential"} <= set(target.fields)
+    assert await storage.head_object("uploads/1/a.jpg") is None
+
+    async with httpx.AsyncClient() as client:
+        response = await client.post(
+            target.url,
+            data=target.fields,
+            files={"file": ("a.jpg", b"\xff" * 512, "image/jpeg")},
+        )
+    assert response.status_code == 204
+
+    info = await storage.head_object("uploads/1/a.jpg")
+    assert info == (512, "image/jpeg")
+    assert s3_client.get_object(Bucket=BUCKET, Key="uploads/1/a.jpg")["Body"].read() == (
+        b"\xff" * 512
+    )
+    await storage.delete_file(storage.public_url("uploads/1/a.jpg"))
+
+
+@pytest.mark.asyncio
+async def test_batch_delete_splits_requests_and_reports_failures(storage, s3_client, monkeypatch):
+    await storage._ensure_bucket_exists()
+    for n in range(3):
+        s3_client.put_object(Bucket=BUCKET, Key=f"batch/{n}.jpg", Body=b"x")
+    # Missing keys count as deleted; 1003 keys need two requests
+    urls = [storage.public_url(f"batch/{n}.jpg") for n in range(1003)]
+    foreign = "https://elsewhere.example/photo.jpg"
+    requests = []
+    delete_objects = storage._delete_objects
+
+    async def counting(keys):
+        requests.append(len(keys))
+        return await delete_objects(keys)
+
+    monkeypatch.setattr(storage, "_delete_objects", counting)
+
+    result = await storage.delete_files([*urls, foreign])
+
+    assert sorted(requests) == [3, 1000]
+    assert sorted(result.succeeded) == sorted(urls)
+    assert list(result.failed) == [foreign]
+    assert s3_client.list_objects_v2(Bucket=BUCKET, Prefix="batch/")["KeyCount"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_delete_batch_is_reported_not_raised(storage, monkeypatch):
+    async def unavailable(keys):
+        raise httpx.ConnectError("connection refused")
+
+    monkeypatch.setattr(storage, "_delete_objects", unavailable)
+    url = storage.public_url("a.jpg")
+
+    result = await storage.delete_files([url])
+
+    assert result.succeeded == []
+    assert result.failed == {url: "connection refused"}
+
+
+@pytest.mark.asyncio
+async def test_exists_many_and_copy(storage, s3_client):
+    await storage.upload_object("copy/src.jpg", b"\xff" * 100, "image/jpeg")
+
+    url = await storage.copy("copy/src.jpg", "copy/dst.jpg")
+
+    assert url == storage.public_url("copy/dst.jpg")
+    obj = s3_client.get_object(Bucket=BUCKET, Key="copy/dst.jpg")
+    assert obj["Body"].read() == b"\xff" * 100
+    assert obj["ContentType"] == "image/jpeg"
+    assert await storage.exists_many(
+        ["copy/src.jpg", "copy/dst.jpg", "copy/missing.jpg", "copy/src.jpg"]
+    ) == {"copy/src.jpg", "copy/dst.jpg"}
+    result = await storage.delete_files(
+        [storage.public_url("copy/src.jpg"), storage.public_url("copy/dst.jpg")]
+    )
+    assert result.failed == {}
+    assert await storage.exists_many(["copy/src.jpg", "copy/dst.jpg"]) == set()
+
+
+@pytest.mark.asyncio
+async def test_listing_pages_through_continuation_tokens(storage, s3_client):
+    await storage._ensure_bucket_exists()
+    keys = [f"listing/{n}/photo {n}+1.jpg" for n in range(7)]
+    for key in keys:
+        s3_client.put_object(Bucket=BUCKET, Key=key, Body=b"xyz")
+    s3_client.put_object(Bucket=BUCKET, Key="elsewhere.jpg", Body=b"x")
+
+    pages = [page async for page in storage.list_objects("listing/", page_size=3)]
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    listed = [obj for page in pages for obj in page]
+    assert sorted(obj.key for obj in listed) == sorted(keys)
+    assert all(obj.size == 3 and obj.last_modified.tzinfo for obj in listed)
+    await storage.delete_files([storage.public_url(key) for key in keys])
+    assert [page async for page in storage.list_objects("listing/")] == []
@@ -0,0 +1,119 @@
+"""Tests for Telegram init data verification and caching."""
+
+import hmac
+import json
+import time
+from hashlib import sha256
+from types import SimpleNamespace
+from urllib.parse import urlencode
+
+import pytest
+
+from app.core.config import settings
+from app.dependencies import auth
+from app.services import cache, telegram
+from app.services.telegram import InitDataCache, verify_telegram_auth
+
+TOKEN = "123456:test-token"
+
+
+def _init_data(user_id=42, auth_date=None, **profile):
+    fields = {
+        "auth_date": str(int(auth_date if auth_date is not None else time.time())),
+        "query_id": "AAE",
+        "user": json.dumps({"id": user_id, "first_name": "A", **profile}),
+    }
+    data_check_string = "\n".join(f"{k}={fields[k]}" for k in sorted(fields))
+    secret_key = sha256(TOKEN.encode()).digest()
+    fields["hash"] = hmac.new(secret_key, data_check_string.encode(), sha256).hexdigest()
+    return urlencode(fields)
+
+
+@pytest.fixture(autouse=True)
+def bot_token(monkeypatch):
+    monkeypatch.setattr(settings, "telegram_bot_token", TOKEN)
+    monkeypatch.setattr(cache, "_identity_cache", None)
+    telegram.init_data_cache.clear()
+    yield
+    telegram.init_data_cache.clear()
+
+
+def test_secret_key_is_computed_once_per_token():
+    telegram._secret_key.cache_clear()
+
+    for user_id in range(3):
+        assert verify_telegram_auth(_init_data(user_id))["id"] == user_id
+
+    info = telegram._secret_key.cache_info()
+    assert (info.misses, info.hits) == (1, 2)
+
+
+class _UserSession:
+    """Session stand-in that finds an existing user for every lookup."""
+
+    async def execute(self, stmt, **kwargs):
+        user = SimpleNamespace(
+            id=1,
+            telegram_id=42,
+            username=None,
+            first_name="A",
+            last_name=None,
+            photo_url=None,
+            role="verified",
+        )
+        return SimpleNamespace(scalar_one=lambda: user)
+
+    async def commit(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_repeat_requests_skip_verification(monkeypatch):
+    calls = []
+    monkeypatch.setattr(
+        auth, "verify_telegram_auth", lambda data: calls.append(data) or verify_telegram_auth(data)
+    )
+    init_data = _init_data()
+
+    for _ in range(3):
+        user = await auth.get_current_user(authorization=init_data, db=_UserSession())
+        assert user.telegram_id == 42
+
+    assert len(calls) == 1
+
+
+def test_cache_honours_auth_date_expiry(monkeypatch):
+    cache = InitDataCache(max_entries=10, max_age=60)
+    fresh = _init_data(auth_date=time.time())
+    stale = _init_data(auth_date=time.time() - 61)
+
+    cache.put(fresh, {"id": 1})
+    cache.put(stale, {"id": 2})
+
+    assert cache.get(fresh) == {"id": 1}
+    assert cache.get(stale) is None
+    later = time.time() + 61
+    monkeypatch.setattr(telegram.time, "time", lambda: later)
+    assert cache.get(fresh) is None
+
+
+def test_cache_is_bounded_lru():
+    cache = InitDataCache(max_entries=2, max_age=60)
+    first, second, third = (_init_data(user_id) for user_id in (1, 2, 3))
+
+    cache.put(first, {"id": 1})
+    cache.put(second, {"id": 2})
+    cache.get(first)
+    cache.put(third, {"id": 3})
+
+    assert cache.get(second) is None
+    assert cache.get(first) == {"id": 1}
+    assert cache.get(third) == {"id": 3}
+
+
+def test_init_data_without_auth_date_is_not_cached():
+    cache = InitDataCache(max_entries=2, max_age=60)
+
+    cache.put("user=%7B%22id%22%3A1%7D", {"id": 1})
+
+    assert cache.get("user=%7B%22id%22%3A1%7D") is None
@@ -0,0 +1,72 @@
+"""Tests for the batched backfill of legacy thumbnails."""
+
+import base64
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.thumbnails import backfill_bytea_batch, backfill_object_batch
+from tests.conftest import FakeDatabase, FakeStorage
+
+JPEG = b"\xff\xd8\xff\xe0fake-jpeg"
+
+
+def _row(photo_id, thumbnail_bytes=None, thumbnail_data=None):
+    return SimpleNamespace(
+        id=photo_id, thumbnail_bytes=thumbnail_bytes, thumbnail_data=thumbnail_data
+    )
+
+
+@pytest.mark.asyncio
+async def test_bytea_batch_decodes_in_database_without_waiting_on_locks():
+    db = FakeDatabase({"UPDATE listing_photos": [[12, 14, 13]]})
+
+    assert await backfill_bytea_batch(db, after_id=11, batch_size=3) == 14
+
+    [stmt] = db.statements
+    assert "decode(listing_photos.thumbnail_data" in stmt.string
+    assert "FOR UPDATE SKIP LOCKED" in stmt.string
+    # Continues after the previous batch instead of rescanning the table
+    assert "listing_photos.id > %(id_1)s" in stmt.string
+    assert stmt.params["id_1"] == 11
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_bytea_backfill_reports_completion():
+    assert await backfill_bytea_batch(FakeDatabase(), after_id=14) is None
+
+
+@pytest.mark.asyncio
+async def test_object_batch_uploads_then_clears_inline_columns():
+    rows = [
+        _row(4, thumbnail_bytes=JPEG),
+        _row(5, thumbnail_data=base64.b64encode(JPEG).decode()),
+        _row(6, thumbnail_data="not base64!"),
+    ]
+    db = FakeDatabase({"SELECT listing_photos": [rows]})
+    storage = FakeStorage()
+
+    assert await backfill_object_batch(db, storage, after_id=3, batch_size=3) == 6
+
+    assert storage.objects == {
+        "thumbnails/4.jpg": (JPEG, "image/jpeg"),
+        "thumbnails/5.jpg": (JPEG, "image/jpeg"),
+    }
+    assert "FOR UPDATE SKIP LOCKED" in db.statements[0].string
+    assert db.statements[0].params["id_1"] == 3
+    # The corrupt row is skipped, not cleared
+    assert [u["thumbnail_object_url"] for u in db.updates_of("listing_photos")] == [
+        "https://cdn.example/thumbnails/4.jpg",
+        "https://cdn.example/thumbnails/5.jpg",
+    ]
+    assert all(u["thumbnail_bytes"] is None for u in db.updates_of("listing_photos"))
+    assert db.commits == 1
+
+
+@pytest.mark.asyncio
+async def test_object_batch_reports_completion():
+    db = FakeDatabase()
+
+    assert await backfill_object_batch(db, FakeStorage()) is None
+    assert db.commits == 0
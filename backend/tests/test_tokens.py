@@ -0,0 +1,137 @@
+"""Tests for session token exchange and bearer authentication."""
+
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from httpx import ASGITransport, AsyncClient
+
+from app.core.config import settings
+from app.core.security import create_access_token, create_refresh_token
+from app.db.session import get_db
+from app.dependencies.auth import get_current_user, verify_init_data
+from app.main import app
+from app.services import telegram
+from tests.test_telegram_auth import TOKEN, _init_data
+
+USER = SimpleNamespace(
+    id=7,
+    telegram_id=42,
+    username="seller",
+    first_name="A",
+    last_name=None,
+    role="verified",
+    token_version=3,
+)
+
+
+class _UserSession:
+    """Session stand-in that finds ``USER`` for every lookup."""
+
+    async def execute(self, stmt, **kwargs):
+        return SimpleNamespace(scalar_one=lambda: USER)
+
+    async def commit(self):
+        pass
+
+    async def get(self, model, ident):
+        return USER if ident == USER.id else None
+
+
+@pytest.fixture(autouse=True)
+def token_settings(monkeypatch):
+    monkeypatch.setattr(settings, "telegram_bot_token", TOKEN)
+    monkeypatch.setattr(settings, "secret_key", "test-secret-key-of-at-least-32-bytes")
+
+    async def override():
+        yield _UserSession()
+
+    app.dependency_overrides[get_db] = override
+    yield
+    app.dependency_overrides.pop(get_db, None)
+
+
+async def _post(path, json):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(f"/api/v1/telegram{path}", json=json)
+
+
+@pytest.mark.asyncio
+async def test_exchanged_token_authenticates_without_database():
+    response = await _post("/token", {"init_data": _init_data()})
+
+    assert response.status_code == 200
+    tokens = response.json()
+    assert tokens["token_type"] == "bearer"
+    user = await get_current_user(authorization=f"Bearer {tokens['access_token']}", db=None)
+    assert (user.id, user.telegram_id, user.role) == (7, 42, "verified")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "init_data",
+    [
+        # Unsigned: accepted leniently by init data header auth
+        'auth_date=1&user={"id": 42, "first_name": "A"}',
+        # Signed for user 42, then changed to a moderator's id
+        _init_data().replace("%22id%22%3A+42", "%22id%22%3A+1"),
+        _init_data().replace("hash=", "hash=0"),
+    ],
+)
+async def test_token_exchange_requires_signed_init_data(init_data):
+    telegram.init_data_cache.clear()
+    verify_init_data(init_data)  # Header auth falls back, but must not cache it
+
+    response = await _post("/token", {"init_data": init_data})
+
+    assert response.status_code == 401
+    assert telegram.init_data_cache.get(init_data) is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "make_token",
+    [
+        lambda: "garbage",
+        lambda: create_refresh_token(7, 3),  # Refresh tokens are not access tokens
+        lambda: create_access_token(
+            7, timedelta(seconds=-1), {"tid": 42, "role": "verified", "first_name": "A"}
+        ),
+    ],
+)
+async def test_invalid_bearer_tokens_are_rejected(make_token):
+    token = make_token()
+
+    with pytest.raises(HTTPException) as exc_info:
+        await get_current_user(authorization=f"Bearer {token}", db=None)
+
+    assert exc_info.value.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_issues_new_pair_for_current_version():
+    response = await _post("/token/refresh", {"refresh_token": create_refresh_token(7, 3)})
+
+    assert response.status_code == 200
+    assert response.json()["refresh_token"]
+
+
+@pytest.mark.asyncio
+async def test_refresh_token_is_revoked_by_role_change():
+    # A role change bumped token_version from 2 to 3
+    response = await _post("/token/refresh", {"refresh_token": create_refresh_token(7, 2)})
+
+    assert response.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_tokens_are_disabled_without_secret_key(monkeypatch):
+    token = create_access_token(7, extra_claims={"tid": 42, "role": "admin", "first_name": "A"})
+    monkeypatch.setattr(settings, "secret_key", "")
+
+    response = await _post("/token", {"init_data": _init_data()})
+
+    assert response.status_code == 503
+    with pytest.raises(HTTPException):
+        await get_current_user(authorization=f"Bearer {token}", db=None)
@@ -0,0 +1,76 @@
+"""Tests for bounded, single-buffer upload reading."""
+
+import hashlib
+import io
+
+import pytest
+from fastapi import UploadFile
+from PIL import Image
+
+from app.services.image_processing import ImageProcessingService
+from app.services.storage.streaming import UPLOAD_CHUNK_SIZE, read_upload
+
+
+class _CountingFile(io.BytesIO):
+    def __init__(self, data):
+        super().__init__(data)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("known_size", [True, False])
+async def test_read_upload_returns_a_view_of_the_contents(known_size):
+    data = bytes(range(256)) * 1000
+    upload = UploadFile(io.BytesIO(data), size=len(data) if known_size else None)
+
+    contents = await read_upload(upload, max_size=len(data))
+
+    assert isinstance(contents, memoryview) and contents.readonly
+    assert bytes(contents) == data
+
+
+@pytest.mark.asyncio
+async def test_read_upload_hashes_while_reading():
+    data = bytes(range(256)) * 1000
+    digest = hashlib.sha256()
+
+    await read_upload(UploadFile(io.BytesIO(data)), max_size=len(data), digest=digest)
+
+    assert digest.hexdigest() == hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_read_upload_stops_reading_at_the_limit():
+    file = _CountingFile(b"\xff" * (50 * UPLOAD_CHUNK_SIZE))
+    upload = UploadFile(file, size=None)
+
+    with pytest.raises(ValueError, match="File too large"):
+        await read_upload(upload, max_size=2 * UPLOAD_CHUNK_SIZE)
+
+    assert file.bytes_read <= 3 * UPLOAD_CHUNK_SIZE
+
+
+@pytest.mark.asyncio
+async def test_read_upload_rejects_known_oversize_without_reading():
+    file = _CountingFile(b"\xff" * 100)
+    upload = UploadFile(file, size=100)
+
+    with pytest.raises(ValueError, match="File too large"):
+        await read_upload(upload, max_size=99)
+
+    assert file.bytes_read == 0
+
+
+def test_thumbnail_from_memoryview_matches_bytes():
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), (200, 40, 40)).save(buffer, format="PNG")
+    data = buffer.getvalue()
+
+    from_view = ImageProcessingService.generate_thumbnail(memoryview(data))
+
+    assert from_view == ImageProcessingService.generate_thumbnail(data)
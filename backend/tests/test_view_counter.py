@@ -0,0 +1,83 @@
+"""Tests for buffered listing view counting."""
+
+import pytest
+
+from app.services.view_counter import FLUSH_BATCH_SIZE, ViewCounter
+
+
+class _RecordingSession:
+    def __init__(self, log, fail=False):
+        self.log = log
+        self.fail = fail
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, stmt, params):
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        self.log.append((str(stmt), params))
+
+    async def commit(self):
+        pass
+
+
+def _counter(log, fail=False):
+    return ViewCounter(session_factory=lambda: _RecordingSession(log, fail))
+
+
+@pytest.mark.asyncio
+async def test_views_are_coalesced_into_one_statement():
+    log = []
+    counter = _counter(log)
+    for listing_id in (3, 1, 3, 3, 2, 1):
+        counter.record(listing_id)
+
+    assert await counter.flush() == 6
+
+    assert len(log) == 1
+    sql, params = log[0]
+    assert "FROM (VALUES" in sql
+    assert "updated_at" not in sql
+    assert params == {"id_0": 1, "views_0": 2, "id_1": 2, "views_1": 1, "id_2": 3, "views_2": 3}
+    assert counter.pending == 0
+    assert await counter.flush() == 0
+    assert len(log) == 1
+
+
+@pytest.mark.asyncio
+async def test_large_flush_is_split_into_batches():
+    log = []
+    counter = _counter(log)
+    for listing_id in range(FLUSH_BATCH_SIZE + 5):
+        counter.record(listing_id)
+
+    await counter.flush()
+
+    assert [len(params) // 2 for _, params in log] == [FLUSH_BATCH_SIZE, 5]
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_views_for_retry():
+    counter = _counter([], fail=True)
+    counter.record(1)
+    counter.record(1)
+
+    assert await counter.flush() == 0
+    assert counter.pending == 2
+
+
+@pytest.mark.asyncio
+async def test_stop_drains_buffered_views():
+    log = []
+    counter = _counter(log)
+    counter.start()
+    counter.record(7)
+
+    await counter.stop()
+
+    assert log and log[0][1] == {"id_0": 7, "views_0": 1}
+    assert counter.pending == 0
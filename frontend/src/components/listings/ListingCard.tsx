@@ -1,5 +1,6 @@
 import { Avatar, Button, Card, Flex, Stack, Text } from "@chakra-ui/react";
 
+import { buildSrcSet } from "components/photos/ResponsivePhoto";
 import type { ListingViewModel } from "@/types/listing";
 
 type Props = {
@@ -8,11 +9,10 @@ type Props = {
 };
 
 export const ListingCard = ({ listing, onViewDetails }: Props) => {
-  // Get the first photo - prefer thumbnail for performance
-  const firstPhoto = listing.photos[0];
-  const photoSrc = firstPhoto?.thumbnailData
-    ? `data:image/jpeg;base64,${firstPhoto.thumbnailData}`
-    : firstPhoto?.photoUrl || listing.photoUrl;
+  // Prefer the cover thumbnail for performance
+  const photoSrc = listing.thumbnailUrl || listing.photoUrl;
+  // The smallest WebP rendition is lighter still once it exists
+  const photoSrcSet = buildSrcSet(listing.renditions, "webp");
 
   return (
     <Card.Root variant="outline" shadow="sm">
@@ -22,6 +22,8 @@ export const ListingCard = ({ listing, onViewDetails }: Props) => {
             {photoSrc && (
               <Avatar.Image
                 src={photoSrc}
+                srcSet={photoSrcSet}
+                sizes={photoSrcSet ? "48px" : undefined}
                 alt={`${listing.title} photo`}
               />
             )}
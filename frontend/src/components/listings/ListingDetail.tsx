@@ -12,10 +12,10 @@ import {
   DrawerRoot,
   Flex,
   Heading,
-  Image,
   Stack,
   Text,
 } from "@chakra-ui/react";
+import { ResponsivePhoto } from "components/photos/ResponsivePhoto";
 import type { ListingViewModel } from "@/types/listing";
 
 interface ListingDetailProps {
@@ -36,6 +36,10 @@ export const ListingDetail = ({
   const sellerName = [seller.first_name, seller.last_name]
     .filter(Boolean)
     .join(" ");
+  const mainPhotoUrl = listing.photos[0]?.photoUrl || listing.photoUrl;
+  const mainRenditions = listing.photos[0]
+    ? listing.photos[0].renditions
+    : listing.renditions;
   const telegramLink = seller.username
     ? `https://t.me/${seller.username}`
     : `tg://user?id=${seller.telegram_id}`;
@@ -57,11 +61,13 @@ export const ListingDetail = ({
 
           <DrawerBody>
             <Stack gap={6}>
-              {/* Main Image - Use full resolution photoUrl, not thumbnail */}
-              {(listing.photos[0]?.photoUrl || listing.photoUrl) && (
+              {/* Main Image - the rendition matching the drawer width, original until rendered */}
+              {mainPhotoUrl && (
                 <Box borderRadius="md" overflow="hidden">
-                  <Image
-                    src={listing.photos[0]?.photoUrl || listing.photoUrl}
+                  <ResponsivePhoto
+                    renditions={mainRenditions}
+                    fallbackSrc={mainPhotoUrl}
+                    sizes="(min-width: 448px) 448px, 100vw"
                     alt={listing.title}
                     width="100%"
                     height="300px"
@@ -0,0 +1,36 @@
+import { Image, type ImageProps } from "@chakra-ui/react";
+
+import type { PhotoRendition } from "@/types/listing";
+
+// "url 160w, url 480w, ..." for the renditions of one format
+export const buildSrcSet = (
+  renditions: PhotoRendition[] | null | undefined,
+  format: PhotoRendition["format"],
+): string | undefined => {
+  const matching = (renditions ?? []).filter((r) => r.format === format);
+  if (matching.length === 0) return undefined;
+  return matching.map((r) => `${r.url} ${r.width}w`).join(", ");
+};
+
+type Props = Omit<ImageProps, "src" | "srcSet" | "sizes"> & {
+  renditions: PhotoRendition[] | null | undefined;
+  fallbackSrc: string;
+  // Rendered width of the image, e.g. "100vw" or "(min-width: 768px) 480px, 100vw"
+  sizes: string;
+};
+
+/**
+ * Lets the browser pick the smallest rendition that fills the viewport
+ * slot, preferring WebP. Falls back to the original until renditions exist.
+ */
+export const ResponsivePhoto = ({ renditions, fallbackSrc, sizes, ...rest }: Props) => {
+  const webp = buildSrcSet(renditions, "webp");
+  const jpeg = buildSrcSet(renditions, "jpeg");
+
+  return (
+    <picture>
+      {webp && <source type="image/webp" srcSet={webp} sizes={sizes} />}
+      <Image src={fallbackSrc} srcSet={jpeg} sizes={jpeg ? sizes : undefined} {...rest} />
+    </picture>
+  );
+};
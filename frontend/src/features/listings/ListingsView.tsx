@@ -1,4 +1,4 @@
-import { Stack, Text, Flex } from "@chakra-ui/react";
+import { Button, Stack, Text, Flex } from "@chakra-ui/react";
 import { ListingCard } from "components/listings/ListingCard";
 import { ListingDetail } from "components/listings/ListingDetail";
 import { useListings } from "hooks/useListings";
@@ -11,7 +11,15 @@ type Props = {
 };
 
 export const ListingsView = ({ searchQuery }: Props) => {
-  const { data: listings, isLoading, error } = useListings(searchQuery);
+  const {
+    data,
+    isLoading,
+    error,
+    fetchNextPage,
+    hasNextPage,
+    isFetchingNextPage,
+  } = useListings(searchQuery);
+  const listings = data?.pages.flatMap((page) => page.items);
   const [selectedListing, setSelectedListing] =
     useState<ListingViewModel | null>(null);
 
@@ -57,6 +65,15 @@ export const ListingsView = ({ searchQuery }: Props) => {
               onViewDetails={setSelectedListing}
             />
           ))}
+          {hasNextPage && (
+            <Button
+              variant="outline"
+              onClick={() => fetchNextPage()}
+              loading={isFetchingNextPage}
+            >
+              Load more
+            </Button>
+          )}
         </Stack>
       )}
 
@@ -1,42 +1,44 @@
-import { useQuery } from "@tanstack/react-query";
+import { useInfiniteQuery } from "@tanstack/react-query";
 
+import { env } from "@/config/env";
 import { apiClient } from "@/services/apiClient";
-import type { Listing, ListingViewModel, PhotoResponse, UserPublic } from "@/types/listing";
+import type {
+  Listing,
+  ListingViewModel,
+  PhotoRendition,
+  UserPublic,
+} from "@/types/listing";
 
-type PhotoApiResponse = {
-  id: number;
-  photo_url: string;
-  display_order: number;
-  thumbnail_data: string | null;
-  file_size_bytes: number | null;
-  original_filename: string | null;
-  created_at: string;
-};
-
-type ListingApiResponse = {
+type ListingCardApiResponse = {
   id: number;
   title: string;
   description: string;
   price_minor_units: number;
   currency: string;
   seller_id: number;
+  category: string | null;
+  condition: string | null;
   created_at: string;
   updated_at: string;
-  photos: PhotoApiResponse[];
   seller: UserPublic;
+  photo_count: number;
+  cover_photo_url: string | null;
+  cover_thumbnail_url: string | null;
+  cover_renditions: PhotoRendition[] | null;
 };
 
-const transformPhoto = (photo: PhotoApiResponse): PhotoResponse => ({
-  id: photo.id,
-  photoUrl: photo.photo_url,
-  displayOrder: photo.display_order,
-  thumbnailData: photo.thumbnail_data,
-  fileSizeBytes: photo.file_size_bytes,
-  originalFilename: photo.original_filename,
-  createdAt: photo.created_at,
-});
+type ListingPageApiResponse = {
+  items: ListingCardApiResponse[];
+  next_cursor: string | null;
+};
+
+type ListingPage = {
+  items: ListingViewModel[];
+  nextCursor: string | null;
+};
 
-const transformListing = (listing: ListingApiResponse): Listing => ({
+// Cards only reference their cover photo; full photo lists are not part of the feed
+const transformListing = (listing: ListingCardApiResponse): Listing => ({
   id: listing.id,
   title: listing.title,
   description: listing.description,
@@ -45,8 +47,12 @@ const transformListing = (listing: ListingApiResponse): Listing => ({
   sellerId: listing.seller_id,
   createdAt: listing.created_at,
   updatedAt: listing.updated_at,
-  photos: listing.photos.map(transformPhoto),
-  photoUrl: listing.photos[0]?.photo_url ?? null,
+  photos: [],
+  photoUrl: listing.cover_photo_url,
+  thumbnailUrl: listing.cover_thumbnail_url
+    ? env.apiBaseUrl + listing.cover_thumbnail_url
+    : null,
+  renditions: listing.cover_renditions,
   seller: listing.seller,
 });
 
@@ -56,16 +62,22 @@ const formatPrice = (listing: Listing): ListingViewModel => ({
 });
 
 export const useListings = (search?: string) => {
-  return useQuery<ListingViewModel[]>({
+  return useInfiniteQuery({
     queryKey: ["listings", search],
-    queryFn: async () => {
-      const params = search ? { search } : {};
-      const { data } = await apiClient.get<ListingApiResponse[]>("/listings", {
+    queryFn: async ({ pageParam }): Promise<ListingPage> => {
+      const params = {
+        ...(search ? { search } : {}),
+        ...(pageParam ? { cursor: pageParam } : {}),
+      };
+      const { data } = await apiClient.get<ListingPageApiResponse>("/listings/cards", {
         params,
       });
-      console.log("Fetched listings:", data);
-      return data.map((listing) => formatPrice(transformListing(listing)));
+      return {
+        items: data.items.map((listing) => formatPrice(transformListing(listing))),
+        nextCursor: data.next_cursor,
+      };
     },
-    placeholderData: [] satisfies ListingViewModel[],
+    initialPageParam: null as string | null,
+    getNextPageParam: (lastPage) => lastPage.nextCursor,
   });
 };
@@ -1,6 +1,29 @@
 import { useMutation, useQueryClient } from "@tanstack/react-query";
 import { apiClient } from "services/apiClient";
-import type { PhotoUploadResponse } from "@/types/listing";
+import type { DirectUploadTarget, PhotoUploadResponse } from "@/types/listing";
+
+// Sends a file straight to object storage; the API never sees its bytes
+const uploadToStorage = async (target: DirectUploadTarget, photo: File) => {
+  let response: Response;
+  if (target.method === "POST") {
+    const form = new FormData();
+    Object.entries(target.fields).forEach(([name, value]) => {
+      form.append(name, value);
+    });
+    // The file must be the last field of a POST policy upload
+    form.append("file", photo);
+    response = await fetch(target.url, { method: "POST", body: form });
+  } else {
+    response = await fetch(target.url, {
+      method: "PUT",
+      headers: target.headers,
+      body: photo,
+    });
+  }
+  if (!response.ok) {
+    throw new Error(`Failed to upload ${photo.name} (${response.status})`);
+  }
+};
 
 export const useUploadPhotos = () => {
   const queryClient = useQueryClient();
@@ -13,18 +36,28 @@ export const useUploadPhotos = () => {
       listingId: number;
       photos: File[];
     }): Promise<PhotoUploadResponse[]> => {
-      const formData = new FormData();
-      photos.forEach((photo) => {
-        formData.append("photos", photo);
-      });
+      const { data: targets } = await apiClient.post<DirectUploadTarget[]>(
+        `/listings/${listingId}/photos/presign`,
+        {
+          files: photos.map((photo) => ({
+            filename: photo.name,
+            content_type: photo.type,
+            size: photo.size,
+          })),
+        },
+      );
+
+      await Promise.all(
+        targets.map((target, idx) => uploadToStorage(target, photos[idx])),
+      );
 
       const response = await apiClient.post<PhotoUploadResponse[]>(
-        `/listings/${listingId}/photos`,
-        formData,
+        `/listings/${listingId}/photos/finalize`,
         {
-          headers: {
-            "Content-Type": "multipart/form-data",
-          },
+          photos: targets.map((target, idx) => ({
+            key: target.key,
+            filename: photos[idx].name,
+          })),
         },
       );
 
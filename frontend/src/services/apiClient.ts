@@ -1,19 +1,19 @@
 import axios from "axios";
 
 import { env } from "@/config/env";
-import { getInitData } from "./telegram";
+import { clearSession, getAuthorization } from "./session";
 
 export const apiClient = axios.create({
   baseURL: env.apiBaseUrl + "/api/v1",
   timeout: 10_000,
 });
 
-// Add Authorization header with Telegram initData to all requests
+// Add Authorization header with a session token (or raw initData) to all requests
 apiClient.interceptors.request.use(
-  (config) => {
-    const initData = getInitData();
-    if (initData) {
-      config.headers.Authorization = initData;
+  async (config) => {
+    const authorization = await getAuthorization();
+    if (authorization) {
+      config.headers.Authorization = authorization;
     }
     return config;
   },
@@ -24,6 +24,9 @@ apiClient.interceptors.response.use(
   (response) => response,
   (error) => {
     if (error.response) {
+      if (error.response.status === 401) {
+        clearSession();
+      }
       return Promise.reject({
         status: error.response.status,
         message: error.response.data?.detail ?? "Unknown error",
@@ -0,0 +1,82 @@
+import axios from "axios";
+
+import { env } from "@/config/env";
+import { getInitData } from "./telegram";
+
+type TokenResponse = {
+  access_token: string;
+  refresh_token: string;
+  token_type: string;
+  expires_in: number;
+};
+
+type Session = {
+  accessToken: string;
+  refreshToken: string;
+  expiresAt: number;
+};
+
+// Refresh slightly before expiry so in-flight requests don't race it
+const EXPIRY_MARGIN_MS = 30_000;
+
+const authClient = axios.create({
+  baseURL: env.apiBaseUrl + "/api/v1/telegram",
+  timeout: 10_000,
+});
+
+let session: Session | null = null;
+let pending: Promise<Session | null> | null = null;
+
+const toSession = (data: TokenResponse): Session => ({
+  accessToken: data.access_token,
+  refreshToken: data.refresh_token,
+  expiresAt: Date.now() + data.expires_in * 1000 - EXPIRY_MARGIN_MS,
+});
+
+const obtainSession = async (): Promise<Session | null> => {
+  if (session) {
+    try {
+      const { data } = await authClient.post<TokenResponse>("/token/refresh", {
+        refresh_token: session.refreshToken,
+      });
+      return toSession(data);
+    } catch {
+      // Revoked or expired: fall through to a fresh exchange
+    }
+  }
+
+  const initData = getInitData();
+  if (!initData) {
+    return null;
+  }
+  try {
+    const { data } = await authClient.post<TokenResponse>("/token", {
+      init_data: initData,
+    });
+    return toSession(data);
+  } catch {
+    // Tokens disabled on the server: keep sending raw initData
+    return null;
+  }
+};
+
+/**
+ * Authorization header value for API requests.
+ *
+ * Exchanges Telegram initData for a session token once and refreshes it
+ * when it expires, falling back to raw initData if tokens are unavailable.
+ */
+export const getAuthorization = async (): Promise<string> => {
+  if (!session || session.expiresAt <= Date.now()) {
+    pending ??= obtainSession().finally(() => {
+      pending = null;
+    });
+    session = await pending;
+  }
+  return session ? `Bearer ${session.accessToken}` : getInitData();
+};
+
+/** Forget the current tokens, e.g. after the server rejected them. */
+export const clearSession = () => {
+  session = null;
+};
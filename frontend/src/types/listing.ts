@@ -7,19 +7,45 @@ export type UserPublic = {
   photo_url: string | null
 }
 
+export type PhotoRendition = {
+  url: string
+  width: number
+  height: number
+  format: "webp" | "jpeg"
+}
+
 export type PhotoResponse = {
   id: number
   photoUrl: string
   displayOrder: number
-  thumbnailData: string | null  // Base64-encoded thumbnail
+  thumbnailUrl: string  // Path of GET /photos/{id}/thumb
+  renditions: PhotoRendition[] | null  // null until rendered in the background
   fileSizeBytes: number | null
   originalFilename: string | null
   createdAt: string
 }
 
+export type PhotoJobStatus = {
+  id: number
+  photo_id: number
+  status: "pending" | "running" | "done" | "failed"
+  attempts: number
+  renditions: PhotoRendition[] | null
+}
+
 export type PhotoUploadResponse = {
   url: string
   thumbnail: string | null  // Base64-encoded thumbnail
+  id: number | null
+  job: PhotoJobStatus | null  // Renditions are produced in the background
+}
+
+export type DirectUploadTarget = {
+  key: string  // Passed to POST /listings/{id}/photos/finalize
+  url: string
+  method: "POST" | "PUT"  // POST: multipart form of `fields` then the file; PUT: raw body
+  fields: Record<string, string>
+  headers: Record<string, string>
 }
 
 export type Listing = {
@@ -32,7 +58,9 @@ export type Listing = {
   createdAt: string
   updatedAt: string
   photos: PhotoResponse[]
-  photoUrl: string | null  // Deprecated: use photos[0]?.photoUrl instead
+  photoUrl: string | null  // Cover photo URL
+  thumbnailUrl: string | null  // Cover thumbnail URL (GET /photos/{id}/thumb)
+  renditions: PhotoRendition[] | null  // Resized copies of the cover photo
   seller: UserPublic
 }
 